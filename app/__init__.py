@@ -1,9 +1,11 @@
 from .time import format_time, format_date, get_local_time
+from .amounts import parse_amount, parse_amounts
 from .currency import format_currency, parse_currency
 from .validators import validate_amount, validate_phone, validate_email
 
 __all__ = [
     'format_time', 'format_date', 'get_local_time',
+    'parse_amount', 'parse_amounts',
     'format_currency', 'parse_currency',
     'validate_amount', 'validate_phone', 'validate_email'
 ]
\ No newline at end of file
@@ -0,0 +1,118 @@
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from config import settings
+
+# Merchant shorthand, checked case-insensitively ("1.5k", "50rb", "2jt")
+SUFFIX_MULTIPLIERS = {
+    "k": 1_000,
+    "rb": 1_000,
+    "ribu": 1_000,
+    "m": 1_000_000,
+    "jt": 1_000_000,
+    "juta": 1_000_000,
+    "b": 1_000_000_000,
+    "bn": 1_000_000_000,
+    "miliar": 1_000_000_000,
+}
+
+_SUFFIX = '|'.join(sorted(SUFFIX_MULTIPLIERS, key=len, reverse=True))
+
+# Shape of an amount as typed: digit groups of three with the other
+# separator as decimal point ("1,500", "1.234,56"), or a plain number with
+# an optional fraction ("12.5", "1,5"); then optional shorthand.
+# No capturing groups, so it can be embedded in larger grammars.
+_NUMBER = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:[.,]\d*)?'
+AMOUNT_PATTERN = rf'(?:{_NUMBER})(?i:{_SUFFIX})?'
+
+_CURRENCY_MARKS = re.compile(r'(?i:rp|idr|usd)\.?|[$€£\s]')
+_AMOUNT = re.compile(
+    rf'(?P<sign>[-+]?)(?P<number>{_NUMBER})(?P<suffix>{_SUFFIX})?',
+    re.IGNORECASE,
+)
+
+
+def _plain_number(number: str, decimal_separator: str) -> str:
+    """
+    Rewrite a matched number with "." as the only separator:
+    - both "." and "," present: the last one is the decimal point
+    - one kind, repeated: thousands grouping
+    - one kind, once: the locale decimal separator is a decimal point; the
+      other one is grouping when exactly three digits follow it
+    """
+    dots, commas = number.count('.'), number.count(',')
+    if not dots and not commas:
+        return number
+
+    if dots and commas:
+        decimal = '.' if number.rfind('.') > number.rfind(',') else ','
+        group = ',' if decimal == '.' else '.'
+        return number.replace(group, '').replace(decimal, '.')
+
+    separator = '.' if dots else ','
+    if dots + commas > 1:
+        return number.replace(separator, '')
+
+    head, _, fraction = number.partition(separator)
+    if separator != decimal_separator and len(fraction) == 3:
+        return head + fraction
+    return f"{head}.{fraction}"
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str, decimal_separator: str) -> Optional[float]:
+    match = _AMOUNT.fullmatch(_CURRENCY_MARKS.sub('', text))
+    if match is None:
+        return None
+    number = _plain_number(match.group('number'), decimal_separator)
+    suffix = match.group('suffix')
+    if suffix:
+        # Decimal keeps "0.1k" at exactly 100
+        value = float(Decimal(number) * SUFFIX_MULTIPLIERS[suffix.lower()])
+    else:
+        value = float(number)
+    return -value if match.group('sign') == '-' else value
+
+
+def parse_amount(text: str, decimal_separator: Optional[str] = None) -> Optional[float]:
+    """
+    Normalize a typed amount: "Rp 1,500" -> 1500.0, "1.5k" -> 1500.0,
+    "2jt" -> 2000000.0, "-50rb" -> -50000.0. Returns None if it is not an amount.
+    """
+    if not text:
+        return None
+    return _parse(text, decimal_separator or settings.AMOUNT_DECIMAL_SEPARATOR)
+
+
+def to_amount(text: str, decimal_separator: Optional[str] = None) -> float:
+    """Drop-in replacement for float() on user input; raises ValueError."""
+    value = parse_amount(text, decimal_separator)
+    if value is None:
+        raise ValueError(f"Invalid amount: {text!r}")
+    return value
+
+
+def parse_amounts(values: Iterable[str],
+                  decimal_separator: Optional[str] = None) -> Tuple[List[Optional[float]], List[int]]:
+    """
+    Batch mode for CSV columns and pasted lists.
+    Returns (amounts, indexes of invalid values); each distinct string is
+    parsed once, and plain digit strings skip the grammar entirely.
+    """
+    decimal_separator = decimal_separator or settings.AMOUNT_DECIMAL_SEPARATOR
+    seen = {}
+    amounts, invalid = [], []
+    for index, text in enumerate(values):
+        value = seen.get(text, seen)
+        if value is seen:
+            if text and text.isdigit() and text.isascii():
+                value = float(text)
+            else:
+                value = _parse(text, decimal_separator) if text else None
+            seen[text] = value
+        if value is None:
+            invalid.append(index)
+        amounts.append(value)
+    return amounts, invalid
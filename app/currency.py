@@ -1,6 +1,7 @@
-import re
 from typing import Optional
 
+from app.amounts import parse_amount
+
 def format_currency(amount: float, currency: str = "Rp", decimal_places: int = 0) -> str:
     """Format amount as currency string"""
     if decimal_places > 0:
@@ -12,37 +13,8 @@ def format_currency(amount: float, currency: str = "Rp", decimal_places: int = 0
     return f"{currency} {formatted_amount}"
 
 def parse_currency(text: str) -> Optional[float]:
-    """Parse currency string to float"""
-    # Remove currency symbols and thousand separators
-    text = re.sub(r'[^\d.,-]', '', text)
-    
-    # Handle negative numbers
-    is_negative = '-' in text
-    text = text.replace('-', '')
-    
-    # Determine decimal separator
-    if ',' in text and '.' in text:
-        # If both exist, last one is decimal
-        if text.rfind(',') > text.rfind('.'):
-            text = text.replace('.', '').replace(',', '.')
-        else:
-            text = text.replace(',', '')
-    elif ',' in text:
-        # Comma as decimal or thousand separator?
-        if text.count(',') == 1 and len(text.split(',')[1]) <= 2:
-            # Probably decimal
-            text = text.replace(',', '.')
-        else:
-            # Probably thousand separator
-            text = text.replace(',', '')
-    
-    try:
-        amount = float(text)
-        if is_negative:
-            amount = -amount
-        return amount
-    except ValueError:
-        return None
+    """Parse currency string to float ("Rp 1,500", "-20k", "2jt")"""
+    return parse_amount(text)
 
 def format_percentage(value: float, decimal_places: int = 1) -> str:
     """Format percentage"""
@@ -14,8 +14,8 @@ from .crud import (
     get_user, create_user, update_user,
     create_business, get_business, ensure_user_business_context,
     add_or_update_business_member, get_business_members, create_activity_log, get_activity_logs,
-    create_sale, get_today_sales, get_sales_by_date,
-    create_expense, get_today_expenses, get_expenses_by_date,
+    create_sale, get_today_sales, get_sales_by_date, get_sale_rows_by_date,
+    create_expense, get_today_expenses, get_expenses_by_date, get_expense_rows_by_date,
     create_product, get_products, update_product_stock,
     create_customer, get_customers, update_customer_credit
 )
@@ -26,8 +26,8 @@ __all__ = [
     'get_user', 'create_user', 'update_user',
     'create_business', 'get_business', 'ensure_user_business_context',
     'add_or_update_business_member', 'get_business_members', 'create_activity_log', 'get_activity_logs',
-    'create_sale', 'get_today_sales', 'get_sales_by_date',
-    'create_expense', 'get_today_expenses', 'get_expenses_by_date',
+    'create_sale', 'get_today_sales', 'get_sales_by_date', 'get_sale_rows_by_date',
+    'create_expense', 'get_today_expenses', 'get_expenses_by_date', 'get_expense_rows_by_date',
     'create_product', 'get_products', 'update_product_stock',
     'create_customer', 'get_customers', 'update_customer_credit'
 ]
@@ -1,28 +1,264 @@
-from sqlalchemy import create_engine
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.pool import NullPool
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.util import find_tables
 from contextlib import contextmanager
 from config import db_config
+from .models import Base, SHARDED_TABLES, TenantShard
 
-# Database engine - supports both SQLite and PostgreSQL
-# Use NullPool for SQLite since it doesn't benefit from connection pooling
-# and NullPool prevents connection exhaustion issues
-if db_config.URL.startswith('sqlite'):
-    engine = create_engine(
-        db_config.URL,
+
+def _sqlite_engine(url: str, pooled: bool = False) -> Engine:
+    # Use NullPool for SQLite since it doesn't benefit from connection pooling
+    # and NullPool prevents connection exhaustion issues. Shard engines are the
+    # exception: a routed write opens a shard connection on top of the main one,
+    # and reconnecting each time costs more than the insert itself.
+    sqlite_engine = create_engine(
+        url,
         echo=db_config.ECHO,
-        poolclass=NullPool  # No pooling for SQLite
+        poolclass=None if pooled else NullPool  # None: SQLAlchemy's default small pool
     )
-else:
-    engine = create_engine(
-        db_config.URL,
+
+    if db_config.SQLITE_WAL:
+        @event.listens_for(sqlite_engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, _):
+            # WAL lets reports read while imports and sales write; NORMAL sync is safe under WAL
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    return sqlite_engine
+
+
+def _engine(url: str) -> Engine:
+    if url.startswith('sqlite'):
+        return _sqlite_engine(url)
+    connect_args = {}
+    if url.startswith('postgresql+psycopg:'):
+        # psycopg 3 prepares a statement server-side once a connection has run it
+        # this many times; the hot CRUD lookups compile to the same SQL every call.
+        # None turns it off (PgBouncer in transaction mode). psycopg2 can't prepare.
+        connect_args["prepare_threshold"] = db_config.PG_PREPARE_THRESHOLD or None
+    return create_engine(
+        url,
         echo=db_config.ECHO,
         pool_pre_ping=True,
         pool_size=5,
-        max_overflow=10
+        max_overflow=10,
+        connect_args=connect_args
     )
 
+
+# Database engine - supports both SQLite and PostgreSQL
+engine = _engine(db_config.URL)
+
+# Optional read replica; see get_read_session
+read_engine: Optional[Engine] = _engine(db_config.READ_URL) if db_config.READ_URL else None
+
+
+class ShardRouter:
+    """
+    Spreads business data over SQLite files so one busy business's writes
+    don't hold the single SQLite write lock for everyone. The main database
+    keeps users, businesses and the scope -> shard map (tenant_shards) and
+    doubles as shard 0; shards 1..count-1 are files in `directory` holding
+    only SHARDED_TABLES. Shard engines (each with a small connection pool)
+    open on first use; the least recently used ones beyond `cache_size` leave
+    the cache. They are not disposed, since an open session may still be
+    using one: it is reused while still alive, so a file never has two
+    engines at once, and its connections close once it is garbage-collected.
+    """
+
+    def __init__(self, main_engine: Engine, count: int, directory: str, cache_size: int = 16):
+        self.main = main_engine
+        self.count = count
+        self.directory = directory
+        self.cache_size = max(1, cache_size)
+        self._engines: "OrderedDict[int, Engine]" = OrderedDict()
+        self._evicted: "weakref.WeakValueDictionary[int, Engine]" = weakref.WeakValueDictionary()
+        self._ready = set()
+        self._lock = threading.Lock()
+
+    def path(self, shard: int) -> str:
+        return os.path.join(self.directory, f"shard_{shard}.db")
+
+    def engine(self, shard: int) -> Engine:
+        if shard == 0:
+            return self.main
+        if not 0 < shard < self.count:
+            raise ValueError(f"Shard {shard} out of range (DB_SHARD_COUNT={self.count})")
+        with self._lock:
+            shard_engine = self._engines.get(shard)
+            if shard_engine is not None:
+                self._engines.move_to_end(shard)
+                return shard_engine
+            shard_engine = self._evicted.pop(shard, None)
+            if shard_engine is None:
+                os.makedirs(self.directory, exist_ok=True)
+                shard_engine = _sqlite_engine(f"sqlite:///{self.path(shard)}", pooled=True)
+            if shard not in self._ready:
+                Base.metadata.create_all(
+                    bind=shard_engine,
+                    tables=[Base.metadata.tables[name] for name in sorted(SHARDED_TABLES)],
+                )
+                self._ready.add(shard)
+            self._engines[shard] = shard_engine
+            while len(self._engines) > self.cache_size:
+                evicted_shard, evicted = self._engines.popitem(last=False)
+                self._evicted[evicted_shard] = evicted
+            return shard_engine
+
+    def shard_for(self, db: Session, scope_user_id: int) -> int:
+        assignment = db.get(TenantShard, scope_user_id)
+        return assignment.shard if assignment else 0
+
+    def assign(self, db: Session, scope_user_id: int) -> int:
+        """
+        Place a new business: spread by scope id, unless it already has data
+        on shard 0 (a user from before sharding was enabled). The caller commits.
+        """
+        assignment = db.get(TenantShard, scope_user_id)
+        if assignment is not None:
+            return assignment.shard
+        shard = scope_user_id % self.count
+        if shard != 0 and self.has_data(0, scope_user_id):
+            shard = 0
+        db.add(TenantShard(scope_user_id=scope_user_id, shard=shard, moved_at=datetime.now()))
+        return shard
+
+    def has_data(self, shard: int, scope_user_id: int) -> bool:
+        with self.engine(shard).connect() as connection:
+            for name in sorted(SHARDED_TABLES):
+                table = Base.metadata.tables[name]
+                if connection.execute(
+                    select(table.c.id).where(table.c.user_id == scope_user_id).limit(1)
+                ).first():
+                    return True
+        return False
+
+
+if db_config.SHARD_COUNT > 1:
+    if not db_config.URL.startswith('sqlite'):
+        raise RuntimeError("DB_SHARD_COUNT > 1 is only supported with SQLite")
+    if read_engine is not None:
+        raise RuntimeError("DB_READ_URL cannot be combined with DB_SHARD_COUNT > 1")
+    shard_router: Optional[ShardRouter] = ShardRouter(
+        engine, db_config.SHARD_COUNT, db_config.SHARD_DIR, db_config.SHARD_ENGINE_CACHE
+    )
+else:
+    shard_router = None
+
+
+def _sharded(mapper, clause) -> bool:
+    if mapper is not None and mapper.local_table.name in SHARDED_TABLES:
+        return True
+    return clause is not None and any(
+        getattr(table, "name", None) in SHARDED_TABLES for table in find_tables(clause, include_crud=True)
+    )
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SHARDED_TABLES to the shard chosen by route_session,
+    or, in a read session, to the replica unless route_session saw a recent
+    write by the business.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if (shard_router is not None or replica is not None) and _sharded(mapper, clause):
+            if replica is not None and not self.info.get("primary"):
+                return replica
+            if shard_router is not None:
+                shard = self.info.get("shard")
+                if shard is None:
+                    raise RuntimeError("Business data accessed before the session was routed to a shard")
+                return shard_router.engine(shard)
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+_recent_writes: Dict[int, float] = {}
+_recent_writes_lock = threading.Lock()
+
+
+def note_write(scope_user_id: int) -> None:
+    """Remember that the business just committed a write (read-your-writes window)."""
+    if read_engine is None:
+        return
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[scope_user_id] = now
+        if len(_recent_writes) > 10_000:
+            expired = now - db_config.READ_YOUR_WRITES_SECONDS
+            for scope, written in list(_recent_writes.items()):
+                if written < expired:
+                    del _recent_writes[scope]
+
+
+def wrote_recently(scope_user_id: int) -> bool:
+    written = _recent_writes.get(scope_user_id)
+    return written is not None and time.monotonic() - written < db_config.READ_YOUR_WRITES_SECONDS
+
+
+def use_shard(db: Session, shard: int) -> None:
+    """
+    Point the session's business-data queries at `shard`. Objects loaded from
+    the previous shard are flushed and detached, since ids repeat across shards.
+    """
+    previous = db.info.get("shard")
+    if previous is not None and previous != shard:
+        db.flush()
+        for instance in list(db.identity_map.values()):
+            if instance.__table__.name in SHARDED_TABLES:
+                db.expunge(instance)
+    db.info["shard"] = shard
+    db.info.pop("scope", None)
+
+
+def route_session(db: Session, scope_user_id: int) -> None:
+    """
+    Route the session to the shard holding the scope's data, and send a read
+    session's business-data reads to the primary while the business's own
+    writes may not have reached the replica yet. A no-op unless sharding or a
+    replica is configured. CRUD calls this wherever it resolves or receives a
+    scope, so by-id helpers (update_product_stock, update_customer_credit)
+    run on the shard of the scope resolved before them.
+    """
+    if db.info.get("scope") == scope_user_id:
+        return
+    if "replica" in db.info:
+        db.info["primary"] = wrote_recently(scope_user_id)
+    if shard_router is not None:
+        use_shard(db, shard_router.shard_for(db, scope_user_id))
+    db.info["scope"] = scope_user_id
+
+
+def assign_shard(db: Session, scope_user_id: int) -> None:
+    """Record the shard of a new business (see ShardRouter.assign); a no-op unless sharding is on."""
+    if shard_router is not None:
+        shard_router.assign(db, scope_user_id)
+
+
+def iter_shards(db: Session) -> Iterator[int]:
+    """Route the session to each shard in turn, for jobs that read across businesses."""
+    if shard_router is None:
+        yield 0
+        return
+    for shard in range(shard_router.count):
+        use_shard(db, shard)
+        yield shard
+
+
 SessionLocal = sessionmaker(
+    class_=RoutingSession,
     autocommit=False,
     autoflush=False,
     bind=engine
@@ -30,7 +266,6 @@ SessionLocal = sessionmaker(
 
 async def init_db():
     """Initialize database tables"""
-    from .models import Base
     # Use run_sync for synchronous engine
     Base.metadata.create_all(bind=engine)
 
@@ -42,6 +277,23 @@ def get_db():
     finally:
         db.close()
 
+@contextmanager
+def get_read_session():
+    """Context manager for report, insight and export reads.
+    
+    Business data (sales, expenses, products, ...) is read from the replica
+    at DB_READ_URL; users, businesses and memberships still come from the
+    primary, so scopes resolve fresh. Without a replica this is a plain
+    session. Don't write through it.
+    """
+    db = SessionLocal()
+    if read_engine is not None:
+        db.info["replica"] = read_engine
+    try:
+        yield db
+    finally:
+        db.close()
+
 @contextmanager
 def get_db_session():
     """Context manager for synchronous database sessions.
@@ -1,11 +1,12 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from datetime import datetime, date
-from typing import List, Optional
+from sqlalchemy import case, desc, func, insert, lambda_stmt, literal, select, union_all
+from datetime import datetime, date, timedelta
+from typing import Iterator, List, Optional, Sequence
 import json
 from .models import (
     User,
     Sale,
+    SaleItem,
     Expense,
     Product,
     Customer,
@@ -13,7 +14,14 @@ from .models import (
     Business,
     BusinessMember,
     ActivityLog,
+    ReportSnapshot,
+    ExportJob,
+    ARCHIVE_MODELS,
 )
+from .connection import assign_shard, iter_shards, note_write, route_session
+from app.services.catalog import ProductTrie, normalize_product_name, product_name_index
+from app.services.report_cache import report_cache
+from app.services.stock_alerts import on_stock_change
 
 
 def _normalize_datetime_range(
@@ -40,18 +48,75 @@ def _scope_user_id(db: Session, user_id: int) -> int:
     For members of a business, all operational data is scoped to the business owner id.
     """
     member = get_active_membership_for_user(db, user_id)
-    if not member:
-        return user_id
+    business = get_business(db, member.business_id) if member else None
+    scope_user_id = business.owner_user_id if business else user_id
+    route_session(db, scope_user_id)
+    return scope_user_id
 
-    business = get_business(db, member.business_id)
-    if not business:
-        return user_id
+def get_data_scope(db: Session, user_id: int) -> int:
+    """Public form of the scope resolution, for services keyed by business."""
+    return _scope_user_id(db, user_id)
 
-    return business.owner_user_id
+def archive_reached(db: Session, model, scope_user_id: int,
+                    start_dt: Optional[datetime] = None, end_dt: Optional[datetime] = None) -> bool:
+    """Whether the scope has archived rows of `model` in the range (whole history if unbounded)."""
+    route_session(db, scope_user_id)
+    archive, date_name = ARCHIVE_MODELS[model]
+    table = archive.__table__
+    date_column = table.c[date_name]
+    stmt = lambda_stmt(lambda: select(table.c.id).where(table.c.user_id == scope_user_id))
+    if start_dt is not None:
+        stmt += lambda s: s.where(date_column >= start_dt)
+    if end_dt is not None:
+        stmt += lambda s: s.where(date_column <= end_dt)
+    stmt += lambda s: s.limit(1)
+    return db.execute(stmt).first() is not None
+
+def rows_source(db: Session, model, scope_user_id: int,
+                start_dt: Optional[datetime] = None, end_dt: Optional[datetime] = None):
+    """
+    Table to read the scope's `model` rows in [start_dt, end_dt] from: the hot
+    table, or, once the range reaches archived rows, a UNION ALL of the hot and
+    archive tables (each filtered by scope and range) under the hot table's name
+    and column names. Callers filter and group on `.c` as for the plain table.
+    """
+    hot = model.__table__
+    if not archive_reached(db, model, scope_user_id, start_dt, end_dt):
+        return hot
+    archive, date_name = ARCHIVE_MODELS[model]
+    branches = []
+    for table in (hot, archive.__table__):
+        branch = select(*(table.c[column.name] for column in hot.columns)).where(
+            table.c.user_id == scope_user_id
+        )
+        if start_dt is not None:
+            branch = branch.where(table.c[date_name] >= start_dt)
+        if end_dt is not None:
+            branch = branch.where(table.c[date_name] <= end_dt)
+        branches.append(branch)
+    return union_all(*branches).subquery(hot.name)
+
+def _data_changed(db: Session, scope_user_id: int, history: bool = False) -> None:
+    """
+    Called after a committed write: retires cached reports of the scope's open periods.
+    When history was rewritten, the scope's snapshots of closed periods are dropped too;
+    reports fall back to live queries until the snapshots are rebuilt. Read
+    sessions keep the scope's reads on the primary for a while (read-your-writes).
+    """
+    note_write(scope_user_id)
+    if history:
+        delete_report_snapshots(db, scope_user_id)
+    report_cache.bump(db, scope_user_id, history=history)
 
 # User CRUD
+# The lookups below run on nearly every update (scope resolution, handlers), so
+# they are lambda statements: SQLAlchemy builds and compiles each one once and
+# afterwards only swaps in the parameters (scripts/bench_crud_queries.py).
+
 def get_user(db: Session, telegram_id: int) -> Optional[User]:
-    return db.query(User).filter(User.telegram_id == telegram_id).first()
+    return db.execute(lambda_stmt(
+        lambda: select(User).where(User.telegram_id == telegram_id).limit(1)
+    )).scalars().first()
 
 def create_user(db: Session, telegram_id: int, full_name: str, 
                 username: Optional[str] = None) -> User:
@@ -91,13 +156,16 @@ def create_business(
         timezone=timezone,
     )
     db.add(business)
+    assign_shard(db, owner_user_id)
     db.commit()
     db.refresh(business)
     return business
 
 
 def get_business(db: Session, business_id: int) -> Optional[Business]:
-    return db.query(Business).filter(Business.id == business_id, Business.is_active == True).first()
+    return db.execute(lambda_stmt(
+        lambda: select(Business).where(Business.id == business_id, Business.is_active == True).limit(1)
+    )).scalars().first()
 
 
 def get_business_member(
@@ -116,10 +184,12 @@ def get_business_member(
 
 
 def get_active_membership_for_user(db: Session, user_id: int) -> Optional[BusinessMember]:
-    return db.query(BusinessMember).filter(
-        BusinessMember.user_id == user_id,
-        BusinessMember.status == "active",
-    ).order_by(BusinessMember.id).first()
+    return db.execute(lambda_stmt(
+        lambda: select(BusinessMember).where(
+            BusinessMember.user_id == user_id,
+            BusinessMember.status == "active",
+        ).order_by(BusinessMember.id).limit(1)
+    )).scalars().first()
 
 
 def add_or_update_business_member(
@@ -185,6 +255,38 @@ def remove_business_member(db: Session, business_id: int, user_id: int) -> bool:
     return True
 
 
+def get_scope_recipients(
+    db: Session,
+    scope_user_ids: List[int],
+    roles: tuple = ("owner", "manager"),
+) -> dict:
+    """Telegram ids of active members with the given roles, per business owner (scope) id."""
+    recipients = {scope_user_id: set() for scope_user_id in scope_user_ids}
+    if not scope_user_ids:
+        return recipients
+
+    owners = db.query(User.id, User.telegram_id).filter(
+        User.id.in_(scope_user_ids), User.is_active == True
+    ).all()
+    for user_id, telegram_id in owners:
+        recipients[user_id].add(telegram_id)
+
+    members = db.query(Business.owner_user_id, User.telegram_id).join(
+        BusinessMember, BusinessMember.business_id == Business.id
+    ).join(
+        User, User.id == BusinessMember.user_id
+    ).filter(
+        Business.owner_user_id.in_(scope_user_ids),
+        Business.is_active == True,
+        BusinessMember.status == "active",
+        BusinessMember.role.in_(roles),
+        User.is_active == True,
+    ).all()
+    for owner_user_id, telegram_id in members:
+        recipients[owner_user_id].add(telegram_id)
+    return recipients
+
+
 def ensure_user_business_context(db: Session, user: User) -> tuple[Business, BusinessMember]:
     member = get_active_membership_for_user(db, user.id)
     if member:
@@ -257,12 +359,59 @@ def get_activity_logs(db: Session, business_id: int, limit: int = 20) -> List[Ac
     ).order_by(desc(ActivityLog.created_at)).limit(limit).all()
 
 # Sale CRUD
+def _resolve_sale_product(db: Session, scope_user_id: int,
+                          product_name: Optional[str],
+                          product_id: Optional[int] = None) -> Optional[Product]:
+    """Resolve a sale's catalog product through the cached per-business name index."""
+    from_index = product_id is None
+    if from_index:
+        product_id = product_name_index.resolve(db, scope_user_id, product_name)
+    if product_id is None:
+        return None
+
+    product = db.query(Product).filter(
+        Product.id == product_id,
+        Product.user_id == scope_user_id,
+    ).with_for_update().first()
+    if product is None and from_index:
+        # Stale cache entry (product removed elsewhere): rebuild once
+        product_name_index.invalidate(db, scope_user_id)
+        product_id = product_name_index.resolve(db, scope_user_id, product_name)
+        if product_id is not None:
+            product = db.query(Product).filter(Product.id == product_id).with_for_update().first()
+    return product
+
+
+def _apply_stock_change(db: Session, product: Product, new_stock: int) -> None:
+    """Stage a stock change and run threshold-crossing detection on it."""
+    previous_stock = product.stock or 0
+    product.stock = max(0, new_stock)
+    product.updated_at = datetime.now()
+    on_stock_change(db, product, previous_stock)
+
+
+def _build_sale_item(sale: Sale, product: Optional[Product]) -> SaleItem:
+    quantity = sale.quantity or 1
+    return SaleItem(
+        sale_id=sale.id,
+        user_id=sale.user_id,
+        product_id=product.id if product else None,
+        item_name=sale.product_name or "",
+        quantity=quantity,
+        unit_price=sale.unit_price if sale.unit_price is not None else sale.amount / quantity,
+        unit_cost=product.purchase_price if product else None,
+        line_revenue=sale.amount,
+        sale_date=sale.sale_date,
+    )
+
+
 def create_sale(db: Session, user_id: int, amount: float, 
                 product_name: str, quantity: int = 1,
                 unit_price: Optional[float] = None,
                 customer_id: Optional[int] = None,
                 payment_method: str = "cash",
-                notes: Optional[str] = None) -> Sale:
+                notes: Optional[str] = None,
+                product_id: Optional[int] = None) -> Sale:
     scope_user_id = _scope_user_id(db, user_id)
     
     if unit_price is None:
@@ -276,11 +425,20 @@ def create_sale(db: Session, user_id: int, amount: float,
         unit_price=unit_price,
         customer_id=customer_id,
         payment_method=payment_method,
-        notes=notes
+        notes=notes,
+        sale_date=datetime.now(),
     )
     db.add(sale)
+    db.flush()
+    
+    # Link the line item to the catalog and take the units out of stock in the same commit
+    product = _resolve_sale_product(db, scope_user_id, product_name, product_id)
+    db.add(_build_sale_item(sale, product))
+    if product:
+        _apply_stock_change(db, product, (product.stock or 0) - (quantity or 0))
     
     # Update customer if exists
+    customer = None
     if customer_id:
         customer = db.query(Customer).filter(
             Customer.id == customer_id,
@@ -290,10 +448,97 @@ def create_sale(db: Session, user_id: int, amount: float,
             customer.total_purchases += amount
             customer.last_purchase = datetime.now()
     
+    balance = customer.credit_balance if customer else 0.0
+    _append_transaction(
+        db,
+        user_id=scope_user_id,
+        customer_id=customer.id if customer else None,
+        type="sale",
+        amount=amount,
+        balance_before=balance,
+        balance_after=balance,
+        reference_id=sale.id,
+        description=product_name,
+    )
+    
     db.commit()
+    _data_changed(db, scope_user_id)
     db.refresh(sale)
     return sale
 
+def create_sales_bulk(db: Session, user_id: int, entries: List[dict]) -> List[Sale]:
+    """
+    Record a batch of sales in one transaction.
+    Each entry carries amount, product_name and optionally quantity/unit_price.
+    Sales are inserted in one batched flush; line items, ledger rows and one
+    stock change per product follow, and everything is committed once.
+    """
+    if not entries:
+        return []
+
+    scope_user_id = _scope_user_id(db, user_id)
+    now = datetime.now()
+    sales = []
+    for entry in entries:
+        quantity = entry.get("quantity", 1)
+        amount = entry["amount"]
+        unit_price = entry.get("unit_price")
+        if unit_price is None:
+            unit_price = amount / quantity if quantity > 0 else amount
+        sales.append(Sale(
+            user_id=scope_user_id,
+            amount=amount,
+            product_name=entry["product_name"],
+            quantity=quantity,
+            unit_price=unit_price,
+            payment_method=entry.get("payment_method", "cash"),
+            notes=entry.get("notes"),
+            sale_date=now,
+        ))
+    db.add_all(sales)
+    db.flush()
+
+    product_ids = {
+        sale.id: product_name_index.resolve(db, scope_user_id, sale.product_name)
+        for sale in sales
+    }
+    wanted = {product_id for product_id in product_ids.values() if product_id is not None}
+    products = {}
+    if wanted:
+        products = {
+            product.id: product
+            for product in db.query(Product).filter(
+                Product.id.in_(wanted),
+                Product.user_id == scope_user_id,
+            ).with_for_update().all()
+        }
+
+    sold_units = {}
+    for sale in sales:
+        product = products.get(product_ids[sale.id])
+        db.add(_build_sale_item(sale, product))
+        _append_transaction(
+            db,
+            user_id=scope_user_id,
+            customer_id=None,
+            type="sale",
+            amount=sale.amount,
+            balance_before=0.0,
+            balance_after=0.0,
+            reference_id=sale.id,
+            description=sale.product_name,
+        )
+        if product:
+            sold_units[product.id] = sold_units.get(product.id, 0) + (sale.quantity or 0)
+
+    for product_id, units in sold_units.items():
+        product = products[product_id]
+        _apply_stock_change(db, product, (product.stock or 0) - units)
+
+    db.commit()
+    _data_changed(db, scope_user_id)
+    return sales
+
 def get_today_sales(db: Session, user_id: int) -> List[Sale]:
     today = date.today()
     scope_user_id = _scope_user_id(db, user_id)
@@ -302,27 +547,382 @@ def get_today_sales(db: Session, user_id: int) -> List[Sale]:
         func.date(Sale.sale_date) == today
     ).order_by(desc(Sale.sale_date)).all()
 
+def _with_archived(db: Session, model, rows: list, scope_user_id: int,
+                   start_dt: datetime, end_dt: datetime, date_name: str) -> list:
+    """Add archived rows in the range to `rows`, as detached `model` instances, newest first."""
+    if not archive_reached(db, model, scope_user_id, start_dt, end_dt):
+        return rows
+    archive = ARCHIVE_MODELS[model][0].__table__
+    column = archive.c[date_name]
+    archived = db.execute(select(archive).where(
+        archive.c.user_id == scope_user_id, column >= start_dt, column <= end_dt
+    )).mappings().all()
+    rows = rows + [model(**row) for row in archived]
+    rows.sort(key=lambda row: getattr(row, date_name), reverse=True)
+    return rows
+
 def get_sales_by_date(db: Session, user_id: int, 
                      start_date: date, end_date: date) -> List[Sale]:
     start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
     scope_user_id = _scope_user_id(db, user_id)
-    return db.query(Sale).filter(
+    sales = db.query(Sale).filter(
         Sale.user_id == scope_user_id,
         Sale.sale_date >= start_dt,
         Sale.sale_date <= end_dt
     ).order_by(desc(Sale.sale_date)).all()
+    return _with_archived(db, Sale, sales, scope_user_id, start_dt, end_dt, "sale_date")
+
+def get_sale_rows_by_date(db: Session, user_id: int,
+                          start_date: date, end_date: date) -> List:
+    """
+    Column-only variant of get_sales_by_date for aggregations.
+    Rows expose amount, product_name and sale_date and bypass the identity map.
+    """
+    start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
+    scope_user_id = _scope_user_id(db, user_id)
+    sales = rows_source(db, Sale, scope_user_id, start_dt, end_dt).c
+    return db.query(sales.amount, sales.product_name, sales.sale_date).filter(
+        sales.user_id == scope_user_id,
+        sales.sale_date >= start_dt,
+        sales.sale_date <= end_dt
+    ).order_by(desc(sales.sale_date)).all()
 
 def get_total_sales(db: Session, user_id: int, 
                    start_date: date, end_date: date) -> float:
     start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
     scope_user_id = _scope_user_id(db, user_id)
-    result = db.query(func.sum(Sale.amount)).filter(
-        Sale.user_id == scope_user_id,
-        Sale.sale_date >= start_dt,
-        Sale.sale_date <= end_dt
-    ).scalar()
+    sales = rows_source(db, Sale, scope_user_id, start_dt, end_dt).c
+    result = db.execute(lambda_stmt(
+        lambda: select(func.sum(sales.amount)).where(
+            sales.user_id == scope_user_id,
+            sales.sale_date >= start_dt,
+            sales.sale_date <= end_dt
+        )
+    )).scalar()
     return result or 0.0
 
+def get_product_sales_summary(db: Session, user_id: int,
+                              start_date: date, end_date: date) -> List:
+    """
+    Revenue, units and margin per catalog product in one grouped query over sale_items.
+    Rows carry product_id (None for non-catalog items), product_name, revenue, units,
+    cogs and margin; margin only covers lines with a cost snapshot.
+    Non-catalog items are grouped by their trimmed, lower-cased name.
+    """
+    start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
+    scope_user_id = _scope_user_id(db, user_id)
+    items = rows_source(db, SaleItem, scope_user_id, start_dt, end_dt).c
+    has_cost = items.unit_cost.isnot(None)
+    line_cogs = items.quantity * items.unit_cost
+    unlisted_key = case(
+        (items.product_id.is_(None), func.lower(func.trim(items.item_name))),
+        else_=None,
+    )
+
+    revenue = func.sum(items.line_revenue)
+    return db.query(
+        items.product_id,
+        func.coalesce(func.max(Product.name), func.max(items.item_name)).label("product_name"),
+        revenue.label("revenue"),
+        func.sum(items.quantity).label("units"),
+        func.coalesce(func.sum(case((has_cost, line_cogs), else_=0.0)), 0.0).label("cogs"),
+        func.coalesce(
+            func.sum(case((has_cost, items.line_revenue - line_cogs), else_=0.0)), 0.0
+        ).label("margin"),
+    ).outerjoin(
+        Product, Product.id == items.product_id
+    ).filter(
+        items.user_id == scope_user_id,
+        items.sale_date >= start_dt,
+        items.sale_date <= end_dt,
+    ).group_by(items.product_id, unlisted_key).order_by(desc(revenue)).all()
+
+
+def get_unitemized_sales_summary(db: Session, user_id: int,
+                                 start_date: date, end_date: date) -> List:
+    """
+    Revenue per raw product name of the period's sales that have no line item
+    (recorded before sale_items existed and not backfilled yet), the part of
+    the period get_product_sales_summary can't see. Rows carry product_name and revenue.
+    """
+    start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
+    scope_user_id = _scope_user_id(db, user_id)
+    sales = rows_source(db, Sale, scope_user_id, start_dt, end_dt).c
+    items = rows_source(db, SaleItem, scope_user_id, start_dt, end_dt).c
+    revenue = func.sum(sales.amount)
+    return db.query(sales.product_name, revenue.label("revenue")).filter(
+        sales.user_id == scope_user_id,
+        sales.sale_date >= start_dt,
+        sales.sale_date <= end_dt,
+        ~select(items.id).where(items.sale_id == sales.id).exists(),
+    ).group_by(sales.product_name).order_by(desc(revenue)).all()
+
+
+def get_margin_summary(db: Session, user_id: int,
+                       start_date: date, end_date: date) -> List:
+    """
+    Gross margin inputs per product in one grouped query over sale_items joined to products.
+    Line cost is the unit_cost snapshot taken at sale time, or the product's current
+    purchase_price for lines recorded without one. Rows carry product_id, product_name,
+    category, revenue, units, costed_revenue (revenue of lines with a known cost) and cogs.
+    """
+    start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
+    scope_user_id = _scope_user_id(db, user_id)
+    items = rows_source(db, SaleItem, scope_user_id, start_dt, end_dt).c
+    unit_cost = func.coalesce(items.unit_cost, Product.purchase_price)
+    has_cost = unit_cost.isnot(None)
+    unlisted_key = case(
+        (items.product_id.is_(None), func.lower(func.trim(items.item_name))),
+        else_=None,
+    )
+
+    revenue = func.sum(items.line_revenue)
+    return db.query(
+        items.product_id,
+        func.coalesce(func.max(Product.name), func.max(items.item_name)).label("product_name"),
+        func.max(Product.category).label("category"),
+        revenue.label("revenue"),
+        func.sum(items.quantity).label("units"),
+        func.coalesce(func.sum(case((has_cost, items.line_revenue), else_=0.0)), 0.0).label("costed_revenue"),
+        func.coalesce(func.sum(case((has_cost, items.quantity * unit_cost), else_=0.0)), 0.0).label("cogs"),
+    ).outerjoin(
+        Product, Product.id == items.product_id
+    ).filter(
+        items.user_id == scope_user_id,
+        items.sale_date >= start_dt,
+        items.sale_date <= end_dt,
+    ).group_by(items.product_id, unlisted_key).order_by(desc(revenue)).all()
+
+
+def backfill_sale_items(db: Session, user_id: Optional[int] = None,
+                        batch_size: int = 1000) -> int:
+    """
+    Create line items for historical sales recorded before sale_items existed,
+    mapping their free-text product_name onto the owning scope's catalog.
+    Returns the number of items written.
+    """
+    name_maps = {}
+    written = 0
+    scope_user_id = _scope_user_id(db, user_id) if user_id is not None else None
+
+    for _ in ([None] if scope_user_id is not None else iter_shards(db)):
+        product_costs = {}  # product ids repeat across shards
+        while True:
+            query = db.query(Sale).outerjoin(
+                SaleItem, SaleItem.sale_id == Sale.id
+            ).filter(SaleItem.id.is_(None))
+            if scope_user_id is not None:
+                query = query.filter(Sale.user_id == scope_user_id)
+            sales = query.order_by(Sale.id).limit(batch_size).all()
+            if not sales:
+                break
+
+            rows = []
+            for sale in sales:
+                if sale.user_id not in name_maps:
+                    name_maps[sale.user_id] = product_name_index.get_index(db, sale.user_id)
+                    product_costs.update(
+                        db.query(Product.id, Product.purchase_price).filter(
+                            Product.user_id == sale.user_id
+                        ).all()
+                    )
+                product_id = name_maps[sale.user_id].get(normalize_product_name(sale.product_name))
+                quantity = sale.quantity or 1
+                rows.append({
+                    "sale_id": sale.id,
+                    "user_id": sale.user_id,
+                    "product_id": product_id,
+                    "item_name": sale.product_name or "",
+                    "quantity": quantity,
+                    "unit_price": sale.unit_price if sale.unit_price is not None else sale.amount / quantity,
+                    "unit_cost": product_costs.get(product_id),
+                    "line_revenue": sale.amount,
+                    "sale_date": sale.sale_date,
+                    "created_at": datetime.now(),
+                })
+
+            db.execute(insert(SaleItem), rows)
+            db.commit()
+            written += len(rows)
+
+    # Product breakdowns of past periods change with the new links
+    for scope_user_id in name_maps:
+        _data_changed(db, scope_user_id, history=True)
+    return written
+
+def bulk_insert(db: Session, model, rows: List[dict]) -> None:
+    """
+    executemany straight on the driver cursor, inside the session's transaction.
+    The INSERT is compiled once and values only pass through their column's
+    bind processor, skipping the per-row parameter handling that dominates
+    large Core or ORM executemany calls. All rows must share the same keys.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    connection = db.connection(bind_arguments={"mapper": model.__mapper__})
+    dialect = connection.dialect
+    keys = list(rows[0])
+    compiled = table.insert().compile(dialect=dialect, column_keys=keys)
+    order = list(compiled.positiontup) if compiled.positional else keys
+    columns = []
+    for key in order:
+        values = [row[key] for row in rows]
+        process = table.c[key].type.dialect_impl(dialect).bind_processor(dialect)
+        if process:
+            # Imported dates and timestamps repeat a lot; convert each distinct value once
+            converted = {value: process(value) for value in set(values)}
+            values = [converted[value] for value in values]
+        columns.append(values)
+    if compiled.positional:
+        params = list(zip(*columns))
+    else:
+        params = [dict(zip(order, values)) for values in zip(*columns)]
+    cursor = connection.connection.cursor()
+    try:
+        cursor.executemany(compiled.string, params)
+    finally:
+        cursor.close()
+
+def bulk_insert_with_ids(db: Session, model, entries: List[dict]) -> List[int]:
+    """
+    Insert rows with primary keys chosen up front, so dependent rows can
+    reference them without per-row RETURNING. PostgreSQL draws them from the
+    table's sequence. SQLite holds the database write lock from the first
+    insert until commit, so once one row is in, the ids after it are ours.
+    """
+    if not entries:
+        return []
+    table = model.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        sequence = func.pg_get_serial_sequence(table.name, "id")
+        ids = db.execute(
+            select(func.nextval(sequence)).select_from(func.generate_series(1, len(entries)))
+        ).scalars().all()
+        pending = entries
+    else:
+        first_id = db.execute(table.insert().returning(table.c.id), entries[0]).scalar_one()
+        ids = list(range(first_id, first_id + len(entries)))
+        pending = entries[1:]
+
+    for entry, entry_id in zip(entries, ids):
+        entry["id"] = entry_id
+    bulk_insert(db, model, pending)
+    return ids
+
+def import_sales(db: Session, scope_user_id: int, entries: List[dict]) -> int:
+    """
+    Bulk-insert historical sales (amount, product_name, quantity, unit_price,
+    payment_method, notes, sale_date) with their line items and ledger rows in
+    one transaction, as executemany batches. Stock is left untouched, since the
+    goods left the shelf long ago. Call finish_import once all chunks are in.
+    """
+    if not entries:
+        return 0
+
+    route_session(db, scope_user_id)
+    now = datetime.now()
+    catalog = product_name_index.get_index(db, scope_user_id)
+    costs = dict(db.query(Product.id, Product.purchase_price).filter(Product.user_id == scope_user_id).all())
+    for entry in entries:
+        entry["user_id"] = scope_user_id
+        entry["customer_id"] = None
+        entry["created_at"] = now
+
+    sale_ids = bulk_insert_with_ids(db, Sale, entries)
+
+    items, ledger = [], []
+    for sale_id, entry in zip(sale_ids, entries):
+        product_id = catalog.get(normalize_product_name(entry["product_name"]))
+        items.append({
+            "sale_id": sale_id,
+            "user_id": scope_user_id,
+            "product_id": product_id,
+            "item_name": entry["product_name"] or "",
+            "quantity": entry["quantity"],
+            "unit_price": entry["unit_price"],
+            "unit_cost": costs.get(product_id),
+            "line_revenue": entry["amount"],
+            "sale_date": entry["sale_date"],
+            "created_at": now,
+        })
+        ledger.append({
+            "user_id": scope_user_id,
+            "customer_id": None,
+            "type": "sale",
+            "amount": entry["amount"],
+            "balance_before": 0.0,
+            "balance_after": 0.0,
+            "reference_id": sale_id,
+            "description": entry["product_name"],
+            "created_at": entry["sale_date"],
+        })
+    bulk_insert(db, SaleItem, items)
+    bulk_insert(db, Transaction, ledger)
+    db.commit()
+    return len(sale_ids)
+
+def import_expenses(db: Session, scope_user_id: int, entries: List[dict]) -> int:
+    """Bulk-insert historical expenses (amount, category, description, expense_date) in one transaction."""
+    if not entries:
+        return 0
+    route_session(db, scope_user_id)
+    now = datetime.now()
+    for entry in entries:
+        entry["user_id"] = scope_user_id
+        entry["created_at"] = now
+    bulk_insert(db, Expense, entries)
+    db.commit()
+    return len(entries)
+
+def finish_import(db: Session, scope_user_id: int) -> None:
+    """Imported rows rewrite closed periods: retire their cached reports and snapshots once."""
+    _data_changed(db, scope_user_id, history=True)
+
+def _move_to_archive(db: Session, model, condition) -> int:
+    """Copy the `model` rows matching `condition` into its archive table and delete them; the caller commits."""
+    hot = model.__table__
+    archive = ARCHIVE_MODELS[model][0].__table__
+    names = [column.name for column in hot.columns]
+    db.execute(archive.insert().from_select(names, select(*(hot.c[name] for name in names)).where(condition)))
+    return db.execute(hot.delete().where(condition)).rowcount
+
+def archive_old_rows(db: Session, scope_user_id: int, before: datetime,
+                     batch_size: int = 5000) -> dict:
+    """
+    Move the scope's sales (with their line items) and expenses dated before
+    `before` into the archive tables, one transaction per batch of ids. The
+    hot tables are AUTOINCREMENT, so archived ids are never handed out again.
+    Tables created before that hand out max(id) + 1, so the newest row of each
+    table is never moved, nor the sale owning the newest line item (backfilled
+    items of old sales can hold the highest ids). Returns rows moved per table.
+    """
+    route_session(db, scope_user_id)
+    moved = {"sales": 0, "sale_items": 0, "expenses": 0}
+    newest_item = db.query(func.max(SaleItem.id)).scalar()
+    for model in (Sale, Expense):
+        hot = model.__table__
+        date_column = hot.c[ARCHIVE_MODELS[model][1]]
+        newest = db.query(func.max(hot.c.id)).scalar()
+        if newest is None:
+            continue
+        kept = hot.c.id < newest
+        if model is Sale and newest_item is not None:
+            kept &= hot.c.id != db.query(SaleItem.sale_id).filter(SaleItem.id == newest_item).scalar()
+        while True:
+            ids = [row_id for (row_id,) in db.query(hot.c.id).filter(
+                hot.c.user_id == scope_user_id,
+                date_column < before,
+                kept,
+            ).order_by(hot.c.id).limit(batch_size)]
+            if not ids:
+                break
+            if model is Sale:
+                moved["sale_items"] += _move_to_archive(db, SaleItem, SaleItem.__table__.c.sale_id.in_(ids))
+            moved[hot.name] += _move_to_archive(db, model, hot.c.id.in_(ids))
+            db.commit()
+    return moved
+
 # Expense CRUD
 def create_expense(db: Session, user_id: int, amount: float,
                    category: str, description: Optional[str] = None) -> Expense:
@@ -335,9 +935,32 @@ def create_expense(db: Session, user_id: int, amount: float,
     )
     db.add(expense)
     db.commit()
+    _data_changed(db, scope_user_id)
     db.refresh(expense)
     return expense
 
+def create_expenses_bulk(db: Session, user_id: int, entries: List[dict]) -> List[Expense]:
+    """Record a batch of expenses with one batched insert and one commit."""
+    if not entries:
+        return []
+
+    scope_user_id = _scope_user_id(db, user_id)
+    now = datetime.now()
+    expenses = [
+        Expense(
+            user_id=scope_user_id,
+            amount=entry["amount"],
+            category=entry["category"],
+            description=entry.get("description"),
+            expense_date=now,
+        )
+        for entry in entries
+    ]
+    db.add_all(expenses)
+    db.commit()
+    _data_changed(db, scope_user_id)
+    return expenses
+
 def get_today_expenses(db: Session, user_id: int) -> List[Expense]:
     today = date.today()
     scope_user_id = _scope_user_id(db, user_id)
@@ -350,21 +973,40 @@ def get_expenses_by_date(db: Session, user_id: int,
                         start_date: date, end_date: date) -> List[Expense]:
     start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
     scope_user_id = _scope_user_id(db, user_id)
-    return db.query(Expense).filter(
+    expenses = db.query(Expense).filter(
         Expense.user_id == scope_user_id,
         Expense.expense_date >= start_dt,
         Expense.expense_date <= end_dt
     ).order_by(desc(Expense.expense_date)).all()
+    return _with_archived(db, Expense, expenses, scope_user_id, start_dt, end_dt, "expense_date")
+
+def get_expense_rows_by_date(db: Session, user_id: int,
+                             start_date: date, end_date: date) -> List:
+    """
+    Column-only variant of get_expenses_by_date for aggregations.
+    Rows expose amount, category and expense_date and bypass the identity map.
+    """
+    start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
+    scope_user_id = _scope_user_id(db, user_id)
+    expenses = rows_source(db, Expense, scope_user_id, start_dt, end_dt).c
+    return db.query(expenses.amount, expenses.category, expenses.expense_date).filter(
+        expenses.user_id == scope_user_id,
+        expenses.expense_date >= start_dt,
+        expenses.expense_date <= end_dt
+    ).order_by(desc(expenses.expense_date)).all()
 
 def get_total_expenses(db: Session, user_id: int,
                       start_date: date, end_date: date) -> float:
     start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
     scope_user_id = _scope_user_id(db, user_id)
-    result = db.query(func.sum(Expense.amount)).filter(
-        Expense.user_id == scope_user_id,
-        Expense.expense_date >= start_dt,
-        Expense.expense_date <= end_dt
-    ).scalar()
+    expenses = rows_source(db, Expense, scope_user_id, start_dt, end_dt).c
+    result = db.execute(lambda_stmt(
+        lambda: select(func.sum(expenses.amount)).where(
+            expenses.user_id == scope_user_id,
+            expenses.expense_date >= start_dt,
+            expenses.expense_date <= end_dt
+        )
+    )).scalar()
     return result or 0.0
 
 # Product CRUD
@@ -383,10 +1025,18 @@ def create_product(db: Session, user_id: int, name: str,
         category=category
     )
     db.add(product)
+    db.flush()
+    on_stock_change(db, product, product.stock)  # created at or below min_stock
     db.commit()
+    _data_changed(db, scope_user_id)
     db.refresh(product)
+    product_name_index.add_product(db, product)
     return product
 
+def get_product_catalog(db: Session, user_id: int) -> ProductTrie:
+    """In-memory name/alias trie of the scope's active products (loaded once, then cached)."""
+    return product_name_index.get_index(db, _scope_user_id(db, user_id))
+
 def get_products(db: Session, user_id: int, 
                 active_only: bool = True) -> List[Product]:
     scope_user_id = _scope_user_id(db, user_id)
@@ -404,16 +1054,16 @@ def get_product(db: Session, user_id: int, product_id: int) -> Optional[Product]
 
 def update_product_stock(db: Session, product_id: int, 
                         quantity: int, operation: str = "add") -> Optional[Product]:
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.query(Product).filter(Product.id == product_id).with_for_update().first()
     if product:
         if operation == "add":
-            product.stock += quantity
+            _apply_stock_change(db, product, product.stock + quantity)
         elif operation == "subtract":
-            product.stock = max(0, product.stock - quantity)
+            _apply_stock_change(db, product, product.stock - quantity)
         elif operation == "set":
-            product.stock = max(0, quantity)
-        product.updated_at = datetime.now()
+            _apply_stock_change(db, product, quantity)
         db.commit()
+        _data_changed(db, product.user_id)
         db.refresh(product)
     return product
 
@@ -450,13 +1100,368 @@ def update_customer_credit(db: Session, customer_id: int,
                           amount: float, operation: str = "add") -> Optional[Customer]:
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if customer:
+        balance_before = customer.credit_balance or 0.0
         if operation == "add":
-            customer.credit_balance += amount
+            customer.credit_balance = balance_before + amount
         elif operation == "subtract":
-            customer.credit_balance = max(0, customer.credit_balance - amount)
+            customer.credit_balance = max(0, balance_before - amount)
         elif operation == "set":
             customer.credit_balance = max(0, amount)
         customer.updated_at = datetime.now()
+        _append_transaction(
+            db,
+            user_id=customer.user_id,
+            customer_id=customer.id,
+            type=LEDGER_OPERATION_TYPES.get(operation, "adjustment"),
+            amount=abs(customer.credit_balance - balance_before),
+            balance_before=balance_before,
+            balance_after=customer.credit_balance,
+        )
         db.commit()
+        _data_changed(db, customer.user_id)
         db.refresh(customer)
     return customer
+
+
+# Ledger CRUD
+LEDGER_OPERATION_TYPES = {
+    "add": "credit",
+    "subtract": "payment",
+    "set": "adjustment",
+}
+
+
+def _append_transaction(
+    db: Session,
+    user_id: int,
+    customer_id: Optional[int],
+    type: str,
+    amount: float,
+    balance_before: float,
+    balance_after: float,
+    reference_id: Optional[int] = None,
+    description: Optional[str] = None,
+) -> Transaction:
+    """
+    Stage an immutable ledger row on the caller's session.
+    The caller commits, so the ledger entry lands in the same transaction as the mutation.
+    """
+    entry = Transaction(
+        user_id=user_id,
+        customer_id=customer_id,
+        type=type,
+        amount=amount,
+        balance_before=balance_before,
+        balance_after=balance_after,
+        reference_id=reference_id,
+        description=description,
+    )
+    db.add(entry)
+    return entry
+
+
+def get_latest_transaction(db: Session, user_id: int,
+                           customer_id: Optional[int]) -> Optional[Transaction]:
+    scope_user_id = _scope_user_id(db, user_id)
+    return db.query(Transaction).filter(
+        Transaction.user_id == scope_user_id,
+        Transaction.customer_id == customer_id,
+    ).order_by(desc(Transaction.created_at), desc(Transaction.id)).first()
+
+
+def get_customer_balance(db: Session, user_id: int, customer_id: int) -> float:
+    """Current credit balance, read from the newest ledger row."""
+    latest = get_latest_transaction(db, user_id, customer_id)
+    if latest:
+        return latest.balance_after
+
+    customer = get_customer(db, user_id, customer_id)
+    return customer.credit_balance if customer else 0.0
+
+
+def get_customer_balance_as_of(db: Session, user_id: int, customer_id: int,
+                               as_of: date | datetime) -> float:
+    """Credit balance at the end of ``as_of`` (a date) or at the exact datetime."""
+    _, as_of_dt = _normalize_datetime_range(as_of, as_of)
+    scope_user_id = _scope_user_id(db, user_id)
+    base = db.query(Transaction).filter(
+        Transaction.user_id == scope_user_id,
+        Transaction.customer_id == customer_id,
+    )
+
+    previous = base.filter(Transaction.created_at <= as_of_dt).order_by(
+        desc(Transaction.created_at), desc(Transaction.id)
+    ).first()
+    if previous:
+        return previous.balance_after
+
+    # Nothing before the cut-off: the opening balance of the first later entry applies.
+    following = base.filter(Transaction.created_at > as_of_dt).order_by(
+        Transaction.created_at, Transaction.id
+    ).first()
+    if following:
+        return following.balance_before
+
+    customer = get_customer(db, user_id, customer_id)
+    return customer.credit_balance if customer else 0.0
+
+
+def get_customer_transactions(db: Session, user_id: int, customer_id: int,
+                              limit: int = 20) -> List[Transaction]:
+    scope_user_id = _scope_user_id(db, user_id)
+    return db.query(Transaction).filter(
+        Transaction.user_id == scope_user_id,
+        Transaction.customer_id == customer_id,
+    ).order_by(desc(Transaction.created_at), desc(Transaction.id)).limit(limit).all()
+
+
+# Report snapshot CRUD
+def get_report_snapshot(db: Session, user_id: int, period_type: str,
+                        period_start: date) -> Optional[ReportSnapshot]:
+    scope_user_id = _scope_user_id(db, user_id)
+    return db.query(ReportSnapshot).filter(
+        ReportSnapshot.user_id == scope_user_id,
+        ReportSnapshot.period_type == period_type,
+        ReportSnapshot.period_start == period_start,
+    ).first()
+
+def get_report_snapshots(db: Session, user_id: int, start_date: date, end_date: date,
+                         period_types: Optional[Sequence[str]] = None) -> List[ReportSnapshot]:
+    """Snapshots lying entirely inside [start_date, end_date]."""
+    scope_user_id = _scope_user_id(db, user_id)
+    query = db.query(ReportSnapshot).filter(
+        ReportSnapshot.user_id == scope_user_id,
+        ReportSnapshot.period_start >= start_date,
+        ReportSnapshot.period_end <= end_date,
+    )
+    if period_types:
+        query = query.filter(ReportSnapshot.period_type.in_(period_types))
+    return query.order_by(ReportSnapshot.period_start).all()
+
+def get_report_snapshot_keys(db: Session, since: date) -> set:
+    """(scope_user_id, period_type, period_start) of every snapshot starting on or after `since`."""
+    keys = set()
+    for _ in iter_shards(db):
+        keys.update(tuple(row) for row in db.query(
+            ReportSnapshot.user_id, ReportSnapshot.period_type, ReportSnapshot.period_start
+        ).filter(ReportSnapshot.period_start >= since))
+    return keys
+
+def save_report_snapshot(db: Session, scope_user_id: int, period_type: str,
+                         period_start: date, period_end: date, **values) -> ReportSnapshot:
+    """Insert or replace the snapshot of one period; the caller commits."""
+    route_session(db, scope_user_id)
+    snapshot = db.query(ReportSnapshot).filter(
+        ReportSnapshot.user_id == scope_user_id,
+        ReportSnapshot.period_type == period_type,
+        ReportSnapshot.period_start == period_start,
+    ).first()
+    if snapshot is None:
+        snapshot = ReportSnapshot(
+            user_id=scope_user_id,
+            period_type=period_type,
+            period_start=period_start,
+        )
+        db.add(snapshot)
+    snapshot.period_end = period_end
+    snapshot.created_at = datetime.now()
+    for field, value in values.items():
+        setattr(snapshot, field, value)
+    return snapshot
+
+def delete_report_snapshots(db: Session, scope_user_id: int) -> int:
+    route_session(db, scope_user_id)
+    deleted = db.query(ReportSnapshot).filter(
+        ReportSnapshot.user_id == scope_user_id
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def get_daily_totals(db: Session, user_id: int,
+                     start_date: date, end_date: date) -> dict:
+    """{day: [sales, expenses]} for days with activity, from two grouped queries."""
+    start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
+    scope_user_id = _scope_user_id(db, user_id)
+    totals = {}
+    for position, (model, date_name) in enumerate(((Sale, "sale_date"), (Expense, "expense_date"))):
+        source = rows_source(db, model, scope_user_id, start_dt, end_dt).c
+        column = source[date_name]
+        day = func.date(column)
+        rows = db.query(day, func.sum(source.amount)).filter(
+            source.user_id == scope_user_id,
+            column >= start_dt,
+            column <= end_dt,
+        ).group_by(day).all()
+        for value, amount in rows:
+            key = value if isinstance(value, date) else date.fromisoformat(value)
+            totals.setdefault(key, [0.0, 0.0])[position] = amount or 0.0
+    return totals
+
+def _month_bucket(db: Session, column):
+    """'YYYY-MM' of a timestamp column in the bound database's dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+def iter_monthly_totals(db: Session, user_id: int, start_date: date, end_date: date,
+                        batch_size: int = 120) -> Iterator[tuple]:
+    """
+    (month_start, sales, expenses) for each month with activity, oldest first.
+    One grouped query over sales and expenses, streamed from the cursor so
+    multi-year ranges never hold more than a batch of months.
+    """
+    start_dt, end_dt = _normalize_datetime_range(start_date, end_date)
+    scope_user_id = _scope_user_id(db, user_id)
+    sale_rows = rows_source(db, Sale, scope_user_id, start_dt, end_dt).c
+    expense_rows = rows_source(db, Expense, scope_user_id, start_dt, end_dt).c
+    sales = select(
+        _month_bucket(db, sale_rows.sale_date).label("month"),
+        sale_rows.amount.label("sales"),
+        literal(0.0).label("expenses"),
+    ).where(sale_rows.user_id == scope_user_id, sale_rows.sale_date >= start_dt, sale_rows.sale_date <= end_dt)
+    expenses = select(
+        _month_bucket(db, expense_rows.expense_date).label("month"),
+        literal(0.0).label("sales"),
+        expense_rows.amount.label("expenses"),
+    ).where(
+        expense_rows.user_id == scope_user_id,
+        expense_rows.expense_date >= start_dt,
+        expense_rows.expense_date <= end_dt,
+    )
+    combined = union_all(sales, expenses).subquery()
+    stmt = select(
+        combined.c.month, func.sum(combined.c.sales), func.sum(combined.c.expenses)
+    ).group_by(combined.c.month).order_by(combined.c.month)
+
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for month, sales_total, expenses_total in result:
+        yield date.fromisoformat(f"{month}-01"), sales_total or 0.0, expenses_total or 0.0
+
+
+# Export job CRUD
+def create_export_job(db: Session, business_id: int, user_id: int,
+                      export_type: str, params: Optional[dict] = None) -> ExportJob:
+    """
+    Queue an export; the same member's identical request still queued or
+    running is returned instead. Only the requester is sent the file, so
+    other members' requests are never merged into it.
+    """
+    params_json = json.dumps(params, sort_keys=True) if params else None
+    existing = db.query(ExportJob).filter(
+        ExportJob.business_id == business_id,
+        ExportJob.requested_by_user_id == user_id,
+        ExportJob.export_type == export_type,
+        ExportJob.params_json.is_(None) if params_json is None else ExportJob.params_json == params_json,
+        ExportJob.status.in_(("queued", "running")),
+    ).first()
+    if existing:
+        return existing
+
+    job = ExportJob(
+        business_id=business_id,
+        requested_by_user_id=user_id,
+        export_type=export_type,
+        params_json=params_json,
+        status="queued",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_export_job(db: Session, job_id: int) -> Optional[ExportJob]:
+    return db.query(ExportJob).filter(ExportJob.id == job_id).first()
+
+def claim_export_job(db: Session) -> Optional[ExportJob]:
+    """
+    Move the oldest queued job to running and return it, or None if the queue is empty.
+    PostgreSQL skips rows other workers hold locked; elsewhere a conditional UPDATE
+    makes sure only one worker wins each job.
+    """
+    now = datetime.now()
+    if db.get_bind().dialect.name == "postgresql":
+        job = db.query(ExportJob).filter(
+            ExportJob.status == "queued"
+        ).order_by(ExportJob.id).with_for_update(skip_locked=True).first()
+        if job is None:
+            db.rollback()
+            return None
+        job.status = "running"
+        job.started_at = now
+        db.commit()
+        return job
+
+    while True:
+        candidate = db.query(ExportJob.id).filter(
+            ExportJob.status == "queued"
+        ).order_by(ExportJob.id).first()
+        if candidate is None:
+            return None
+        claimed = db.query(ExportJob).filter(
+            ExportJob.id == candidate.id,
+            ExportJob.status == "queued",
+        ).update({"status": "running", "started_at": now}, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return get_export_job(db, candidate.id)
+
+def complete_export_job(db: Session, job_id: int, file_path: str, checksum: str,
+                        row_count: int, ttl_hours: int) -> bool:
+    """
+    Mark a running job completed. Returns False if it is no longer running
+    (fail_stale_export_jobs gave up on it meanwhile), leaving it untouched.
+    """
+    now = datetime.now()
+    applied = db.query(ExportJob).filter(
+        ExportJob.id == job_id,
+        ExportJob.status == "running",
+    ).update({
+        "status": "completed",
+        "file_path": file_path,
+        "checksum": checksum,
+        "row_count": row_count,
+        "completed_at": now,
+        "expires_at": now + timedelta(hours=ttl_hours),
+    }, synchronize_session=False)
+    db.commit()
+    return applied == 1
+
+def fail_export_job(db: Session, job_id: int, error_message: str) -> bool:
+    """
+    Mark a running job failed. Returns False if it is no longer running
+    (already failed or completed elsewhere), leaving it untouched.
+    """
+    applied = db.query(ExportJob).filter(
+        ExportJob.id == job_id,
+        ExportJob.status == "running",
+    ).update({
+        "status": "failed",
+        "error_message": error_message[:1000],
+        "completed_at": datetime.now(),
+    }, synchronize_session=False)
+    db.commit()
+    return applied == 1
+
+def fail_stale_export_jobs(db: Session, timeout_minutes: int) -> List[int]:
+    """
+    Jobs left running by a crashed worker are marked failed after the timeout.
+    Returns the ids this call failed, so their requesters can be told.
+    """
+    cutoff = datetime.now() - timedelta(minutes=timeout_minutes)
+    stale = db.query(ExportJob.id).filter(
+        ExportJob.status == "running",
+        ExportJob.started_at < cutoff,
+    ).order_by(ExportJob.id).all()
+    return [row.id for row in stale if fail_export_job(db, row.id, "Worker timed out")]
+
+def pop_expired_export_files(db: Session) -> List[str]:
+    """Detach the files of expired jobs and return their paths for deletion."""
+    jobs = db.query(ExportJob).filter(
+        ExportJob.expires_at < datetime.now(),
+        ExportJob.file_path.isnot(None),
+    ).all()
+    paths = [job.file_path for job in jobs]
+    for job in jobs:
+        job.file_path = None
+    db.commit()
+    return paths
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
@@ -74,6 +74,7 @@ class ActivityLog(Base):
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = {"sqlite_autoincrement": True}  # archived ids are never handed out again
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False, index=True)
@@ -90,8 +91,31 @@ class Sale(Base):
     def __repr__(self):
         return f"<Sale(id={self.id}, amount={self.amount}, product='{self.product_name}')>"
 
+class SaleItem(Base):
+    __tablename__ = "sale_items"
+    __table_args__ = (
+        Index("ix_sale_items_user_date_product", "user_id", "sale_date", "product_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=True, index=True)  # NULL for non-catalog items
+    item_name = Column(String(200), nullable=False)
+    quantity = Column(Integer, nullable=False, default=1)
+    unit_price = Column(Float, nullable=False)
+    unit_cost = Column(Float, nullable=True)  # purchase_price snapshot at sale time
+    line_revenue = Column(Float, nullable=False)
+    sale_date = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f"<SaleItem(id={self.id}, sale_id={self.sale_id}, product_id={self.product_id})>"
+
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = {"sqlite_autoincrement": True}
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False, index=True)
@@ -104,6 +128,75 @@ class Expense(Base):
     def __repr__(self):
         return f"<Expense(id={self.id}, amount={self.amount}, category='{self.category}')>"
 
+class SaleArchive(Base):
+    """Sales moved out of `sales` by the archival job; ids are kept, so ledger references still hold."""
+    __tablename__ = "sales_archive"
+    __table_args__ = (
+        Index("ix_sales_archive_user_date", "user_id", "sale_date"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    product_name = Column(String(200))
+    quantity = Column(Integer, default=1)
+    unit_price = Column(Float)
+    customer_id = Column(Integer, nullable=True)
+    payment_method = Column(String(50), default="cash")
+    notes = Column(Text)
+    sale_date = Column(DateTime)
+    created_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<SaleArchive(id={self.id}, amount={self.amount}, product='{self.product_name}')>"
+
+class SaleItemArchive(Base):
+    """Line items of archived sales."""
+    __tablename__ = "sale_items_archive"
+    __table_args__ = (
+        Index("ix_sale_items_archive_user_date_product", "user_id", "sale_date", "product_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    sale_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
+    product_id = Column(Integer, nullable=True)
+    item_name = Column(String(200), nullable=False)
+    quantity = Column(Integer, nullable=False, default=1)
+    unit_price = Column(Float, nullable=False)
+    unit_cost = Column(Float, nullable=True)
+    line_revenue = Column(Float, nullable=False)
+    sale_date = Column(DateTime)
+    created_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<SaleItemArchive(id={self.id}, sale_id={self.sale_id}, product_id={self.product_id})>"
+
+class ExpenseArchive(Base):
+    """Expenses moved out of `expenses` by the archival job."""
+    __tablename__ = "expenses_archive"
+    __table_args__ = (
+        Index("ix_expenses_archive_user_date", "user_id", "expense_date"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    category = Column(String(100), nullable=False)
+    description = Column(Text)
+    expense_date = Column(DateTime)
+    created_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ExpenseArchive(id={self.id}, amount={self.amount}, category='{self.category}')>"
+
+# Hot model -> archive model and the timestamp archival is keyed on
+ARCHIVE_MODELS = {
+    Sale: (SaleArchive, "sale_date"),
+    SaleItem: (SaleItemArchive, "sale_date"),
+    Expense: (ExpenseArchive, "expense_date"),
+}
+
 class Product(Base):
     __tablename__ = "products"
     
@@ -125,6 +218,26 @@ class Product(Base):
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', stock={self.stock})>"
 
+class LowStockAlert(Base):
+    """Low-stock alert state, one row per product; only `pending` rows are due for notification."""
+    __tablename__ = "low_stock_alerts"
+    __table_args__ = (
+        UniqueConstraint("user_id", "product_id", name="uq_low_stock_alerts_user_product"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, notified, resolved
+    stock = Column(Integer, nullable=False)
+    min_stock = Column(Integer, nullable=False)
+    notified_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<LowStockAlert(id={self.id}, product_id={self.product_id}, status='{self.status}')>"
+
 class Customer(Base):
     __tablename__ = "customers"
     
@@ -146,12 +259,16 @@ class Customer(Base):
         return f"<Customer(id={self.id}, name='{self.name}', balance={self.credit_balance})>"
 
 class Transaction(Base):
+    """Append-only ledger row; balances track the customer's outstanding credit."""
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_user_customer_created", "user_id", "customer_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False, index=True)
     customer_id = Column(Integer, nullable=True)
-    type = Column(String(50), nullable=False)  # sale, expense, payment, credit
+    type = Column(String(50), nullable=False)  # sale, expense, payment, credit, adjustment
     amount = Column(Float, nullable=False)
     balance_before = Column(Float, nullable=False)
     balance_after = Column(Float, nullable=False)
@@ -161,3 +278,86 @@ class Transaction(Base):
     
     def __repr__(self):
         return f"<Transaction(id={self.id}, type='{self.type}', amount={self.amount})>"
+
+
+class ReportSnapshot(Base):
+    """Totals and rendered report of a closed day, week or month; written once the period ends."""
+    __tablename__ = "report_snapshots"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period_type", "period_start", name="uq_report_snapshots_scope_period"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    period_type = Column(String(10), nullable=False)  # day, week, month
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    total_sales = Column(Float, default=0.0)
+    total_expenses = Column(Float, default=0.0)
+    sales_count = Column(Integer, default=0)
+    expense_count = Column(Integer, default=0)
+    payload = Column(Text)  # JSON: breakdowns by product and expense category
+    rendered = Column(Text)
+    created_at = Column(DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f"<ReportSnapshot(user_id={self.user_id}, {self.period_type} {self.period_start})>"
+
+class ReportEpoch(Base):
+    """
+    Per-scope history epoch of the report cache. Kept in the database rather
+    than the cache backend, so history rewritten by another process (CLI
+    import, restore) retires the bot's cached reports too.
+    """
+    __tablename__ = "report_epochs"
+
+    scope_user_id = Column(Integer, primary_key=True, autoincrement=False)
+    history = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<ReportEpoch(scope_user_id={self.scope_user_id}, history={self.history})>"
+
+class ExportJob(Base):
+    """Queued export, claimed and rendered by the export worker; the file is kept until expires_at."""
+    __tablename__ = "export_jobs"
+    __table_args__ = (
+        Index("ix_export_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False, index=True)
+    requested_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    export_type = Column(String(40), nullable=False)  # csv_sales, csv_expenses, csv_inventory, csv_customers
+    params_json = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    file_path = Column(Text, nullable=True)
+    checksum = Column(String(128), nullable=True)  # sha256 of the file
+    row_count = Column(Integer, nullable=True)
+    error_message = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ExportJob(id={self.id}, type='{self.export_type}', status='{self.status}')>"
+
+class TenantShard(Base):
+    """Shard holding a business's data when DB_SHARD_COUNT > 1; scopes without a row live on shard 0."""
+    __tablename__ = "tenant_shards"
+
+    scope_user_id = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(Integer, nullable=False, default=0)
+    moved_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<TenantShard(scope_user_id={self.scope_user_id}, shard={self.shard})>"
+
+# Tables keyed by scope user id; with sharding on they live in the scope's shard.
+# Users, businesses, memberships, activity logs, export jobs and shard assignments
+# stay in the main database.
+SHARDED_TABLES = frozenset({
+    "products", "customers", "sales", "sale_items", "expenses", "transactions",
+    "low_stock_alerts", "report_snapshots", "sales_archive", "sale_items_archive", "expenses_archive",
+})
@@ -7,6 +7,7 @@ from app.database.crud import (
     get_customer, update_customer_credit
 )
 from app.database.connection import get_db_session
+from app.amounts import to_amount
 from config import messages, settings
 from datetime import datetime
 
@@ -186,7 +187,7 @@ async def cmd_credit(message: types.Message, state: FSMContext):
         
         customer_name = args[1]
         try:
-            amount = float(args[2])
+            amount = to_amount(args[2])
         except ValueError:
             await message.answer("❌ Amount must be a number")
             return
@@ -2,8 +2,10 @@ from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from app.database.crud import get_user, create_expense, get_today_expenses
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from app.database.crud import get_user, create_expense, create_expenses_bulk, get_today_expenses
 from app.database.connection import SessionLocal, get_db_session
+from app.validators import validate_amount
 from app.services.parser import Parser
 from config import messages, settings
 from datetime import datetime
@@ -20,9 +22,20 @@ MENU_BUTTONS = {
     "❓ Help",
 }
 
+BULK_PREVIEW_LIMIT = 20
+BULK_EXPENSE_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✅ Save all", callback_data="bulk_expense:confirm"),
+            InlineKeyboardButton(text="✖ Cancel", callback_data="bulk_expense:cancel"),
+        ]
+    ]
+)
+
 class ExpenseStates(StatesGroup):
     waiting_for_expense = State()
     waiting_for_category = State()
+    confirming_bulk = State()
 
 @router.message(Command("expense"))
 @router.message(F.text.regexp(r'^💸 Record Expense$'))
@@ -39,7 +52,8 @@ async def cmd_expense(message: types.Message, state: FSMContext):
         "💸 *Record an Expense*\n\n"
         "Enter expense details:\n"
         "• `500 supplies` - With category\n"
-        "• Or just the amount to select category later\n\n"
+        "• Or just the amount to select category later\n"
+        "• Paste several lines to record a batch at once\n\n"
         "*Common categories:* supplies, rent, salary, transport, utilities",
         parse_mode="Markdown"
     )
@@ -70,6 +84,10 @@ async def process_expense(message: types.Message, state: FSMContext, db=None):
         user = get_user(db, message.from_user.id)
         text = message.text.strip()
         
+        if "\n" in text:
+            await _preview_bulk_expenses(message, state, text)
+            return
+        
         # Try to parse with parser
         parser = Parser()
         amount, category = parser.parse_expense(text)
@@ -106,9 +124,9 @@ async def process_expense(message: types.Message, state: FSMContext, db=None):
                 await state.set_state(ExpenseStates.waiting_for_category)
                 return
         
-        elif text.replace('.', '').isdigit():
-            # Only number provided
-            amount = float(text)
+        elif validate_amount(text)[0]:
+            # Only number provided (positive, like the parser requires)
+            amount = validate_amount(text)[1]
             await state.update_data(amount=amount)
             await message.answer(
                 f"Amount: {settings.CURRENCY} {amount:,.0f}\n"
@@ -129,6 +147,78 @@ async def process_expense(message: types.Message, state: FSMContext, db=None):
         if should_close_db:
             db.close()
 
+async def _preview_bulk_expenses(message: types.Message, state: FSMContext, text: str):
+    """Parse a multi-line block and ask for confirmation before saving it."""
+    parsed, failed = Parser.parse_expense_lines(text)
+    if not parsed:
+        await message.answer(
+            "❌ I couldn't understand any of those lines.\n"
+            "Put one expense per line, e.g. `500 supplies`",
+            parse_mode="Markdown"
+        )
+        return
+    
+    entries = [
+        {"amount": amount, "category": category.lower(), "description": f"{category.lower()} expense"}
+        for amount, category in parsed
+    ]
+    await state.update_data(bulk_expenses=entries)
+    await state.set_state(ExpenseStates.confirming_bulk)
+    
+    total = sum(entry["amount"] for entry in entries)
+    summary = f"🧾 *{len(entries)} expenses ready to save*\n\n"
+    for entry in entries[:BULK_PREVIEW_LIMIT]:
+        summary += f"• {entry['category']}: {settings.CURRENCY} {entry['amount']:,.0f}\n"
+    if len(entries) > BULK_PREVIEW_LIMIT:
+        summary += f"... and {len(entries) - BULK_PREVIEW_LIMIT} more\n"
+    summary += f"\n*Total:* {settings.CURRENCY} {total:,.0f}\n"
+    
+    if failed:
+        summary += f"\n⚠️ Skipped {len(failed)} unreadable line(s):\n"
+        for line in failed[:5]:
+            summary += f"• {line}\n"
+    
+    await message.answer(summary, parse_mode="Markdown", reply_markup=BULK_EXPENSE_KEYBOARD)
+
+@router.callback_query(ExpenseStates.confirming_bulk, F.data == "bulk_expense:confirm")
+async def cb_confirm_bulk_expenses(callback: types.CallbackQuery, state: FSMContext):
+    """Save a confirmed batch of expenses in a single transaction"""
+    data = await state.get_data()
+    entries = data.get("bulk_expenses", [])
+    
+    with get_db_session() as db:
+        user = get_user(db, callback.from_user.id)
+        if not user:
+            await callback.answer("Please use /start first.", show_alert=True)
+            return
+        expenses = create_expenses_bulk(db, user.id, entries)
+    
+    await state.clear()
+    await callback.message.edit_reply_markup(reply_markup=None)
+    total = sum(entry["amount"] for entry in entries)
+    await callback.message.answer(
+        f"✅ {len(expenses)} expenses recorded!\n"
+        f"• Total: {settings.CURRENCY} {total:,.0f}\n"
+        f"• Time: {datetime.now().strftime('%H:%M')}"
+    )
+    await callback.answer()
+
+@router.callback_query(ExpenseStates.confirming_bulk, F.data == "bulk_expense:cancel")
+async def cb_cancel_bulk_expenses(callback: types.CallbackQuery, state: FSMContext):
+    await state.clear()
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.message.answer("Batch discarded. Nothing was saved.")
+    await callback.answer()
+
+@router.message(ExpenseStates.confirming_bulk)
+async def process_bulk_expense_pending(message: types.Message, state: FSMContext):
+    """Any other message while a batch awaits confirmation discards it"""
+    await state.clear()
+    if message.text and message.text.startswith('/'):
+        await message.answer("Pending batch discarded. Run your command again.")
+        return
+    await message.answer("Pending batch discarded. Nothing was saved.")
+
 @router.message(ExpenseStates.waiting_for_category)
 async def process_expense_category(message: types.Message, state: FSMContext, db=None):
     """Process expense category"""
@@ -0,0 +1,92 @@
+import asyncio
+import os
+from datetime import datetime
+
+from aiogram import Router, types
+from aiogram.filters import Command
+from aiogram.types import FSInputFile
+
+from app.database.crud import create_export_job, get_user
+from app.database.connection import get_db_session
+from app.services.export_jobs import export_type_for
+from app.services.exporter import EXPORT_DATASETS, Exporter
+from config import settings
+
+router = Router()
+
+EXPORT_USAGE = (
+    "📤 *Export*\n\n"
+    "`/export <sales|expenses|inventory|customers> [csv] [from to]`\n\n"
+    "Examples:\n"
+    "`/export sales csv 2026-03-01 2026-03-31`\n"
+    "`/export inventory`\n\n"
+    "Files are gzip-compressed CSV."
+)
+
+
+def parse_export_command(text: str):
+    """
+    `/export sales [csv] [YYYY-MM-DD YYYY-MM-DD]` -> (dataset, start, end);
+    the dates are optional and only apply to sales and expenses.
+    Returns None if the command is not understood.
+    """
+    args = (text or "").split()[1:]
+    if not args or args[0].lower() not in EXPORT_DATASETS:
+        return None
+    dataset, rest = args[0].lower(), args[1:]
+    if rest and rest[0].lower() == "csv":
+        rest = rest[1:]
+    if not rest:
+        return dataset, None, None
+    if len(rest) != 2:
+        return None
+    try:
+        start, end = (datetime.strptime(value, "%Y-%m-%d").date() for value in rest)
+    except ValueError:
+        return None
+    return (dataset, start, end) if start <= end else (dataset, end, start)
+
+
+@router.message(Command("export"))
+async def cmd_export(message: types.Message, business=None):
+    """
+    Stream a dataset to gzip CSV and send it as a document: on a worker thread,
+    or through the export worker's queue when EXPORT_BACKGROUND is set.
+    """
+    request = parse_export_command(message.text)
+    if request is None:
+        await message.answer(EXPORT_USAGE, parse_mode="Markdown")
+        return
+    dataset, start_date, end_date = request
+
+    with get_db_session() as db:
+        user = get_user(db, message.from_user.id)
+        if not user:
+            await message.answer("❌ Please use /start first.")
+            return
+        user_id = user.id
+
+        if settings.EXPORT_BACKGROUND and business is not None:
+            params = {"start": start_date.isoformat(), "end": end_date.isoformat()} if start_date else None
+            job = create_export_job(db, business.id, user_id, export_type_for(dataset), params)
+            await message.answer(f"📥 Export queued (job #{job.id}). I'll send the file when it's ready.")
+            return
+
+    await message.answer(f"⏳ Preparing {dataset} export...")
+    try:
+        path, rows = await asyncio.to_thread(
+            Exporter.export_to_file, user_id, dataset, start_date, end_date
+        )
+    except Exception as e:
+        print(f"Error exporting {dataset} for user {user_id}: {e}")
+        await message.answer("❌ Export failed. Please try again.")
+        return
+
+    try:
+        period = f" ({start_date} to {end_date})" if start_date else ""
+        await message.answer_document(
+            FSInputFile(path, filename=os.path.basename(path)),
+            caption=f"📤 {dataset.title()}{period}: {rows:,} row(s)",
+        )
+    finally:
+        os.remove(path)
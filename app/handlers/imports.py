@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from app.services.importer import IMPORT_COLUMNS, import_file
+from app.services.permissions import has_permission
+
+router = Router()
+
+IMPORT_USAGE = (
+    "📥 *Import*\n\n"
+    "Send a CSV file with the caption `/import sales` or `/import expenses`.\n\n"
+    "Sales columns: `date, amount, product[, quantity, payment_method, notes]`\n"
+    "Expenses columns: `date, amount, category[, description]`\n\n"
+    "Dates as `YYYY-MM-DD` or `DD/MM/YYYY`. Imported sales don't change stock."
+)
+
+
+def parse_import_command(text: str):
+    """`/import sales|expenses` -> kind, or None if not understood."""
+    args = (text or "").split()[1:]
+    if len(args) != 1 or args[0].lower() not in IMPORT_COLUMNS:
+        return None
+    return args[0].lower()
+
+
+@router.message(Command("import"))
+async def cmd_import(message: types.Message, user=None, role: str = "staff"):
+    """Import historical sales or expenses from a CSV sent with the command as its caption."""
+    # Captions bypass the middleware's text-based permission check
+    if not has_permission(role, "import:create"):
+        await message.answer(f"❌ Permission denied. Your role ({role}) cannot import data.")
+        return
+
+    kind = parse_import_command(message.text or message.caption)
+    if kind is None or message.document is None:
+        await message.answer(IMPORT_USAGE, parse_mode="Markdown")
+        return
+    if user is None:
+        await message.answer("❌ Please use /start first.")
+        return
+
+    await message.answer(f"⏳ Importing {kind}...")
+    handle, path = tempfile.mkstemp(suffix=".csv")
+    os.close(handle)
+    try:
+        await message.bot.download(message.document, destination=path)
+        result = await asyncio.to_thread(import_file, user.id, kind, path)
+    except (ValueError, UnicodeDecodeError) as e:
+        await message.answer(f"❌ Could not import this file: {e}")
+        return
+    except Exception as e:
+        print(f"Error importing {kind} for user {user.id}: {e}")
+        await message.answer("❌ Import failed. Please try again.")
+        return
+    finally:
+        os.remove(path)
+
+    reply = f"✅ Imported {result.imported:,} {kind} row(s)"
+    if result.first_date:
+        reply += f" from {result.first_date} to {result.last_date}"
+    if result.rejected:
+        reply += f"\n⚠️ Skipped {result.rejected:,} row(s):\n"
+        reply += "\n".join(f"• line {line}: {reason}" for line, reason in result.errors)
+    await message.answer(reply)
@@ -7,6 +7,7 @@ from app.database.crud import (
     get_product, update_product_stock
 )
 from app.database.connection import get_db_session
+from app.amounts import to_amount
 from config import messages, settings
 
 router = Router()
@@ -41,7 +42,7 @@ async def cmd_add_product(message: types.Message, state: FSMContext):
             # Parse arguments: /add_product name price stock
             try:
                 name = args[1]
-                price = float(args[2]) if len(args) > 2 else None
+                price = to_amount(args[2]) if len(args) > 2 else None
                 stock = int(args[3]) if len(args) > 3 else 0
                 
                 product = create_product(
@@ -98,12 +99,12 @@ async def process_product_input(message: types.Message, state: FSMContext):
             if len(parts) >= 3:
                 # Name, price, stock
                 name = ' '.join(parts[:-2])
-                price = float(parts[-2])
+                price = to_amount(parts[-2])
                 stock = int(parts[-1])
             elif len(parts) == 2:
                 # Name and price
                 name = parts[0]
-                price = float(parts[1])
+                price = to_amount(parts[1])
                 stock = 0
             else:
                 # Just name
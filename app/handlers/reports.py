@@ -6,7 +6,8 @@ from app.database.crud import (
     get_user, get_sales_by_date, get_total_sales,
     get_total_expenses
 )
-from app.database.connection import get_db_session
+from app.database.connection import get_read_session
+from app.services.report_cache import report_cache
 from app.services.reports import ReportGenerator
 from config import settings
 from datetime import datetime, date, timedelta
@@ -23,13 +24,53 @@ MENU_BUTTONS = {
     "❓ Help",
 }
 
+INSIGHTS_DEFAULT_DAYS = 7
+INSIGHTS_MAX_DAYS = 366
+
 class ReportStates(StatesGroup):
     waiting_for_date = State()
 
+def parse_insights_horizon(text: str, today: date = None):
+    """
+    Horizon for /insights: a day count (`/insights 30`) or `ytd`.
+    Returns (days, label), or None if the argument is not understood.
+    """
+    args = (text or "").split(maxsplit=1)
+    if len(args) < 2 or not args[0].startswith("/"):
+        return INSIGHTS_DEFAULT_DAYS, None
+
+    argument = args[1].strip().lower()
+    if argument == "ytd":
+        today = today or date.today()
+        return (today - date(today.year, 1, 1)).days + 1, "Year to Date"
+    if argument.isdigit() and 1 <= int(argument) <= INSIGHTS_MAX_DAYS:
+        return int(argument), None
+    return None
+
+def parse_margins_period(text: str, today: date = None):
+    """
+    Period for /margins: this month so far by default, `last` for the previous
+    month or a day count (`/margins 30`).
+    Returns (start, end, label), or None if the argument is not understood.
+    """
+    today = today or date.today()
+    args = (text or "").split(maxsplit=1)
+    if len(args) < 2:
+        return date(today.year, today.month, 1), today, today.strftime('%B %Y')
+
+    argument = args[1].strip().lower()
+    if argument == "last":
+        end = date(today.year, today.month, 1) - timedelta(days=1)
+        return date(end.year, end.month, 1), end, end.strftime('%B %Y')
+    if argument.isdigit() and 1 <= int(argument) <= INSIGHTS_MAX_DAYS:
+        days = int(argument)
+        return today - timedelta(days=days - 1), today, f"{days} Days"
+    return None
+
 @router.message(Command("report"))
 async def cmd_report(message: types.Message):
     """Generate daily report"""
-    with get_db_session() as db:
+    with get_read_session() as db:
         user = get_user(db, message.from_user.id)
         
         if not user:
@@ -40,7 +81,7 @@ async def cmd_report(message: types.Message):
         today = date.today()
         
         # Generate report
-        generator = ReportGenerator()
+        generator = ReportGenerator(cache=report_cache)
         report = generator.generate_daily_report(db, user.id, today)
         
         await message.answer(report, parse_mode="Markdown")
@@ -48,7 +89,7 @@ async def cmd_report(message: types.Message):
 @router.message(Command("weekly"))
 async def cmd_weekly(message: types.Message):
     """Generate weekly report"""
-    with get_db_session() as db:
+    with get_read_session() as db:
         user = get_user(db, message.from_user.id)
         
         if not user:
@@ -61,7 +102,7 @@ async def cmd_weekly(message: types.Message):
         week_end = week_start + timedelta(days=6)  # Sunday
         
         # Generate report
-        generator = ReportGenerator()
+        generator = ReportGenerator(cache=report_cache)
         report = generator.generate_weekly_report(db, user.id, week_start, week_end)
         
         await message.answer(report, parse_mode="Markdown")
@@ -69,7 +110,7 @@ async def cmd_weekly(message: types.Message):
 @router.message(Command("monthly"))
 async def cmd_monthly(message: types.Message):
     """Generate monthly report"""
-    with get_db_session() as db:
+    with get_read_session() as db:
         user = get_user(db, message.from_user.id)
         
         if not user:
@@ -85,7 +126,7 @@ async def cmd_monthly(message: types.Message):
             month_end = date(today.year, today.month + 1, 1) - timedelta(days=1)
         
         # Generate report
-        generator = ReportGenerator()
+        generator = ReportGenerator(cache=report_cache)
         report = generator.generate_monthly_report(db, user.id, month_start, month_end)
         
         await message.answer(report, parse_mode="Markdown")
@@ -93,7 +134,7 @@ async def cmd_monthly(message: types.Message):
 @router.message(Command("profit"))
 async def cmd_profit(message: types.Message):
     """Calculate profit for today"""
-    with get_db_session() as db:
+    with get_read_session() as db:
         user = get_user(db, message.from_user.id)
         
         if not user:
@@ -124,23 +165,75 @@ async def cmd_profit(message: types.Message):
 @router.message(Command("insights"))
 @router.message(lambda message: message.text == "🚀 Insights")
 async def cmd_insights(message: types.Message):
-    """Generate smart 7-day business insights."""
-    with get_db_session() as db:
+    """Generate smart business insights (7 days by default, `/insights 30|90|ytd`)."""
+    horizon = parse_insights_horizon(message.text)
+    if horizon is None:
+        await message.answer(
+            "❌ Usage: `/insights`, `/insights 30`, `/insights 90` or `/insights ytd`\n"
+            f"(up to {INSIGHTS_MAX_DAYS} days)",
+            parse_mode="Markdown"
+        )
+        return
+    days, label = horizon
+
+    with get_read_session() as db:
+        user = get_user(db, message.from_user.id)
+
+        if not user:
+            await message.answer("❌ Please use /start first.")
+            return
+
+        generator = ReportGenerator(cache=report_cache)
+        report = generator.generate_insights_report(db, user.id, days=days, label=label)
+
+        await message.answer(report, parse_mode="Markdown")
+
+@router.message(Command("margins"))
+async def cmd_margins(message: types.Message):
+    """Gross margin per product and category (this month by default, `/margins last|30`)."""
+    period = parse_margins_period(message.text)
+    if period is None:
+        await message.answer(
+            "❌ Usage: `/margins`, `/margins last` or `/margins 30`\n"
+            f"(up to {INSIGHTS_MAX_DAYS} days)",
+            parse_mode="Markdown"
+        )
+        return
+    start_date, end_date, label = period
+
+    with get_read_session() as db:
         user = get_user(db, message.from_user.id)
 
         if not user:
             await message.answer("❌ Please use /start first.")
             return
 
-        generator = ReportGenerator()
-        report = generator.generate_insights_report(db, user.id, days=7)
+        generator = ReportGenerator(cache=report_cache)
+        report = generator.generate_margin_report(db, user.id, start_date, end_date, label=label)
 
         await message.answer(report, parse_mode="Markdown")
 
+@router.message(Command("cache_stats"))
+async def cmd_cache_stats(message: types.Message, is_admin: bool = False):
+    """Report cache hit/miss rates (bot admins only)"""
+    if not is_admin:
+        await message.answer("❌ This command is for bot admins.")
+        return
+
+    stats = report_cache.stats()
+    await message.answer(
+        "🗄 Report cache\n"
+        f"• Backend: {settings.REPORT_CACHE_BACKEND}\n"
+        f"• Hits: {stats['hits']}\n"
+        f"• Misses: {stats['misses']}\n"
+        f"• Hit rate: {stats['hit_rate'] * 100:.1f}%\n"
+        f"• Errors: {stats['errors']}"
+    )
+
 @router.message(Command("custom_report"))
 async def cmd_custom_report(message: types.Message, state: FSMContext):
     """Start custom report generation"""
-    with get_db_session() as db:
+    with get_read_session() as db:
         user = get_user(db, message.from_user.id)
         
         if not user:
@@ -191,16 +284,17 @@ async def process_custom_date(message: types.Message, state: FSMContext):
         if start_date > end_date:
             start_date, end_date = end_date, start_date
         
-        with get_db_session() as db:
+        with get_read_session() as db:
             user = get_user(db, message.from_user.id)
             
             # Generate report
-            generator = ReportGenerator()
-            report = generator.generate_custom_report(
+            generator = ReportGenerator(cache=report_cache)
+            # Long ranges stream month by month, one Telegram message at a time
+            for chunk in generator.generate_custom_report_chunks(
                 db, user.id, start_date, end_date
-            )
+            ):
+                await message.answer(chunk, parse_mode="Markdown")
         
-        await message.answer(report, parse_mode="Markdown")
         await state.clear()
         
     except ValueError:
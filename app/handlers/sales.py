@@ -2,8 +2,10 @@ from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from app.database.crud import get_user, create_sale, get_today_sales
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from app.database.crud import get_user, create_sale, create_sales_bulk, get_product_catalog, get_today_sales
 from app.database.connection import SessionLocal, get_db_session
+from app.validators import validate_amount
 from app.services.parser import Parser
 from app.services.calculator import Calculator
 from config import messages, settings
@@ -22,9 +24,20 @@ MENU_BUTTONS = {
     "❓ Help",
 }
 
+BULK_PREVIEW_LIMIT = 20
+BULK_SALE_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✅ Save all", callback_data="bulk_sale:confirm"),
+            InlineKeyboardButton(text="✖ Cancel", callback_data="bulk_sale:cancel"),
+        ]
+    ]
+)
+
 class SaleStates(StatesGroup):
     waiting_for_sale = State()
     waiting_for_quantity = State()
+    confirming_bulk = State()
 
 @router.message(Command("sale"))
 @router.message(F.text.regexp(r'^💰 Record Sale$'))
@@ -42,7 +55,9 @@ async def cmd_sale(message: types.Message, state: FSMContext):
         "Enter sale details in one of these formats:\n"
         "• `500 bread` - Single item\n"
         "• `3x 500 bread` - Multiple items\n"
-        "• `500 bread 3` - With quantity at end\n\n"
+        "• `500 bread 3` - With quantity at end\n"
+        "• `bread` or `3x bread` - Saved product at its price\n\n"
+        "Paste several lines to record a batch at once.\n"
         "Or enter just the amount to add details later.",
         parse_mode="Markdown"
     )
@@ -72,10 +87,15 @@ async def process_sale(message: types.Message, state: FSMContext, db=None):
     try:
         user = get_user(db, message.from_user.id)
         text = message.text.strip()
+        catalog = get_product_catalog(db, user.id)
+        
+        if "\n" in text:
+            await _preview_bulk_sales(message, state, text, catalog)
+            return
         
         # Try to parse with parser
         parser = Parser()
-        parsed_sale = parser.parse_sale(text)
+        parsed_sale = parser.parse_sale(text, catalog)
         
         if parsed_sale:
             # Create sale with parsed data
@@ -85,23 +105,28 @@ async def process_sale(message: types.Message, state: FSMContext, db=None):
                 amount=parsed_sale.amount,
                 product_name=parsed_sale.item,
                 quantity=parsed_sale.quantity,
-                unit_price=parsed_sale.amount / parsed_sale.quantity
+                unit_price=parsed_sale.amount / parsed_sale.quantity,
+                product_id=parsed_sale.product_id
             )
             
-            await message.answer(
+            response = (
                 f"✅ Sale recorded!\n"
                 f"• Amount: {settings.CURRENCY} {parsed_sale.amount:,.0f}\n"
                 f"• Item: {parsed_sale.item}\n"
                 f"• Quantity: {parsed_sale.quantity}\n"
-                f"• Time: {datetime.now().strftime('%H:%M')}",
-                parse_mode="Markdown"
+                f"• Time: {datetime.now().strftime('%H:%M')}"
             )
+            if parsed_sale.product_id is None:
+                suggestions = parser.suggest_items(parsed_sale.item, catalog)
+                if suggestions:
+                    response += f"\n\nℹ️ Not in your products. Did you mean: {', '.join(suggestions)}?"
+            await message.answer(response, parse_mode="Markdown")
             await state.clear()
             return
         
-        elif text.replace('.', '').isdigit():
-            # Only amount provided, ask for product
-            amount = float(text)
+        elif validate_amount(text)[0]:
+            # Only amount provided, ask for product (positive, like the parser requires)
+            amount = validate_amount(text)[1]
             await state.update_data(amount=amount)
             await message.answer(
                 f"Amount: {settings.CURRENCY} {amount:,.0f}\n"
@@ -111,15 +136,92 @@ async def process_sale(message: types.Message, state: FSMContext, db=None):
             return
         
         else:
+            suggestions = parser.suggest_items(text, catalog)
+            hint = f"\nKnown products: {', '.join(suggestions)}" if suggestions else ""
             await message.answer(
                 "❌ I couldn't understand that format.\n"
-                "Please use: `500 bread` or `3x 500 bread`",
+                f"Please use: `500 bread` or `3x 500 bread`{hint}",
                 parse_mode="Markdown"
             )
     finally:
         if should_close_db:
             db.close()
 
+async def _preview_bulk_sales(message: types.Message, state: FSMContext, text: str, catalog=None):
+    """Parse a multi-line block and ask for confirmation before saving it."""
+    parsed, failed = Parser.parse_sale_lines(text, catalog)
+    if not parsed:
+        await message.answer(
+            "❌ I couldn't understand any of those lines.\n"
+            "Put one sale per line, e.g. `500 bread` or `3x 500 bread`",
+            parse_mode="Markdown"
+        )
+        return
+    
+    entries = [
+        {"amount": sale.amount, "product_name": sale.item, "quantity": sale.quantity}
+        for sale in parsed
+    ]
+    await state.update_data(bulk_sales=entries)
+    await state.set_state(SaleStates.confirming_bulk)
+    
+    total = sum(entry["amount"] for entry in entries)
+    summary = f"🧾 *{len(entries)} sales ready to save*\n\n"
+    for entry in entries[:BULK_PREVIEW_LIMIT]:
+        summary += (
+            f"• {entry['quantity']}x {entry['product_name']}: "
+            f"{settings.CURRENCY} {entry['amount']:,.0f}\n"
+        )
+    if len(entries) > BULK_PREVIEW_LIMIT:
+        summary += f"... and {len(entries) - BULK_PREVIEW_LIMIT} more\n"
+    summary += f"\n*Total:* {settings.CURRENCY} {total:,.0f}\n"
+    
+    if failed:
+        summary += f"\n⚠️ Skipped {len(failed)} unreadable line(s):\n"
+        for line in failed[:5]:
+            summary += f"• {line}\n"
+    
+    await message.answer(summary, parse_mode="Markdown", reply_markup=BULK_SALE_KEYBOARD)
+
+@router.callback_query(SaleStates.confirming_bulk, F.data == "bulk_sale:confirm")
+async def cb_confirm_bulk_sales(callback: types.CallbackQuery, state: FSMContext):
+    """Save a confirmed batch of sales in a single transaction"""
+    data = await state.get_data()
+    entries = data.get("bulk_sales", [])
+    
+    with get_db_session() as db:
+        user = get_user(db, callback.from_user.id)
+        if not user:
+            await callback.answer("Please use /start first.", show_alert=True)
+            return
+        sales = create_sales_bulk(db, user.id, entries)
+    
+    await state.clear()
+    await callback.message.edit_reply_markup(reply_markup=None)
+    total = sum(entry["amount"] for entry in entries)
+    await callback.message.answer(
+        f"✅ {len(sales)} sales recorded!\n"
+        f"• Total: {settings.CURRENCY} {total:,.0f}\n"
+        f"• Time: {datetime.now().strftime('%H:%M')}"
+    )
+    await callback.answer()
+
+@router.callback_query(SaleStates.confirming_bulk, F.data == "bulk_sale:cancel")
+async def cb_cancel_bulk_sales(callback: types.CallbackQuery, state: FSMContext):
+    await state.clear()
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.message.answer("Batch discarded. Nothing was saved.")
+    await callback.answer()
+
+@router.message(SaleStates.confirming_bulk)
+async def process_bulk_sale_pending(message: types.Message, state: FSMContext):
+    """Any other message while a batch awaits confirmation discards it"""
+    await state.clear()
+    if message.text and message.text.startswith('/'):
+        await message.answer("Pending batch discarded. Run your command again.")
+        return
+    await message.answer("Pending batch discarded. Nothing was saved.")
+
 @router.message(SaleStates.waiting_for_quantity)
 async def process_product_name(message: types.Message, state: FSMContext, db=None):
     """Process product name after amount"""
@@ -6,7 +6,7 @@ from aiogram.fsm.strategy import FSMStrategy
 from config import bot_config
 from app.handlers import (
     start, sales, expenses, reports,
-    inventory, customers, help, team
+    inventory, customers, help, team, exports, imports
 )
 from app.middlewares.auth import AuthMiddleware
 from app.database.connection import init_db
@@ -34,6 +34,8 @@ async def main():
     dp.include_router(inventory.router)
     dp.include_router(customers.router)
     dp.include_router(team.router)
+    dp.include_router(exports.router)
+    dp.include_router(imports.router)
     dp.include_router(help.router)
     
     # Start notifier and bot polling
@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.database.crud import get_expense_rows_by_date, get_sale_rows_by_date
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def epoch_day(value: date) -> int:
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+class PeriodColumns:
+    """
+    One period of sales or expenses as parallel NumPy columns.
+
+    `day` holds epoch days (int32), `amount` the values (float64) and `code`
+    an int32 index into `labels` (product name or expense category). Every
+    aggregate is a single vectorised pass over these arrays.
+    """
+    __slots__ = ("start", "end", "day", "amount", "code", "labels")
+
+    def __init__(self, start: date, end: date, day: np.ndarray,
+                 amount: np.ndarray, code: np.ndarray, labels: List[Optional[str]]):
+        self.start = start
+        self.end = end
+        self.day = day
+        self.amount = amount
+        self.code = code
+        self.labels = labels
+
+    @classmethod
+    def from_rows(cls, rows: Sequence, start: date, end: date) -> "PeriodColumns":
+        """Build from (amount, label, datetime) rows such as get_sale_rows_by_date returns."""
+        count = len(rows)
+        index = {}
+        amount = np.fromiter((row[0] or 0.0 for row in rows), dtype=np.float64, count=count)
+        code = np.fromiter(
+            (index.setdefault(row[1], len(index)) for row in rows), dtype=np.int32, count=count
+        )
+        day = np.fromiter(
+            (row[2].toordinal() - EPOCH_ORDINAL for row in rows), dtype=np.int32, count=count
+        )
+        return cls(start, end, day, amount, code, list(index))
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def __len__(self):
+        return len(self.amount)
+
+    def between(self, start: date, end: date) -> "PeriodColumns":
+        """Rows falling in [start, end], sharing this period's labels."""
+        inside = (self.day >= epoch_day(start)) & (self.day <= epoch_day(end))
+        return PeriodColumns(start, end, self.day[inside], self.amount[inside], self.code[inside], self.labels)
+
+    def total(self) -> float:
+        return float(self.amount.sum())
+
+    def daily_totals(self) -> np.ndarray:
+        """Amount per day of the period, index 0 being `start`."""
+        offset = self.day - epoch_day(self.start)
+        inside = (offset >= 0) & (offset < self.days)
+        return np.bincount(offset[inside], weights=self.amount[inside], minlength=self.days)
+
+    def group_totals(self) -> np.ndarray:
+        """Amount per label, aligned with `labels`."""
+        return np.bincount(self.code, weights=self.amount, minlength=len(self.labels))
+
+    def grouped(self) -> dict:
+        return dict(zip(self.labels, self.group_totals().tolist()))
+
+    def top_groups(self, limit: int = 5, skip_blank: bool = True) -> List[Tuple[str, float]]:
+        totals = self.group_totals()
+        # Stable on the negated totals so ties keep first-seen order
+        order = np.argsort(-totals, kind="stable")
+        top = []
+        for position in order:
+            label = self.labels[position]
+            if skip_blank and not (label and str(label).strip()):
+                continue
+            top.append((label, float(totals[position])))
+            if len(top) == limit:
+                break
+        return top
+
+
+class Analytics:
+    @staticmethod
+    def load_sales(db: Session, user_id: int, start: date, end: date) -> PeriodColumns:
+        return PeriodColumns.from_rows(get_sale_rows_by_date(db, user_id, start, end), start, end)
+
+    @staticmethod
+    def load_expenses(db: Session, user_id: int, start: date, end: date) -> PeriodColumns:
+        return PeriodColumns.from_rows(get_expense_rows_by_date(db, user_id, start, end), start, end)
+
+    @staticmethod
+    def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+        """Trailing mean; the first window-1 entries average what is available."""
+        if window <= 1 or not len(values):
+            return values.astype(np.float64)
+        cumulative = np.cumsum(values, dtype=np.float64)
+        shifted = np.concatenate((np.zeros(window), cumulative[:-window]))[:len(values)]
+        counts = np.minimum(np.arange(1, len(values) + 1), window)
+        return (cumulative - shifted) / counts
+
+    @staticmethod
+    def growth(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        """Element-wise growth in percent, following Calculator.calculate_growth at zero."""
+        current = np.asarray(current, dtype=np.float64)
+        previous = np.asarray(previous, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (current - previous) / previous * 100
+        at_zero = np.where(current == 0, 0.0, 100.0)
+        return np.where(previous == 0, at_zero, change)
+
+    @staticmethod
+    def extreme_days(start: date, daily: np.ndarray) -> Tuple[Optional[tuple], Optional[tuple]]:
+        """(best_day, worst_day) as (date, amount); the earliest day wins ties."""
+        if not len(daily):
+            return None, None
+        best, worst = int(np.argmax(daily)), int(np.argmin(daily))
+        return (
+            (start + timedelta(days=best), float(daily[best])),
+            (start + timedelta(days=worst), float(daily[worst])),
+        )
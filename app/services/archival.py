@@ -0,0 +1,68 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database.connection import route_session
+from app.database.crud import archive_old_rows
+from app.database.models import Business, Expense, Sale
+from app.services.snapshots import ReportSnapshots
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def archive_cutoff(today: date, months: int) -> date:
+    """First day of the month `months` calendar months before today's month."""
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Archiver:
+    """
+    Moves sales, their line items and expenses older than ARCHIVE_AFTER_MONTHS
+    whole months into the *_archive tables, so the hot tables and their
+    indexes only hold recent rows. Reads whose range reaches the archive
+    (reports, /export, Parquet and per-business archives) union it in.
+    Closed months are snapshotted before their rows move, so their reports
+    stay single-row reads.
+    """
+
+    @staticmethod
+    def archive_scope(db: Session, scope_user_id: int, cutoff: date,
+                      batch_size: Optional[int] = None) -> Dict[str, int]:
+        route_session(db, scope_user_id)
+        oldest = [
+            db.query(func.min(column)).filter(model.user_id == scope_user_id, column < cutoff).scalar()
+            for model, column in ((Sale, Sale.sale_date), (Expense, Expense.expense_date))
+        ]
+        oldest = [value for value in oldest if value is not None]
+        if not oldest:
+            return {}
+        ReportSnapshots.fill_months(db, scope_user_id, min(oldest).date(), cutoff - timedelta(days=1))
+        return archive_old_rows(
+            db, scope_user_id, datetime.combine(cutoff, time.min),
+            batch_size or settings.ARCHIVE_BATCH_SIZE,
+        )
+
+    @staticmethod
+    def run(db: Session, months: Optional[int] = None, today: Optional[date] = None) -> Dict[str, int]:
+        """Archive every active business; returns rows moved per table."""
+        months = settings.ARCHIVE_AFTER_MONTHS if months is None else months
+        if months <= 0:
+            return {}
+        cutoff = archive_cutoff(today or date.today(), months)
+        totals: Dict[str, int] = {}
+        scopes = [owner for (owner,) in db.query(Business.owner_user_id).filter(Business.is_active == True)]
+        for scope_user_id in scopes:
+            try:
+                moved = Archiver.archive_scope(db, scope_user_id, cutoff)
+            except Exception as exc:
+                db.rollback()
+                logger.warning("Archival failed for scope %s: %s", scope_user_id, exc)
+                continue
+            for table, rows in moved.items():
+                totals[table] = totals.get(table, 0) + rows
+        return totals
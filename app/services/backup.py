@@ -0,0 +1,228 @@
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import db_config, settings
+
+BACKUP_PREFIX = "microbiz-"
+BACKUP_SUFFIX = ".db.gz"
+CHECKSUM_SUFFIX = ".sha256"
+_STAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+
+def sqlite_path(url: Optional[str] = None) -> str:
+    """Database file behind a sqlite:/// URL; other databases have their own dump tools."""
+    url = url or db_config.URL
+    if not url.startswith("sqlite:///") or url.endswith(":memory:"):
+        raise ValueError("Online backups need a file-based SQLite database (use pg_dump for PostgreSQL)")
+    return url[len("sqlite:///"):]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BackupResult:
+    __slots__ = ("path", "size", "checksum", "pages", "steps", "restarts", "max_step_ms", "seconds")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = 0
+        self.checksum = ""
+        self.pages = 0
+        self.steps = 0
+        self.restarts = 0
+        self.max_step_ms = 0.0  # longest time a single step held the source
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return f"<BackupResult(path='{self.path}', pages={self.pages}, max_step_ms={self.max_step_ms:.1f})>"
+
+
+class SqliteBackup:
+    """
+    Online backups of the SQLite database with the backup API. Pages are
+    copied `step_pages` at a time with a pause between steps, so a step only
+    holds the source for a few milliseconds. In WAL mode the whole copy also
+    reads from one snapshot: writers carry on and the backup never restarts.
+
+    Each backup is stored gzip-compressed next to a sha256sum-compatible
+    checksum file; `prune` keeps the newest `keep` backups plus the newest
+    one of each of the last `keep_weekly` ISO weeks.
+    """
+
+    def __init__(self, source: Optional[str] = None, directory: Optional[str] = None,
+                 step_pages: Optional[int] = None, pause_ms: Optional[float] = None):
+        self.source = source or sqlite_path()
+        self.directory = directory or settings.BACKUP_DIR
+        self.step_pages = step_pages or settings.BACKUP_STEP_PAGES
+        self.pause_ms = settings.BACKUP_STEP_PAUSE_MS if pause_ms is None else pause_ms
+
+    def run(self, now: Optional[datetime] = None) -> BackupResult:
+        """Back up, compress and checksum the database; returns what was written."""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = (now or datetime.now()).strftime(_STAMP_FORMAT)
+        result = BackupResult(os.path.join(self.directory, f"{BACKUP_PREFIX}{stamp}{BACKUP_SUFFIX}"))
+        started = time.perf_counter()
+
+        copy = f"{result.path}.partial"
+        try:
+            self._copy(copy, result)
+            self._compress(copy, result.path)
+        finally:
+            if os.path.exists(copy):
+                os.remove(copy)
+
+        result.checksum = _sha256(result.path)
+        with open(result.path + CHECKSUM_SUFFIX, "w", encoding="utf-8") as handle:
+            handle.write(f"{result.checksum}  {os.path.basename(result.path)}\n")
+        result.size = os.path.getsize(result.path)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _copy(self, target: str, result: BackupResult) -> None:
+        source = sqlite3.connect(self.source, isolation_level=None)
+        destination = sqlite3.connect(target)
+        try:
+            wal = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+            if wal:
+                # Pin one read snapshot for the whole copy; WAL writers are not blocked by it
+                source.execute("BEGIN")
+                source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+
+            step_started = time.perf_counter()
+            remaining_before = None
+
+            def progress(_status, remaining, total):
+                nonlocal step_started, remaining_before
+                elapsed_ms = (time.perf_counter() - step_started) * 1000
+                result.max_step_ms = max(result.max_step_ms, elapsed_ms)
+                result.steps += 1
+                result.pages = total
+                if remaining_before is not None and remaining > remaining_before:
+                    result.restarts += 1  # another connection wrote between steps
+                remaining_before = remaining
+                if remaining and self.pause_ms:
+                    time.sleep(self.pause_ms / 1000)
+                step_started = time.perf_counter()
+
+            source.backup(destination, pages=self.step_pages, progress=progress)
+            if wal:
+                source.execute("COMMIT")
+        finally:
+            destination.close()
+            source.close()
+
+    @staticmethod
+    def _compress(path: str, target: str) -> None:
+        with open(path, "rb") as raw, gzip.open(f"{target}.tmp", "wb", compresslevel=6) as packed:
+            shutil.copyfileobj(raw, packed, 1 << 20)
+        os.replace(f"{target}.tmp", target)
+
+    def backups(self) -> List[str]:
+        """Backup files, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(
+            (name for name in os.listdir(self.directory)
+             if name.startswith(BACKUP_PREFIX) and name.endswith(BACKUP_SUFFIX)),
+            reverse=True,
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    @staticmethod
+    def backup_time(path: str) -> datetime:
+        stamp = os.path.basename(path)[len(BACKUP_PREFIX):-len(BACKUP_SUFFIX)]
+        return datetime.strptime(stamp, _STAMP_FORMAT)
+
+    def prune(self, keep: Optional[int] = None, keep_weekly: Optional[int] = None) -> List[str]:
+        """Delete backups outside the retention policy; returns the removed paths."""
+        keep = settings.BACKUP_KEEP if keep is None else keep
+        keep_weekly = settings.BACKUP_KEEP_WEEKLY if keep_weekly is None else keep_weekly
+        backups = self.backups()
+        kept = set(backups[:keep])
+        weeks = set()
+        for path in backups:
+            week = self.backup_time(path).isocalendar()[:2]
+            if week not in weeks and len(weeks) < keep_weekly:
+                weeks.add(week)
+                kept.add(path)
+
+        removed = []
+        for path in backups:
+            if path in kept:
+                continue
+            os.remove(path)
+            if os.path.exists(path + CHECKSUM_SUFFIX):
+                os.remove(path + CHECKSUM_SUFFIX)
+            removed.append(path)
+        return removed
+
+    @staticmethod
+    def restore(path: str, target: str) -> None:
+        """Decompress a backup to `target` after checking its checksum; never run against the live file."""
+        SqliteBackup.check_checksum(path)
+        with gzip.open(path, "rb") as packed, open(f"{target}.tmp", "wb") as raw:
+            shutil.copyfileobj(packed, raw, 1 << 20)
+        os.replace(f"{target}.tmp", target)
+
+    @staticmethod
+    def check_checksum(path: str) -> None:
+        with open(path + CHECKSUM_SUFFIX, encoding="utf-8") as handle:
+            expected = handle.read().split()[0]
+        if _sha256(path) != expected:
+            raise ValueError(f"Checksum mismatch for {os.path.basename(path)}")
+
+    @staticmethod
+    def verify(path: str) -> Dict[str, int]:
+        """
+        Restore a backup into a scratch file and run SQLite's integrity check
+        on it. Returns the row count of each table; raises ValueError if the
+        backup is damaged.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, "restored.db")
+            SqliteBackup.restore(path, target)
+            connection = sqlite3.connect(target)
+            try:
+                problems = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+                if problems != ["ok"]:
+                    raise ValueError(f"Integrity check failed: {'; '.join(problems[:5])}")
+                tables = [row[0] for row in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+                )]
+                return {
+                    table: connection.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0]
+                    for table in tables
+                }
+            finally:
+                connection.close()
+
+
+def configured_backups(source: Optional[str] = None, directory: Optional[str] = None) -> List[SqliteBackup]:
+    """
+    One SqliteBackup per database file: the main database, plus every shard
+    file that exists when DB_SHARD_COUNT > 1. Shard backups go to a
+    shard_<n> subdirectory of the backup directory, with their own retention.
+    """
+    from app.database import connection
+
+    directory = directory or settings.BACKUP_DIR
+    backups = [SqliteBackup(source, directory)]
+    router = connection.shard_router
+    if router is not None:
+        for shard in range(1, router.count):
+            path = router.path(shard)
+            if os.path.exists(path):
+                backups.append(SqliteBackup(path, os.path.join(directory, f"shard_{shard}")))
+    return backups
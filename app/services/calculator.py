@@ -1,18 +1,22 @@
+from operator import attrgetter
 from typing import List, Dict, Any
 from datetime import date, datetime, timedelta
-from app.database.models import Sale, Expense
+
+# Items may be ORM entities or column rows (get_sale_rows_by_date and friends);
+# only the named attributes are read.
+_amount = attrgetter("amount")
 
 class Calculator:
     @staticmethod
     def calculate_total(items: List[Any]) -> float:
         """Calculate total amount from list of items with amount attribute"""
-        return sum(item.amount for item in items)
+        return sum(map(_amount, items))
     
     @staticmethod
-    def calculate_profit(sales: List[Sale], expenses: List[Expense]) -> float:
+    def calculate_profit(sales: List[Any], expenses: List[Any]) -> float:
         """Calculate profit: total sales - total expenses"""
-        total_sales = sum(sale.amount for sale in sales)
-        total_expenses = sum(expense.amount for expense in expenses)
+        total_sales = sum(map(_amount, sales))
+        total_expenses = sum(map(_amount, expenses))
         return total_sales - total_expenses
     
     @staticmethod
@@ -20,7 +24,7 @@ class Calculator:
         """Calculate average amount"""
         if not items:
             return 0.0
-        total = sum(item.amount for item in items)
+        total = sum(map(_amount, items))
         return total / len(items)
     
     @staticmethod
@@ -39,7 +43,7 @@ class Calculator:
         if not recent_items:
             return 0.0
         
-        total = sum(item.amount for item in recent_items)
+        total = sum(map(_amount, recent_items))
         return total / days
     
     @staticmethod
@@ -48,9 +52,7 @@ class Calculator:
         categories = {}
         for item in items:
             category = getattr(item, category_field, "Unknown")
-            if category not in categories:
-                categories[category] = 0.0
-            categories[category] += item.amount
+            categories[category] = categories.get(category, 0.0) + item.amount
         return categories
     
     @staticmethod
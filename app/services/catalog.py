@@ -0,0 +1,200 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import List, Optional
+from sqlalchemy.orm import Session
+
+from config import settings
+
+
+def normalize_product_name(name: Optional[str]) -> str:
+    """Canonical catalog key: trimmed, single-spaced and case-folded."""
+    return " ".join((name or "").split()).casefold()
+
+
+class CatalogEntry:
+    """What the parser needs to know about a product, without a DB round-trip."""
+    __slots__ = ("product_id", "name", "selling_price")
+
+    def __init__(self, product_id: int, name: str, selling_price: Optional[float]):
+        self.product_id = product_id
+        self.name = name
+        self.selling_price = selling_price
+
+    def __repr__(self):
+        return f"<CatalogEntry(product_id={self.product_id}, name='{self.name}')>"
+
+
+class ProductTrie:
+    """
+    Prefix trie over one business's normalized product names and aliases (SKU).
+
+    Nodes are plain dicts keyed by character; the entry for a complete key
+    sits under the `None` key. Exact lookups walk len(key) nodes and
+    completions walk the prefix and then only as many branches as needed.
+    """
+    __slots__ = ("_root", "_size")
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _node(self, key: str) -> Optional[dict]:
+        node = self._root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, key: str, entry: CatalogEntry) -> None:
+        """Add key -> entry; an existing key keeps its first (oldest) product."""
+        if not key:
+            return
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if None not in node:
+            node[None] = entry
+            self._size += 1
+
+    def lookup(self, key: str) -> Optional[CatalogEntry]:
+        node = self._node(key)
+        return node.get(None) if node is not None else None
+
+    def get(self, key: str, default=None) -> Optional[int]:
+        """Mapping-style access: normalized name -> product id."""
+        entry = self.lookup(key)
+        return entry.product_id if entry is not None else default
+
+    def complete(self, prefix: str, limit: int = 5) -> List[CatalogEntry]:
+        """Distinct products whose name or alias starts with prefix, shortest keys first."""
+        node = self._node(prefix)
+        if node is None or limit <= 0:
+            return []
+
+        found, seen = [], set()
+        level = [node]
+        # Breadth-first so "milk" is offered before "milk powder"
+        while level and len(found) < limit:
+            next_level = []
+            for current in level:
+                entry = current.get(None)
+                if entry is not None and entry.product_id not in seen:
+                    seen.add(entry.product_id)
+                    found.append(entry)
+                    if len(found) == limit:
+                        break
+                next_level.extend(child for char, child in sorted(
+                    ((char, child) for char, child in current.items() if char is not None)
+                ))
+            level = next_level
+        return found
+
+
+class ProductNameIndex:
+    """
+    Per-business product tries, built with one query on first use.
+
+    Tries are updated in place when products are created, so resolving a
+    sale's item never scans the catalog. Caches are kept per engine, so
+    separate databases never share entries; businesses that have not been
+    used for `idle_seconds`, or that fall out of the `max_scopes` most
+    recently used, are evicted and reload on their next lookup.
+    """
+
+    def __init__(self, max_scopes: int = 500, idle_seconds: int = 3600):
+        self.max_scopes = max_scopes
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._indexes = weakref.WeakKeyDictionary()
+
+    def _scopes(self, db: Session) -> "OrderedDict[int, list]":
+        bind = db.get_bind()
+        with self._lock:
+            scopes = self._indexes.get(bind)
+            if scopes is None:
+                scopes = self._indexes[bind] = OrderedDict()
+            return scopes
+
+    @staticmethod
+    def _load(db: Session, scope_user_id: int) -> ProductTrie:
+        from app.database.connection import route_session
+        from app.database.models import Product
+        route_session(db, scope_user_id)
+        rows = db.query(Product.id, Product.name, Product.sku, Product.selling_price).filter(
+            Product.user_id == scope_user_id,
+            Product.is_active == True,
+        ).order_by(Product.id).all()
+
+        trie = ProductTrie()
+        entries = []
+        for product_id, name, sku, selling_price in rows:
+            entry = CatalogEntry(product_id, name, selling_price)
+            trie.insert(normalize_product_name(name), entry)
+            entries.append((sku, entry))
+        # Names win over aliases that happen to collide with them
+        for sku, entry in entries:
+            trie.insert(normalize_product_name(sku), entry)
+        return trie
+
+    def _evict(self, scopes: "OrderedDict[int, list]", now: float) -> None:
+        while len(scopes) > self.max_scopes:
+            scopes.popitem(last=False)
+        cutoff = now - self.idle_seconds
+        while scopes:
+            scope_user_id, slot = next(iter(scopes.items()))
+            if slot[1] >= cutoff:
+                break
+            del scopes[scope_user_id]
+
+    def get_index(self, db: Session, scope_user_id: int) -> ProductTrie:
+        scopes = self._scopes(db)
+        now = time.monotonic()
+        with self._lock:
+            slot = scopes.get(scope_user_id)
+            if slot is not None:
+                slot[1] = now
+                scopes.move_to_end(scope_user_id)
+                return slot[0]
+
+        trie = self._load(db, scope_user_id)
+        with self._lock:
+            slot = scopes.setdefault(scope_user_id, [trie, now])
+            scopes.move_to_end(scope_user_id)
+            self._evict(scopes, now)
+            return slot[0]
+
+    def resolve(self, db: Session, scope_user_id: int, name: Optional[str]) -> Optional[int]:
+        key = normalize_product_name(name)
+        if not key:
+            return None
+        return self.get_index(db, scope_user_id).get(key)
+
+    def add_product(self, db: Session, product) -> None:
+        """Record a newly created product; unloaded scopes pick it up on first use."""
+        slot = self._scopes(db).get(product.user_id)
+        if slot is None:
+            return
+        entry = CatalogEntry(product.id, product.name, product.selling_price)
+        with self._lock:
+            slot[0].insert(normalize_product_name(product.name), entry)
+            slot[0].insert(normalize_product_name(product.sku), entry)
+
+    def invalidate(self, db: Session, scope_user_id: Optional[int] = None) -> None:
+        scopes = self._scopes(db)
+        with self._lock:
+            if scope_user_id is None:
+                scopes.clear()
+            else:
+                scopes.pop(scope_user_id, None)
+
+
+product_name_index = ProductNameIndex(
+    max_scopes=settings.CATALOG_CACHE_MAX_BUSINESSES,
+    idle_seconds=settings.CATALOG_CACHE_IDLE_MINUTES * 60,
+)
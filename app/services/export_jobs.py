@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Optional, Tuple
+
+from aiogram import Bot
+from aiogram.types import FSInputFile
+
+from app.database.connection import engine, get_db_session, get_read_session, read_engine
+from app.database.crud import (
+    claim_export_job, complete_export_job, fail_export_job, fail_stale_export_jobs,
+    get_business, get_export_job, pop_expired_export_files,
+)
+from app.services.exporter import Exporter
+from config import settings
+
+# export_type -> exporter dataset
+EXPORT_TYPES = {
+    "csv_sales": "sales",
+    "csv_expenses": "expenses",
+    "csv_inventory": "inventory",
+    "csv_customers": "customers",
+}
+
+
+def export_type_for(dataset: str) -> str:
+    return f"csv_{dataset}"
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _init_process():
+    # Connections inherited from the parent must not be shared with it
+    engine.dispose(close=False)
+    if read_engine is not None:
+        read_engine.dispose(close=False)
+
+
+def render_export_job(job_id: int) -> Tuple[str, int, str]:
+    """
+    Render one claimed job to a file; runs in a worker process with its own
+    session. Returns (file path, rows written, sha256 checksum).
+    """
+    with get_read_session() as db:
+        job = get_export_job(db, job_id)
+        dataset = EXPORT_TYPES[job.export_type]
+        params = json.loads(job.params_json or "{}")
+        start_date = date.fromisoformat(params["start"]) if params.get("start") else None
+        end_date = date.fromisoformat(params["end"]) if params.get("end") else None
+        business = get_business(db, job.business_id)
+        path = Exporter.export_path(business.owner_user_id, dataset)
+        try:
+            rows = Exporter.write_csv(db, business.owner_user_id, dataset, path, start_date, end_date)
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+    return path, rows, file_checksum(path)
+
+
+class ExportWorker:
+    """
+    Claims queued export jobs and renders them in a process pool, keeping the
+    bot process free for chats. Run as many workers as needed: each job is
+    claimed by exactly one of them.
+    """
+
+    def __init__(self, bot: Bot, processes: Optional[int] = None,
+                 poll_seconds: Optional[float] = None):
+        self.bot = bot
+        self.processes = processes or settings.EXPORT_WORKER_PROCESSES
+        self.poll_seconds = poll_seconds or settings.EXPORT_WORKER_POLL_SECONDS
+        self.running = False
+
+    async def run(self):
+        self.running = True
+        in_flight = set()
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(self.processes, initializer=_init_process) as pool:
+            while self.running:
+                await self.housekeeping()
+                while len(in_flight) < self.processes:
+                    with get_db_session() as db:
+                        job = claim_export_job(db)
+                        job_id = job.id if job else None
+                    if job_id is None:
+                        break
+                    in_flight.add(asyncio.create_task(self.process(loop, pool, job_id)))
+
+                if in_flight:
+                    _, in_flight = await asyncio.wait(
+                        in_flight, timeout=self.poll_seconds, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    await asyncio.sleep(self.poll_seconds)
+            if in_flight:
+                await asyncio.wait(in_flight)
+
+    def stop(self):
+        self.running = False
+
+    async def housekeeping(self):
+        with get_db_session() as db:
+            timed_out = [
+                (job_id, self._chat_id(db, get_export_job(db, job_id)))
+                for job_id in fail_stale_export_jobs(db, settings.EXPORT_JOB_TIMEOUT_MINUTES)
+            ]
+            expired = pop_expired_export_files(db)
+        for path in expired:
+            if os.path.exists(path):
+                os.remove(path)
+        for job_id, chat_id in timed_out:
+            print(f"Export job #{job_id} timed out")
+            await self._notify(chat_id, f"❌ Export job #{job_id} timed out. Please try again.")
+
+    async def process(self, loop, pool, job_id: int):
+        try:
+            path, rows, checksum = await loop.run_in_executor(pool, render_export_job, job_id)
+        except Exception as e:
+            with get_db_session() as db:
+                failed = fail_export_job(db, job_id, str(e) or type(e).__name__)
+                chat_id = self._chat_id(db, get_export_job(db, job_id))
+            if not failed:
+                # Already failed as stale; housekeeping told the requester
+                print(f"Export job #{job_id} failed after it timed out: {e}")
+                return
+            print(f"Export job #{job_id} failed: {e}")
+            await self._notify(chat_id, f"❌ Export job #{job_id} failed. Please try again.")
+            return
+
+        with get_db_session() as db:
+            completed = complete_export_job(db, job_id, path, checksum, rows, settings.EXPORT_FILE_TTL_HOURS)
+            job = get_export_job(db, job_id)
+            chat_id = self._chat_id(db, job)
+            dataset = EXPORT_TYPES[job.export_type]
+        if not completed:
+            # Marked failed as stale meanwhile; nothing would ever clean this file up
+            if os.path.exists(path):
+                os.remove(path)
+            print(f"Export job #{job_id} finished after it was marked failed; discarded")
+            return
+        await self._notify(
+            chat_id,
+            f"📤 {dataset.title()} export ready (job #{job_id}): {rows:,} row(s)",
+            path,
+        )
+
+    @staticmethod
+    def _chat_id(db, job) -> Optional[int]:
+        from app.database.models import User
+        if job is None:
+            return None
+        user = db.query(User).filter(User.id == job.requested_by_user_id).first()
+        return user.telegram_id if user else None
+
+    async def _notify(self, chat_id: Optional[int], text: str, path: Optional[str] = None):
+        if chat_id is None:
+            return
+        try:
+            if path:
+                await self.bot.send_document(
+                    chat_id, FSInputFile(path, filename=os.path.basename(path)), caption=text
+                )
+            else:
+                await self.bot.send_message(chat_id, text)
+        except Exception as e:
+            print(f"Error notifying {chat_id} about an export: {e}")
@@ -0,0 +1,104 @@
+import csv
+import gzip
+import os
+from datetime import date, datetime, time
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database.connection import get_read_session
+from app.database.crud import get_data_scope, rows_source
+from app.database.models import ARCHIVE_MODELS, Customer, Expense, Product, Sale
+from config import settings
+
+EXPORT_BATCH_SIZE = 1000
+
+# Dataset name -> (model, exported columns, date column for range filters)
+EXPORT_DATASETS = {
+    "sales": (Sale, (
+        Sale.id, Sale.sale_date, Sale.product_name, Sale.quantity, Sale.unit_price,
+        Sale.amount, Sale.payment_method, Sale.customer_id, Sale.notes,
+    ), Sale.sale_date),
+    "expenses": (Expense, (
+        Expense.id, Expense.expense_date, Expense.category, Expense.amount, Expense.description,
+    ), Expense.expense_date),
+    "inventory": (Product, (
+        Product.id, Product.name, Product.sku, Product.category, Product.unit, Product.purchase_price,
+        Product.selling_price, Product.stock, Product.min_stock, Product.is_active,
+    ), None),
+    "customers": (Customer, (
+        Customer.id, Customer.name, Customer.phone, Customer.email, Customer.credit_limit,
+        Customer.credit_balance, Customer.total_purchases, Customer.last_purchase, Customer.created_at,
+    ), None),
+}
+
+
+class Exporter:
+    """
+    Streams one dataset of a business into a gzip-compressed CSV. Rows are
+    read from a server-side cursor in batches of `batch_size`, so memory stays
+    flat regardless of how many rows the business has.
+    """
+
+    @staticmethod
+    def header(dataset: str) -> list:
+        return [column.key for column in EXPORT_DATASETS[dataset][1]]
+
+    @staticmethod
+    def iter_rows(db: Session, user_id: int, dataset: str,
+                  start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[tuple]:
+        model, columns, date_column = EXPORT_DATASETS[dataset]
+        scope_user_id = get_data_scope(db, user_id)
+        start_dt = end_dt = None
+        if date_column is not None and start_date and end_date:
+            start_dt, end_dt = datetime.combine(start_date, time.min), datetime.combine(end_date, time.max)
+        # Sales and expenses include archived rows when the range reaches them
+        source = (
+            rows_source(db, model, scope_user_id, start_dt, end_dt) if model in ARCHIVE_MODELS else model.__table__
+        ).c
+        query = db.query(*(source[column.key] for column in columns)).filter(source.user_id == scope_user_id)
+        if start_dt is not None:
+            query = query.filter(source[date_column.key] >= start_dt, source[date_column.key] <= end_dt)
+        query = query.order_by(source.id).execution_options(stream_results=True).yield_per(batch_size)
+        for row in query:
+            yield tuple(row)
+
+    @staticmethod
+    def write_csv(db: Session, user_id: int, dataset: str, path: str,
+                  start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> int:
+        """Write the dataset to `path` as gzip CSV (header only if empty); returns rows written."""
+        written = 0
+        with gzip.open(path, "wt", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(Exporter.header(dataset))
+            for row in Exporter.iter_rows(db, user_id, dataset, start_date, end_date, batch_size):
+                writer.writerow(
+                    value.isoformat(sep=" ") if isinstance(value, datetime) else value for value in row
+                )
+                written += 1
+        return written
+
+    @staticmethod
+    def export_path(scope_user_id: int, dataset: str, suffix: str = "csv.gz") -> str:
+        os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return os.path.join(settings.EXPORT_DIR, f"{dataset}_{scope_user_id}_{stamp}.{suffix}")
+
+    @staticmethod
+    def export_to_file(user_id: int, dataset: str, start_date: Optional[date] = None,
+                       end_date: Optional[date] = None) -> Tuple[str, int]:
+        """
+        Export with a session of its own, so it can run in a worker thread
+        off the event loop. Returns (file path, rows written).
+        """
+        with get_read_session() as db:
+            path = Exporter.export_path(get_data_scope(db, user_id), dataset)
+            try:
+                rows = Exporter.write_csv(db, user_id, dataset, path, start_date, end_date)
+            except Exception:
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+        return path, rows
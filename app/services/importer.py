@@ -0,0 +1,195 @@
+import csv
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from typing import List, Optional, TextIO
+
+from sqlalchemy.orm import Session
+
+from app.amounts import parse_amounts
+from app.database.crud import finish_import, get_data_scope, import_expenses, import_sales
+from app.services.snapshots import ReportSnapshots
+
+IMPORT_CHUNK_SIZE = 20_000
+MAX_REPORTED_ERRORS = 20
+
+_DATE_FORMATS = (
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S",
+    "%d-%m-%Y", "%d-%m-%Y %H:%M", "%d/%m/%Y", "%d/%m/%Y %H:%M",
+)
+
+# Field -> accepted header names (case-insensitive)
+IMPORT_COLUMNS = {
+    "sales": {
+        "date": ("date", "sale_date", "datetime"),
+        "amount": ("amount", "total"),
+        "product_name": ("product_name", "product", "item", "name"),
+        "quantity": ("quantity", "qty"),
+        "payment_method": ("payment_method", "payment"),
+        "notes": ("notes", "note"),
+    },
+    "expenses": {
+        "date": ("date", "expense_date", "datetime"),
+        "amount": ("amount", "total"),
+        "category": ("category", "type"),
+        "description": ("description", "notes", "note"),
+    },
+}
+REQUIRED_COLUMNS = {
+    "sales": ("date", "amount", "product_name"),
+    "expenses": ("date", "amount", "category"),
+}
+
+
+@lru_cache(maxsize=8192)
+def parse_import_date(text: str) -> Optional[datetime]:
+    """Spreadsheet dates: ISO (with optional time), DD-MM-YYYY or DD/MM/YYYY."""
+    text = text.strip()
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+class ImportResult:
+    __slots__ = ("imported", "rejected", "errors", "first_date", "last_date")
+
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []  # (line number, reason), first MAX_REPORTED_ERRORS only
+        self.first_date: Optional[date] = None
+        self.last_date: Optional[date] = None
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, reason))
+
+    def __repr__(self):
+        return f"<ImportResult(imported={self.imported}, rejected={self.rejected})>"
+
+
+class CsvImporter:
+    """
+    Imports historical sales or expenses from CSV. The file is read in chunks
+    of `chunk_size` rows; each chunk's amounts are validated in one batch and
+    written with multi-row inserts in its own transaction. Cached reports and
+    snapshots of the business are rebuilt once, after the last chunk.
+    """
+
+    def __init__(self, kind: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+        if kind not in IMPORT_COLUMNS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        self.kind = kind
+        self.chunk_size = chunk_size
+
+    def _column_map(self, header: List[str]) -> dict:
+        names = [name.strip().lower() for name in header]
+        mapping = {}
+        for field, aliases in IMPORT_COLUMNS[self.kind].items():
+            for alias in aliases:
+                if alias in names:
+                    mapping[field] = names.index(alias)
+                    break
+        missing = [field for field in REQUIRED_COLUMNS[self.kind] if field not in mapping]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        return mapping
+
+    def run(self, db: Session, user_id: int, handle: TextIO) -> ImportResult:
+        """Import every valid row of `handle`; raises ValueError if the header is unusable."""
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("The file is empty")
+        columns = self._column_map(header)
+        scope_user_id = get_data_scope(db, user_id)
+        result = ImportResult()
+        write = import_sales if self.kind == "sales" else import_expenses
+
+        line = 1
+        while True:
+            chunk = list(islice(reader, self.chunk_size))
+            if not chunk:
+                break
+            entries = self._entries(chunk, columns, line + 1, result)
+            result.imported += write(db, scope_user_id, entries)
+            line += len(chunk)
+
+        if result.imported:
+            finish_import(db, scope_user_id)
+            ReportSnapshots.rebuild_months(db, scope_user_id, result.first_date, result.last_date)
+        return result
+
+    def _entries(self, chunk: List[List[str]], columns: dict, first_line: int,
+                 result: ImportResult) -> List[dict]:
+        def cell(row, field, default=""):
+            index = columns.get(field)
+            return row[index].strip() if index is not None and index < len(row) else default
+
+        amounts, _ = parse_amounts(cell(row, "amount") for row in chunk)
+        today = datetime.now()
+        entries = []
+        first, last = result.first_date, result.last_date
+        for offset, (row, amount) in enumerate(zip(chunk, amounts)):
+            line = first_line + offset
+            if not any(value.strip() for value in row):
+                continue
+            stamp = parse_import_date(cell(row, "date"))
+            if stamp is None:
+                result.reject(line, "invalid date")
+                continue
+            if stamp > today:
+                result.reject(line, "date in the future")
+                continue
+            if amount is None or amount <= 0:
+                result.reject(line, "invalid amount")
+                continue
+
+            if self.kind == "sales":
+                name = cell(row, "product_name")
+                quantity = cell(row, "quantity") or "1"
+                if not name or not quantity.isdigit() or int(quantity) < 1:
+                    result.reject(line, "missing product" if not name else "invalid quantity")
+                    continue
+                quantity = int(quantity)
+                entries.append({
+                    "amount": amount,
+                    "product_name": name,
+                    "quantity": quantity,
+                    "unit_price": amount / quantity,
+                    "payment_method": cell(row, "payment_method") or "cash",
+                    "notes": cell(row, "notes") or None,
+                    "sale_date": stamp,
+                })
+            else:
+                category = cell(row, "category").lower()
+                if not category:
+                    result.reject(line, "missing category")
+                    continue
+                entries.append({
+                    "amount": amount,
+                    "category": category,
+                    "description": cell(row, "description") or None,
+                    "expense_date": stamp,
+                })
+
+            day = stamp.date()
+            if first is None or day < first:
+                first = day
+            if last is None or day > last:
+                last = day
+
+        result.first_date, result.last_date = first, last
+        return entries
+
+
+def import_file(user_id: int, kind: str, path: str, encoding: str = "utf-8-sig") -> ImportResult:
+    """Import with a session of its own, so bots and scripts can run it off the event loop."""
+    from app.database.connection import get_db_session
+
+    with get_db_session() as db, open(path, newline="", encoding=encoding) as handle:
+        return CsvImporter(kind).run(db, user_id, handle)
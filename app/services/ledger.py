@@ -0,0 +1,109 @@
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.database.models import Customer, Transaction
+
+BALANCE_TOLERANCE = 0.005
+
+
+class LedgerVerifier:
+    """Recompute customer balances from the ledger in bulk and report drift."""
+
+    @staticmethod
+    def _scope_filter(query, user_id: Optional[int]):
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+        return query.where(Transaction.customer_id.isnot(None))
+
+    @staticmethod
+    def find_chain_breaks(db: Session, user_id: Optional[int] = None) -> List[Dict]:
+        """Rows whose opening balance does not match the previous row's closing balance."""
+        partition = (Transaction.user_id, Transaction.customer_id)
+        ordering = (Transaction.created_at, Transaction.id)
+        chained = LedgerVerifier._scope_filter(
+            select(
+                Transaction.id,
+                Transaction.user_id,
+                Transaction.customer_id,
+                Transaction.balance_before,
+                func.lag(Transaction.balance_after).over(
+                    partition_by=partition, order_by=ordering
+                ).label("previous_balance"),
+            ),
+            user_id,
+        ).subquery()
+
+        rows = db.execute(
+            select(chained).where(
+                chained.c.previous_balance.isnot(None),
+                func.abs(chained.c.balance_before - chained.c.previous_balance) > BALANCE_TOLERANCE,
+            )
+        ).all()
+        return [
+            {
+                "transaction_id": row.id,
+                "user_id": row.user_id,
+                "customer_id": row.customer_id,
+                "balance_before": row.balance_before,
+                "previous_balance": row.previous_balance,
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def find_balance_drift(db: Session, user_id: Optional[int] = None) -> List[Dict]:
+        """
+        Customers whose stored credit balance disagrees with the ledger.
+        Every customer stream is recomputed as opening balance + sum of deltas in a single query.
+        """
+        partition = (Transaction.user_id, Transaction.customer_id)
+        ordering = (Transaction.created_at, Transaction.id)
+        ranked = LedgerVerifier._scope_filter(
+            select(
+                Transaction.user_id,
+                Transaction.customer_id,
+                Transaction.balance_after,
+                func.first_value(Transaction.balance_before).over(
+                    partition_by=partition, order_by=ordering
+                ).label("opening_balance"),
+                func.sum(Transaction.balance_after - Transaction.balance_before).over(
+                    partition_by=partition
+                ).label("net_change"),
+                func.row_number().over(
+                    partition_by=partition,
+                    order_by=(Transaction.created_at.desc(), Transaction.id.desc()),
+                ).label("recency"),
+            ),
+            user_id,
+        ).subquery()
+
+        rows = db.execute(
+            select(ranked, Customer.credit_balance)
+            .join(Customer, Customer.id == ranked.c.customer_id)
+            .where(ranked.c.recency == 1)
+        ).all()
+
+        drift = []
+        for row in rows:
+            recomputed = row.opening_balance + row.net_change
+            stored = row.credit_balance or 0.0
+            if (
+                abs(recomputed - row.balance_after) > BALANCE_TOLERANCE
+                or abs(stored - row.balance_after) > BALANCE_TOLERANCE
+            ):
+                drift.append({
+                    "user_id": row.user_id,
+                    "customer_id": row.customer_id,
+                    "stored_balance": stored,
+                    "ledger_balance": row.balance_after,
+                    "recomputed_balance": recomputed,
+                })
+        return drift
+
+    @staticmethod
+    def verify(db: Session, user_id: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Run every ledger check; empty lists mean the ledger is consistent."""
+        return {
+            "chain_breaks": LedgerVerifier.find_chain_breaks(db, user_id),
+            "balance_drift": LedgerVerifier.find_balance_drift(db, user_id),
+        }
@@ -0,0 +1,100 @@
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.crud import get_margin_summary
+
+UNCATEGORIZED = "Uncategorized"
+
+
+class MarginLine:
+    """Revenue and cost of goods of one product or category over a period."""
+    __slots__ = ("name", "revenue", "units", "costed_revenue", "cogs")
+
+    def __init__(self, name: str, revenue: float = 0.0, units: int = 0,
+                 costed_revenue: float = 0.0, cogs: float = 0.0):
+        self.name = name
+        self.revenue = revenue
+        self.units = units
+        self.costed_revenue = costed_revenue
+        self.cogs = cogs
+
+    @property
+    def has_cost(self) -> bool:
+        return self.costed_revenue > 0
+
+    @property
+    def margin(self) -> float:
+        """Gross margin of the lines whose cost is known."""
+        return self.costed_revenue - self.cogs
+
+    @property
+    def margin_pct(self) -> Optional[float]:
+        return self.margin / self.costed_revenue * 100 if self.has_cost else None
+
+    def add(self, other: "MarginLine") -> None:
+        self.revenue += other.revenue
+        self.units += other.units
+        self.costed_revenue += other.costed_revenue
+        self.cogs += other.cogs
+
+    def __repr__(self):
+        return f"<MarginLine(name='{self.name}', revenue={self.revenue}, margin={self.margin})>"
+
+
+class MarginAnalysis:
+    """
+    Products ranked by their contribution to gross margin, categories, and
+    the period total. Products sold without any known cost are kept apart.
+    """
+    __slots__ = ("ranking", "uncosted", "categories", "total")
+
+    def __init__(self, ranking: List[MarginLine], uncosted: List[MarginLine],
+                 categories: List[MarginLine], total: MarginLine):
+        self.ranking = ranking
+        self.uncosted = uncosted
+        self.categories = categories
+        self.total = total
+
+    @property
+    def cost_coverage(self) -> float:
+        """Share of revenue, in percent, whose cost of goods is known."""
+        return self.total.costed_revenue / self.total.revenue * 100 if self.total.revenue else 0.0
+
+    def contribution(self, line: MarginLine) -> float:
+        """Share of the period's gross margin, in percent."""
+        return line.margin / self.total.margin * 100 if self.total.margin else 0.0
+
+
+class MarginEngine:
+    @staticmethod
+    def analyse(rows: Iterable) -> MarginAnalysis:
+        """Build the analysis from get_margin_summary rows; no further queries."""
+        ranking, uncosted = [], []
+        categories: Dict[str, MarginLine] = {}
+        total = MarginLine("Total")
+        for row in rows:
+            line = MarginLine(
+                row.product_name or "",
+                row.revenue or 0.0,
+                row.units or 0,
+                row.costed_revenue or 0.0,
+                row.cogs or 0.0,
+            )
+            (ranking if line.has_cost else uncosted).append(line)
+            category = (row.category or "").strip() or UNCATEGORIZED
+            categories.setdefault(category, MarginLine(category)).add(line)
+            total.add(line)
+
+        ranking.sort(key=lambda line: line.margin, reverse=True)
+        return MarginAnalysis(
+            ranking,
+            uncosted,
+            sorted(categories.values(), key=lambda line: line.margin, reverse=True),
+            total,
+        )
+
+    @staticmethod
+    def load(db: Session, user_id: int, start: date, end: date) -> MarginAnalysis:
+        return MarginEngine.analyse(get_margin_summary(db, user_id, start, end))
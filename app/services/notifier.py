@@ -1,11 +1,16 @@
+import asyncio
 from datetime import datetime, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from aiogram import Bot
 
-from app.database.crud import get_today_sales, get_products
-from app.database.connection import get_db_session
-from config import settings
+from app.database.crud import get_today_sales, get_scope_recipients
+from app.database.connection import get_db_session, get_read_session, iter_shards
+from app.services.archival import Archiver
+from app.services.backup import configured_backups
+from app.services.snapshots import ReportSnapshots
+from app.services.stock_alerts import get_due_alerts, mark_notified
+from config import db_config, settings
 
 class Notifier:
     def __init__(self, bot: Bot):
@@ -22,6 +27,14 @@ class Notifier:
             replace_existing=True,
         )
         
+        # Low-stock alerts are read from the pending set filled by stock mutations
+        self.scheduler.add_job(
+            self.send_low_stock_alerts,
+            CronTrigger(hour=settings.DAILY_REPORT_HOUR, minute=0),
+            id="low_stock_alerts",
+            replace_existing=True,
+        )
+        
         # Schedule weekly report on Monday at 9 AM
         self.scheduler.add_job(
             self.send_weekly_report,
@@ -30,6 +43,32 @@ class Notifier:
             replace_existing=True,
         )
         
+        # Hourly, so each business is snapshotted shortly after its own midnight
+        self.scheduler.add_job(
+            self.build_report_snapshots,
+            CronTrigger(minute=5),
+            id="report_snapshots",
+            replace_existing=True,
+        )
+        
+        # Online backup: copies in small steps, so writers are never held up for long
+        if settings.BACKUP_ENABLED and db_config.URL.startswith("sqlite:///"):
+            self.scheduler.add_job(
+                self.backup_database,
+                CronTrigger(hour=settings.BACKUP_HOUR, minute=30),
+                id="database_backup",
+                replace_existing=True,
+            )
+        
+        # Monthly, once another month has fallen out of the hot window
+        if settings.ARCHIVE_AFTER_MONTHS > 0:
+            self.scheduler.add_job(
+                self.archive_old_rows,
+                CronTrigger(day=1, hour=4, minute=15),
+                id="archive_old_rows",
+                replace_existing=True,
+            )
+        
         # Start scheduler
         if not self.scheduler.running:
             self.scheduler.start()
@@ -37,7 +76,7 @@ class Notifier:
     
     async def send_daily_reminders(self):
         """Send daily reminders to all users"""
-        with get_db_session() as db:
+        with get_read_session() as db:
             # Get all active users
             from app.database.models import User
             users = db.query(User).filter(User.is_active == True).all()
@@ -61,34 +100,46 @@ class Notifier:
                             text=message,
                             parse_mode="Markdown"
                         )
-                    
-                    # Check for low stock products
-                    products = get_products(db, user.id)
-                    low_stock_products = [
-                        p for p in products 
-                        if p.stock <= p.min_stock and p.stock > 0
-                    ]
-                    
-                    if low_stock_products:
-                        message = "⚠️ *Low Stock Alert!*\n\n"
-                        for product in low_stock_products[:3]:  # Limit to 3 products
-                            message += f"• {product.name}: {product.stock} left (min: {product.min_stock})\n"
-                        
-                        if len(low_stock_products) > 3:
-                            message += f"\n... and {len(low_stock_products) - 3} more products running low."
-                        
-                        await self.bot.send_message(
-                            chat_id=user.telegram_id,
-                            text=message,
-                            parse_mode="Markdown"
-                        )
                         
                 except Exception as e:
                     print(f"Error sending reminder to user {user.id}: {e}")
     
+    async def send_low_stock_alerts(self, now: datetime = None):
+        """Send debounced low-stock alerts; costs O(pending alerts), not O(products)."""
+        # One timestamp per run, so a cooldown equal to the job interval
+        # isn't pushed a whole interval back by the time spent sending
+        now = now or datetime.now()
+        with get_db_session() as db:
+            for _ in iter_shards(db):  # pending alerts live with their business's data
+                due = get_due_alerts(db, settings.LOW_STOCK_ALERT_COOLDOWN_HOURS, now=now)
+                recipients = get_scope_recipients(db, list(due))
+            
+                for scope_user_id, alerts in due.items():
+                    message = "⚠️ *Low Stock Alert!*\n\n"
+                    for alert, name, stock in alerts[:3]:  # Limit to 3 products
+                        message += f"• {name}: {stock} left (min: {alert.min_stock})\n"
+                
+                    if len(alerts) > 3:
+                        message += f"\n... and {len(alerts) - 3} more products running low."
+                
+                    delivered = False
+                    for telegram_id in recipients.get(scope_user_id, ()):
+                        try:
+                            await self.bot.send_message(
+                                chat_id=telegram_id,
+                                text=message,
+                                parse_mode="Markdown"
+                            )
+                            delivered = True
+                        except Exception as e:
+                            print(f"Error sending low stock alert to {telegram_id}: {e}")
+                
+                    if delivered:
+                        mark_notified(db, [alert for alert, _, _ in alerts], now=now)
+    
     async def send_weekly_report(self):
         """Send weekly report to all users"""
-        with get_db_session() as db:
+        with get_read_session() as db:
             from app.database.models import User
             users = db.query(User).filter(User.is_active == True).all()
             
@@ -126,6 +177,50 @@ class Notifier:
                 except Exception as e:
                     print(f"Error sending weekly report to user {user.id}: {e}")
     
+    async def build_report_snapshots(self):
+        """Snapshot reports of periods that just closed, off the event loop."""
+        def run():
+            with get_db_session() as db:
+                return ReportSnapshots.snapshot_due(db)
+        
+        try:
+            written = await asyncio.to_thread(run)
+            if written:
+                print(f"Stored {written} report snapshot(s)")
+        except Exception as e:
+            print(f"Error building report snapshots: {e}")
+    
+    async def backup_database(self):
+        """Back up the SQLite database (and its shard files) and prune old backups, off the event loop."""
+        def run():
+            now = datetime.now()  # one stamp across the main file and its shards
+            done = []
+            for backup in configured_backups():
+                done.append((backup.run(now), backup.prune()))
+            return done
+        
+        try:
+            for result, removed in await asyncio.to_thread(run):
+                print(
+                    f"Database backup {result.path}: {result.size:,} bytes in {result.seconds:.1f}s "
+                    f"(longest step {result.max_step_ms:.1f} ms, {len(removed)} old backup(s) pruned)"
+                )
+        except Exception as e:
+            print(f"Error backing up the database: {e}")
+    
+    async def archive_old_rows(self):
+        """Move old sales and expenses to the archive tables, off the event loop."""
+        def run():
+            with get_db_session() as db:
+                return Archiver.run(db)
+        
+        try:
+            moved = await asyncio.to_thread(run)
+            if moved:
+                print(f"Archived rows: {moved}")
+        except Exception as e:
+            print(f"Error archiving old rows: {e}")
+    
     async def stop(self):
         """Stop the notifier"""
         if self.scheduler.running:
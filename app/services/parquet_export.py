@@ -0,0 +1,205 @@
+import json
+import os
+import shutil
+from datetime import date, datetime, time
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.connection import route_session
+from app.database.crud import rows_source
+from app.database.models import ARCHIVE_MODELS, Expense, Sale, Transaction
+from app.services.report_cache import ReportCache
+from app.services.snapshots import next_month
+from config import settings
+
+PARQUET_BATCH_SIZE = 10_000
+MANIFEST_NAME = "_manifest.json"
+
+# Table -> (model, date column, [(column, arrow kind)]); "dict" columns are dictionary-encoded
+PARQUET_TABLES = {
+    "sales": (Sale, Sale.sale_date, [
+        (Sale.id, "int"), (Sale.sale_date, "timestamp"), (Sale.product_name, "dict"),
+        (Sale.quantity, "int"), (Sale.unit_price, "float"), (Sale.amount, "float"),
+        (Sale.payment_method, "dict"), (Sale.customer_id, "int"),
+    ]),
+    "expenses": (Expense, Expense.expense_date, [
+        (Expense.id, "int"), (Expense.expense_date, "timestamp"), (Expense.category, "dict"),
+        (Expense.amount, "float"), (Expense.description, "string"),
+    ]),
+    "transactions": (Transaction, Transaction.created_at, [
+        (Transaction.id, "int"), (Transaction.created_at, "timestamp"), (Transaction.customer_id, "int"),
+        (Transaction.type, "dict"), (Transaction.amount, "float"), (Transaction.balance_before, "float"),
+        (Transaction.balance_after, "float"), (Transaction.reference_id, "int"),
+        (Transaction.description, "string"),
+    ]),
+}
+
+
+def _month_key(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+
+def _month_start(key: str) -> date:
+    return date.fromisoformat(f"{key}-01")
+
+
+def _arrow_schema(table: str):
+    import pyarrow as pa
+
+    kinds = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "string": pa.string(),
+        "dict": pa.dictionary(pa.int32(), pa.string()),
+        "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(column.key, kinds[kind]) for column, kind in PARQUET_TABLES[table][2]])
+
+
+class ParquetExporter:
+    """
+    Writes a business's sales, expenses and transactions as Parquet, one
+    partition per month (`business=<id>/<table>/month=YYYY-MM/part-0.parquet`),
+    readable directly by pandas, DuckDB or any Arrow reader.
+
+    `_manifest.json` records which months were written and whether they had
+    closed. Later runs only rewrite the last open month and append newer ones,
+    unless the business's history epoch moved since (imports, restores and
+    backfills rewrite closed months): then everything is written again.
+    """
+
+    def __init__(self, root: Optional[str] = None, batch_size: int = PARQUET_BATCH_SIZE):
+        self.root = root or settings.PARQUET_EXPORT_DIR
+        self.batch_size = batch_size
+
+    def business_dir(self, scope_user_id: int) -> str:
+        return os.path.join(self.root, f"business={scope_user_id}")
+
+    def load_manifest(self, scope_user_id: int) -> dict:
+        path = os.path.join(self.business_dir(scope_user_id), MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {"tables": {}}
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _save_manifest(self, scope_user_id: int, manifest: dict) -> None:
+        path = os.path.join(self.business_dir(scope_user_id), MANIFEST_NAME)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2, sort_keys=True)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def resume_from(months: Dict[str, dict]) -> Optional[date]:
+        """First day after the last month exported as closed, or None to start from scratch."""
+        closed = [key for key, month in months.items() if month.get("closed")]
+        if not closed:
+            return None
+        return next_month(_month_start(max(closed)))
+
+    def _iter_rows(self, db: Session, scope_user_id: int, table: str,
+                   since: Optional[date]) -> Iterator[tuple]:
+        model, date_column, columns = PARQUET_TABLES[table]
+        since_dt = datetime.combine(since, time.min) if since else None
+        source = (
+            rows_source(db, model, scope_user_id, since_dt) if model in ARCHIVE_MODELS else model.__table__
+        ).c
+        date_column = source[date_column.key]
+        query = db.query(*(source[column.key] for column, _ in columns)).filter(
+            source.user_id == scope_user_id, date_column.isnot(None)
+        )
+        if since_dt:
+            query = query.filter(date_column >= since_dt)
+        query = query.order_by(date_column, source.id)
+        return query.execution_options(stream_results=True).yield_per(self.batch_size)
+
+    def _write_month(self, table: str, scope_user_id: int, month: str, batches: Iterator[List[tuple]]) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _arrow_schema(table)
+        dictionary_columns = [column.key for column, kind in PARQUET_TABLES[table][2] if kind == "dict"]
+        partition = os.path.join(self.business_dir(scope_user_id), table, f"month={month}")
+        # Underscore directories are skipped by dataset readers, so a half-written month never shows
+        staging = os.path.join(self.business_dir(scope_user_id), "_staging", table, f"month={month}")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        rows = 0
+        with pq.ParquetWriter(
+            os.path.join(staging, "part-0.parquet"), schema,
+            compression="zstd", use_dictionary=dictionary_columns,
+        ) as writer:
+            for batch in batches:
+                columns = list(zip(*batch))
+                writer.write_batch(pa.record_batch(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema,
+                ))
+                rows += len(batch)
+
+        shutil.rmtree(partition, ignore_errors=True)
+        os.makedirs(os.path.dirname(partition), exist_ok=True)
+        os.replace(staging, partition)
+        return rows
+
+    def _export_table(self, db: Session, scope_user_id: int, table: str,
+                      since: Optional[date]) -> Dict[str, int]:
+        """Stream rows in date order and write each month as it completes; returns rows per month."""
+        date_index = [kind for _, kind in PARQUET_TABLES[table][2]].index("timestamp")
+        rows = iter(self._iter_rows(db, scope_user_id, table, since))
+        written = {}
+        pending = next(rows, None)
+
+        while pending is not None:
+            month = _month_key(pending[date_index])
+
+            def month_batches():
+                nonlocal pending
+                batch = []
+                while pending is not None and _month_key(pending[date_index]) == month:
+                    batch.append(tuple(pending))
+                    if len(batch) == self.batch_size:
+                        yield batch
+                        batch = []
+                    pending = next(rows, None)
+                if batch:
+                    yield batch
+
+            written[month] = self._write_month(table, scope_user_id, month, month_batches())
+        return written
+
+    def export_business(self, db: Session, scope_user_id: int, full: bool = False) -> dict:
+        """
+        Export (or incrementally update) one business. Returns
+        {table: {month: rows}} for the partitions written by this run.
+        """
+        route_session(db, scope_user_id)
+        os.makedirs(self.business_dir(scope_user_id), exist_ok=True)
+        # Read before any rows, so history rewritten during this run is caught by the next one
+        history = ReportCache.history_epoch(db, scope_user_id)
+        manifest = self.load_manifest(scope_user_id)
+        if manifest.get("history_epoch", 0) != history:
+            full = True
+        if full:
+            manifest = {"tables": {}}
+        manifest["history_epoch"] = history
+        this_month = _month_key(datetime.now())
+        summary = {}
+
+        for table in PARQUET_TABLES:
+            months = manifest["tables"].get(table, {}).get("months", {})
+            if full:
+                shutil.rmtree(os.path.join(self.business_dir(scope_user_id), table), ignore_errors=True)
+                months = {}
+            written = self._export_table(db, scope_user_id, table, self.resume_from(months))
+            for month, rows in written.items():
+                months[month] = {"rows": rows, "closed": month < this_month}
+            manifest["tables"][table] = {
+                "months": months,
+                "exported_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            summary[table] = written
+
+        self._save_manifest(scope_user_id, manifest)
+        return summary
@@ -1,59 +1,132 @@
 import re
-from typing import Optional, Tuple
-from pydantic import BaseModel
+from typing import List, Optional, Tuple
+
+from app.amounts import AMOUNT_PATTERN, parse_amount, to_amount
+from app.services.catalog import ProductTrie, normalize_product_name
+
+# Building blocks shared by every message grammar
+_AMOUNT = AMOUNT_PATTERN
+_FORMATS = {
+    # "2x 500 bread"
+    "quantity_prefix": rf'(?P<qp_quantity>\d+)x\s+(?P<qp_amount>{_AMOUNT})\s+(?P<qp_item>.+)',
+    # "500 bread 2"
+    "quantity_suffix": rf'(?P<qs_amount>{_AMOUNT})\s+(?P<qs_item>.+?)\s+(?P<qs_quantity>\d+)$',
+    # "bread 500"
+    "amount_last": rf'(?P<al_item>.+?)\s+(?P<al_amount>{_AMOUNT})$',
+    # "500 bread"
+    "amount_first": rf'(?P<af_amount>{_AMOUNT})\s+(?P<af_item>.+)',
+}
+
+
+def _grammar(*formats: str):
+    """
+    Compile formats into one anchored alternation. Alternatives are tried in
+    the given order, so a single match call picks the same format a chain of
+    re.match calls would, and lastgroup names the item/quantity group it ended on.
+    """
+    return re.compile('|'.join(f'(?:{_FORMATS[name]})' for name in formats))
+
+
+_SALE_GRAMMAR = _grammar("quantity_prefix", "quantity_suffix", "amount_last", "amount_first")
+_EXPENSE_GRAMMAR = _grammar("amount_first", "amount_last")
+# "bread" / "3x bread": catalog products typed without a price
+_NAME_ONLY = re.compile(r'(?:(?P<quantity>\d+)x\s+)?(?P<name>.+)')
+
+
+class ParsedSale:
+    __slots__ = ("amount", "item", "quantity", "product_id")
+
+    def __init__(self, amount: float, item: str, quantity: int = 1, product_id: Optional[int] = None):
+        self.amount = amount
+        self.item = item
+        self.quantity = quantity
+        self.product_id = product_id
+
+    def __eq__(self, other):
+        if not isinstance(other, ParsedSale):
+            return NotImplemented
+        return (self.amount, self.item, self.quantity, self.product_id) == (
+            other.amount, other.item, other.quantity, other.product_id
+        )
+
+    def __repr__(self):
+        return (
+            f"ParsedSale(amount={self.amount!r}, item={self.item!r}, "
+            f"quantity={self.quantity!r}, product_id={self.product_id!r})"
+        )
 
-class ParsedSale(BaseModel):
-    amount: float
-    item: str
-    quantity: int = 1
 
 class Parser:
     @staticmethod
-    def parse_sale(text: str) -> Optional[ParsedSale]:
+    def parse_sale(text: str, catalog: Optional[ProductTrie] = None) -> Optional[ParsedSale]:
         """
         Parse sale messages in various formats:
         1. "500 bread" -> amount=500, item="bread", quantity=1
         2. "2x 500 bread" -> amount=1000, item="bread", quantity=2
         3. "500 bread 2" -> amount=500, item="bread", quantity=2
         4. "bread 500" -> amount=500, item="bread", quantity=1
+        The message is expected to be a single line.
+
+        With a business catalog, items are resolved to product ids and a known
+        product typed without an amount ("bread", "2x bread") is priced from
+        its selling price.
         """
         text = text.strip()
-        
-        # Remove commas for thousands
-        text = text.replace(',', '')
-        
-        # Pattern 1: "2x 500 bread"
-        match = re.match(r'(\d+)x\s+(\d+\.?\d*)\s+(.+)', text)
-        if match:
-            quantity = int(match.group(1))
-            amount = float(match.group(2))
-            item = match.group(3).strip()
-            return ParsedSale(amount=amount * quantity, item=item, quantity=quantity)
-        
-        # Pattern 2: "500 bread 2"
-        match = re.match(r'(\d+\.?\d*)\s+(.+?)\s+(\d+)$', text)
-        if match:
-            amount = float(match.group(1))
-            item = match.group(2).strip()
-            quantity = int(match.group(3))
-            return ParsedSale(amount=amount, item=item, quantity=quantity)
-        
-        # Pattern 3: "bread 500"
-        match = re.match(r'(.+?)\s+(\d+\.?\d*)$', text)
-        if match:
-            item = match.group(1).strip()
-            amount = float(match.group(2))
-            return ParsedSale(amount=amount, item=item, quantity=1)
-        
-        # Pattern 4: "500 bread" (most common)
-        match = re.match(r'(\d+\.?\d*)\s+(.+)', text)
-        if match:
-            amount = float(match.group(1))
-            item = match.group(2).strip()
-            return ParsedSale(amount=amount, item=item, quantity=1)
-        
-        return None
-    
+        parsed = Parser._match_sale(text)
+        if catalog is None:
+            return parsed
+
+        if parsed is not None:
+            parsed.product_id = catalog.get(normalize_product_name(parsed.item))
+            return parsed
+        return Parser._price_from_catalog(text, catalog)
+
+    @staticmethod
+    def _match_sale(text: str) -> Optional[ParsedSale]:
+        match = _SALE_GRAMMAR.match(text)
+        if match is None:
+            return None
+
+        group = match.group
+        matched = match.lastgroup
+        if matched == "qp_item":
+            quantity = int(group("qp_quantity"))
+            amount = parse_amount(group("qp_amount"))
+            return ParsedSale(amount=amount * quantity, item=group("qp_item").strip(), quantity=quantity)
+        if matched == "qs_quantity":
+            return ParsedSale(
+                amount=parse_amount(group("qs_amount")),
+                item=group("qs_item").strip(),
+                quantity=int(group("qs_quantity")),
+            )
+        if matched == "al_amount":
+            return ParsedSale(amount=parse_amount(group("al_amount")), item=group("al_item").strip())
+        return ParsedSale(amount=parse_amount(group("af_amount")), item=group("af_item").strip())
+
+    @staticmethod
+    def _price_from_catalog(text: str, catalog: ProductTrie) -> Optional[ParsedSale]:
+        match = _NAME_ONLY.match(text)
+        if match is None:
+            return None
+        entry = catalog.lookup(normalize_product_name(match.group("name")))
+        if entry is None or not entry.selling_price:
+            return None
+        quantity = int(match.group("quantity") or 1)
+        return ParsedSale(
+            amount=entry.selling_price * quantity,
+            item=entry.name,
+            quantity=quantity,
+            product_id=entry.product_id,
+        )
+
+    @staticmethod
+    def suggest_items(text: str, catalog: ProductTrie, limit: int = 3) -> List[str]:
+        """Catalog product names starting with what was typed (e.g. "bre" -> ["Bread"])."""
+        prefix = normalize_product_name(text)
+        if not prefix:
+            return []
+        return [entry.name for entry in catalog.complete(prefix, limit)]
+
     @staticmethod
     def parse_expense(text: str) -> Tuple[Optional[float], Optional[str]]:
         """
@@ -61,27 +134,50 @@ class Parser:
         "500 supplies" -> (500.0, "supplies")
         "supplies 500" -> (500.0, "supplies")
         """
-        text = text.strip()
-        
-        # Remove commas for thousands
-        text = text.replace(',', '')
-        
-        # Pattern 1: "amount category"
-        match = re.match(r'(\d+\.?\d*)\s+(.+)', text)
-        if match:
-            amount = float(match.group(1))
-            category = match.group(2).strip()
-            return amount, category
-        
-        # Pattern 2: "category amount"
-        match = re.match(r'(.+?)\s+(\d+\.?\d*)$', text)
-        if match:
-            category = match.group(1).strip()
-            amount = float(match.group(2))
-            return amount, category
-        
-        return None, None
-    
+        match = _EXPENSE_GRAMMAR.match(text.strip())
+        if match is None:
+            return None, None
+
+        if match.lastgroup == "af_item":
+            return parse_amount(match.group("af_amount")), match.group("af_item").strip()
+        return parse_amount(match.group("al_amount")), match.group("al_item").strip()
+
+    @staticmethod
+    def parse_sale_lines(text: str, catalog: Optional[ProductTrie] = None) -> Tuple[List[ParsedSale], List[str]]:
+        """
+        Parse a pasted block with one sale per line.
+        Returns (parsed sales, lines that could not be understood).
+        """
+        parsed, failed = [], []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            sale = Parser.parse_sale(line, catalog)
+            if sale and sale.item and sale.quantity > 0:
+                parsed.append(sale)
+            else:
+                failed.append(line)
+        return parsed, failed
+
+    @staticmethod
+    def parse_expense_lines(text: str) -> Tuple[List[Tuple[float, str]], List[str]]:
+        """
+        Parse a pasted block with one expense per line.
+        Returns ([(amount, category), ...], lines that could not be understood).
+        """
+        parsed, failed = [], []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            amount, category = Parser.parse_expense(line)
+            if amount is not None and category:
+                parsed.append((amount, category))
+            else:
+                failed.append(line)
+        return parsed, failed
+
     @staticmethod
     def parse_product(text: str) -> Tuple[Optional[str], Optional[float], Optional[int]]:
         """
@@ -89,29 +185,26 @@ class Parser:
         "bread 5000 100" -> ("bread", 5000.0, 100)
         """
         text = text.strip()
-        
-        # Remove commas for thousands
-        text = text.replace(',', '')
-        
         parts = text.split()
+
         if len(parts) >= 3:
             try:
                 # Assume last two parts are price and stock
-                price = float(parts[-2])
+                price = to_amount(parts[-2])
                 stock = int(parts[-1])
                 name = ' '.join(parts[:-2])
                 return name, price, stock
             except ValueError:
                 pass
-        
+
         if len(parts) == 2:
             try:
                 # Name and price only
-                price = float(parts[-1])
+                price = to_amount(parts[-1])
                 name = parts[0]
                 return name, price, 0
             except ValueError:
                 pass
-        
+
         # Just name
-        return text, None, 0
\ No newline at end of file
+        return text, None, 0
@@ -13,6 +13,8 @@ ROLE_PERMISSIONS = {
         "customer:update",
         "report:view",
         "analytics:view",
+        "export:create",
+        "import:create",
         "member:view",
         "member:manage",
         "activity:view",
@@ -26,6 +28,8 @@ ROLE_PERMISSIONS = {
         "customer:update",
         "report:view",
         "analytics:view",
+        "export:create",
+        "import:create",
         "member:view",
         "activity:view",
     },
@@ -49,7 +53,10 @@ ACTION_MAP = {
     "/profit": "report:view",
     "/custom_report": "report:view",
     "/insights": "analytics:view",
+    "/margins": "analytics:view",
     "🚀 Insights": "analytics:view",
+    "/export": "export:create",
+    "/import": "import:create",
     "/products": "inventory:view",
     "/stock": "inventory:view",
     "📦 Inventory": "inventory:view",
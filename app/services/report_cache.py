@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """In-process LRU; namespaces are per engine, so separate databases never share entries."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._namespaces = weakref.WeakKeyDictionary()
+
+    def namespace(self, bind) -> str:
+        with self._lock:
+            token = self._namespaces.get(bind)
+            if token is None:
+                token = self._namespaces[bind] = uuid.uuid4().hex[:12]
+            return token
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        # Superseded versions simply age out of the LRU, so ttl is not needed here
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisCacheBackend:
+    """Shared cache for several bot processes; namespaced by database URL."""
+
+    def __init__(self, url: str, prefix: str = "microbiz:reports"):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def namespace(self, bind) -> str:
+        url = bind.url.render_as_string(hide_password=True)
+        return f"{self.prefix}:{hashlib.sha1(url.encode()).hexdigest()[:12]}"
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def counter(self, key: str) -> int:
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+
+class ReportCache:
+    """
+    Rendered reports keyed by (scope, report type, period, data version).
+
+    Every write to a scope bumps its data version, which retires all cached
+    reports for periods that are still open. Closed periods (ending before
+    today) are keyed by a separate history epoch instead, so they stay cached
+    until something rewrites history (e.g. an import of old rows). The epoch
+    lives in the database (report_epochs) and is part of every key, so a
+    rewrite by another process, such as the import or restore CLIs, reaches
+    every bot process even with the in-process memory backend.
+    """
+
+    def __init__(self, backend, open_ttl: int = 3600):
+        self.backend = backend
+        self.open_ttl = open_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, db: Session, scope_user_id: int, name: str) -> str:
+        return f"{self.backend.namespace(db.get_bind())}:{scope_user_id}:{name}"
+
+    def version(self, db: Session, scope_user_id: int) -> int:
+        return self.backend.counter(self._key(db, scope_user_id, "version"))
+
+    @staticmethod
+    def history_epoch(db: Session, scope_user_id: int) -> int:
+        from app.database.models import ReportEpoch
+
+        return db.query(ReportEpoch.history).filter(ReportEpoch.scope_user_id == scope_user_id).scalar() or 0
+
+    @staticmethod
+    def _bump_history(db: Session, scope_user_id: int) -> None:
+        from app.database.models import ReportEpoch
+
+        bumped = db.query(ReportEpoch).filter(ReportEpoch.scope_user_id == scope_user_id).update(
+            {"history": ReportEpoch.history + 1, "updated_at": datetime.now()}, synchronize_session=False
+        )
+        if not bumped:
+            db.add(ReportEpoch(scope_user_id=scope_user_id, history=1))
+        db.commit()
+
+    def bump(self, db: Session, scope_user_id: int, history: bool = False) -> None:
+        """Retire cached reports of the scope's open periods (and closed ones too if history)."""
+        if history:
+            try:
+                self._bump_history(db, scope_user_id)
+            except Exception as exc:
+                db.rollback()
+                self.errors += 1
+                logger.warning("Report history epoch bump failed for scope %s: %s", scope_user_id, exc)
+        try:
+            self.backend.incr(self._key(db, scope_user_id, "version"))
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Report cache invalidation failed for scope %s: %s", scope_user_id, exc)
+
+    def get_or_render(self, db: Session, scope_user_id: int, report_type: str,
+                      start: date, end: date, render: Callable[[], str]) -> str:
+        closed = end < date.today()
+        try:
+            stamp = f"h{self.history_epoch(db, scope_user_id)}"
+            if not closed:
+                stamp += f"v{self.version(db, scope_user_id)}"
+            key = self._key(db, scope_user_id, f"{report_type}:{start.isoformat()}:{end.isoformat()}:{stamp}")
+            cached = self.backend.get(key)
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Report cache unavailable: %s", exc)
+            return render()
+
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        report = render()
+        try:
+            self.backend.set(key, report, ttl=None if closed else self.open_ttl)
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Report cache write failed: %s", exc)
+        return report
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def build_report_cache() -> ReportCache:
+    if settings.REPORT_CACHE_BACKEND == "redis":
+        backend = RedisCacheBackend(settings.REPORT_CACHE_URL)
+    else:
+        backend = MemoryCacheBackend(settings.REPORT_CACHE_MAX_ENTRIES)
+    return ReportCache(backend, open_ttl=settings.REPORT_CACHE_OPEN_TTL_SECONDS)
+
+
+report_cache = build_report_cache()
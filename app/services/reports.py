@@ -1,16 +1,70 @@
+import math
 from datetime import date, timedelta
+from typing import Iterable, Iterator
 from sqlalchemy.orm import Session
 from app.database.crud import (
     get_total_sales, get_total_expenses,
-    get_sales_by_date, get_today_expenses,
-    get_expenses_by_date, get_products, get_customers
+    get_sale_rows_by_date, get_expense_rows_by_date,
+    get_products, get_customers,
+    get_product_sales_summary, get_unitemized_sales_summary, get_data_scope, get_report_snapshot
 )
+from app.services.analytics import Analytics, PeriodColumns
 from app.services.calculator import Calculator
+from app.services.margins import UNCATEGORIZED, MarginEngine
+from app.services.report_cache import ReportCache
+from app.services.snapshots import PERIOD_DAY, PERIOD_MONTH, PERIOD_WEEK, ReportSnapshots
 from config import settings
 
+TREND_WINDOW = 7
+TELEGRAM_MESSAGE_LIMIT = 4096
+CUSTOM_REPORT_STREAM_DAYS = 366
+MARGIN_RANKING_LIMIT = 10
+
+
+def chunk_lines(lines: Iterable[str], limit: int = TELEGRAM_MESSAGE_LIMIT) -> Iterator[str]:
+    """
+    Pack report lines into messages of at most `limit` characters, breaking
+    only between lines so Markdown spans stay intact; holds one message at a time.
+    """
+    chunk, size = [], 0
+    for line in lines:
+        while len(line) > limit:
+            if chunk:
+                yield "".join(chunk)
+                chunk, size = [], 0
+            yield line[:limit]
+            line = line[limit:]
+        if chunk and size + len(line) > limit:
+            yield "".join(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line)
+    if chunk:
+        yield "".join(chunk)
+
+
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, cache: ReportCache | None = None):
         self.calculator = Calculator()
+        self.cache = cache
+
+    def _cached(self, db: Session, user_id: int, report_type: str,
+                start_date: date, end_date: date, render) -> str:
+        if self.cache is None:
+            return render()
+        scope_user_id = get_data_scope(db, user_id)
+        return self.cache.get_or_render(db, scope_user_id, report_type, start_date, end_date, render)
+
+    def _snapshot_or_cached(self, db: Session, user_id: int, report_type: str, period_type: str,
+                            start_date: date, end_date: date, render) -> str:
+        """Closed periods with a stored snapshot are served from that single row."""
+        def snapshot_or_render():
+            if end_date < date.today():
+                snapshot = get_report_snapshot(db, user_id, period_type, start_date)
+                if snapshot is not None and snapshot.period_end == end_date and snapshot.rendered:
+                    return snapshot.rendered
+            return render()
+        return self._cached(db, user_id, report_type, start_date, end_date, snapshot_or_render)
 
     @staticmethod
     def _format_change(change: float) -> str:
@@ -27,16 +81,50 @@ class ReportGenerator:
         name, amount = max(grouped_values.items(), key=lambda item: item[1])
         return name, amount
     
+    def _sales_by_product(self, db: Session, user_id: int,
+                          start_date: date, end_date: date, sales: list) -> dict:
+        """
+        Revenue per product, keyed through the sale_items catalog link.
+        Sales without line items (recorded before they existed) are grouped by
+        their raw product name, so the breakdown always adds up to the period total.
+        """
+        summary = get_product_sales_summary(db, user_id, start_date, end_date)
+        if not summary:
+            if isinstance(sales, PeriodColumns):
+                return sales.grouped()
+            return self.calculator.group_by_category(sales, "product_name")
+        grouped = {}
+        for row in summary:
+            grouped[row.product_name] = grouped.get(row.product_name, 0.0) + row.revenue
+        if isinstance(sales, PeriodColumns):
+            period_total = sales.total()
+        else:
+            period_total = sum(row.amount or 0.0 for row in sales)
+        if not math.isclose(sum(grouped.values()), period_total, abs_tol=0.005):
+            for row in get_unitemized_sales_summary(db, user_id, start_date, end_date):
+                grouped[row.product_name] = grouped.get(row.product_name, 0.0) + (row.revenue or 0.0)
+            grouped = dict(sorted(grouped.items(), key=lambda item: item[1], reverse=True))
+        return grouped
+
     def generate_daily_report(self, db: Session, user_id: int, report_date: date) -> str:
         """Generate daily report"""
+        return self._snapshot_or_cached(
+            db, user_id, "daily", PERIOD_DAY, report_date, report_date,
+            lambda: self._daily_report(db, user_id, report_date),
+        )
+
+    def _daily_report(self, db: Session, user_id: int, report_date: date) -> str:
         # Get totals
         total_sales = get_total_sales(db, user_id, report_date, report_date)
         total_expenses = get_total_expenses(db, user_id, report_date, report_date)
         profit = total_sales - total_expenses
         
         # Get detailed transactions
-        sales = get_sales_by_date(db, user_id, report_date, report_date)
-        expenses = get_today_expenses(db, user_id) if report_date == date.today() else []
+        sales = get_sale_rows_by_date(db, user_id, report_date, report_date)
+        expenses = (
+            get_expense_rows_by_date(db, user_id, report_date, report_date)
+            if report_date == date.today() else []
+        )
         
         # Generate report
         report = f"📊 *Daily Report - {report_date.strftime('%A, %d %B %Y')}*\n\n"
@@ -50,7 +138,7 @@ class ReportGenerator:
         # Sales breakdown
         if sales:
             report += "🛒 *Sales Breakdown*\n"
-            sales_by_product = self.calculator.group_by_category(sales, "product_name")
+            sales_by_product = self._sales_by_product(db, user_id, report_date, report_date, sales)
             for product, amount in list(sales_by_product.items())[:5]:  # Top 5
                 if product:
                     percentage = (amount / total_sales * 100) if total_sales > 0 else 0
@@ -81,6 +169,12 @@ class ReportGenerator:
     def generate_weekly_report(self, db: Session, user_id: int, 
                              week_start: date, week_end: date) -> str:
         """Generate weekly report"""
+        return self._snapshot_or_cached(
+            db, user_id, "weekly", PERIOD_WEEK, week_start, week_end,
+            lambda: self._weekly_report(db, user_id, week_start, week_end),
+        )
+
+    def _weekly_report(self, db: Session, user_id: int, week_start: date, week_end: date) -> str:
         # Get totals
         total_sales = get_total_sales(db, user_id, week_start, week_end)
         total_expenses = get_total_expenses(db, user_id, week_start, week_end)
@@ -123,6 +217,12 @@ class ReportGenerator:
     def generate_monthly_report(self, db: Session, user_id: int,
                               month_start: date, month_end: date) -> str:
         """Generate monthly report"""
+        return self._snapshot_or_cached(
+            db, user_id, "monthly", PERIOD_MONTH, month_start, month_end,
+            lambda: self._monthly_report(db, user_id, month_start, month_end),
+        )
+
+    def _monthly_report(self, db: Session, user_id: int, month_start: date, month_end: date) -> str:
         # Get totals
         total_sales = get_total_sales(db, user_id, month_start, month_end)
         total_expenses = get_total_expenses(db, user_id, month_start, month_end)
@@ -160,53 +260,163 @@ class ReportGenerator:
     def generate_custom_report(self, db: Session, user_id: int,
                              start_date: date, end_date: date) -> str:
         """Generate custom date range report"""
-        total_sales = get_total_sales(db, user_id, start_date, end_date)
-        total_expenses = get_total_expenses(db, user_id, start_date, end_date)
+        return self._cached(
+            db, user_id, "custom", start_date, end_date,
+            lambda: self._custom_report(db, user_id, start_date, end_date),
+        )
+
+    def generate_custom_report_chunks(self, db: Session, user_id: int,
+                                      start_date: date, end_date: date) -> Iterator[str]:
+        """
+        Custom report as Telegram-sized messages. Ranges of a year or more are
+        streamed month by month instead of being rendered (and cached) whole.
+        """
+        if (end_date - start_date).days < CUSTOM_REPORT_STREAM_DAYS:
+            report = self.generate_custom_report(db, user_id, start_date, end_date)
+            return chunk_lines(report.splitlines(keepends=True))
+        return chunk_lines(self._custom_report_lines(db, user_id, start_date, end_date))
+
+    def _custom_report(self, db: Session, user_id: int, start_date: date, end_date: date) -> str:
+        return "".join(self._custom_report_lines(db, user_id, start_date, end_date))
+
+    def _custom_report_lines(self, db: Session, user_id: int,
+                             start_date: date, end_date: date) -> Iterator[str]:
+        # Closed days and months come from snapshots; only the rest is summed live
+        total_sales, total_expenses = ReportSnapshots.period_totals(db, user_id, start_date, end_date)
         profit = total_sales - total_expenses
         
         days = (end_date - start_date).days + 1
         
-        report = f"📅 *Custom Report - {start_date.strftime('%d %b %Y')} to {end_date.strftime('%d %b %Y')}*\n\n"
-        report += f"• Period: {days} days\n"
-        report += f"• Total Sales: {settings.CURRENCY} {total_sales:,.0f}\n"
-        report += f"• Total Expenses: {settings.CURRENCY} {total_expenses:,.0f}\n"
-        report += f"• Net Profit: {settings.CURRENCY} {profit:,.0f}\n"
-        report += f"• Daily Average: {settings.CURRENCY} {profit/days:,.0f}\n\n"
+        yield f"📅 *Custom Report - {start_date.strftime('%d %b %Y')} to {end_date.strftime('%d %b %Y')}*\n\n"
+        yield f"• Period: {days} days\n"
+        yield f"• Total Sales: {settings.CURRENCY} {total_sales:,.0f}\n"
+        yield f"• Total Expenses: {settings.CURRENCY} {total_expenses:,.0f}\n"
+        yield f"• Net Profit: {settings.CURRENCY} {profit:,.0f}\n"
+        yield f"• Daily Average: {settings.CURRENCY} {profit/days:,.0f}\n\n"
         
         # Add insights
         if days >= 7:
             weekly_avg = profit / (days / 7)
-            report += f"• Weekly Average: {settings.CURRENCY} {weekly_avg:,.0f}\n"
+            yield f"• Weekly Average: {settings.CURRENCY} {weekly_avg:,.0f}\n"
         
         if days >= 30:
             monthly_avg = profit / (days / 30)
-            report += f"• Monthly Average: {settings.CURRENCY} {monthly_avg:,.0f}\n"
+            yield f"• Monthly Average: {settings.CURRENCY} {monthly_avg:,.0f}\n"
         
+        # Shape of the range, one line per month with activity
+        if (start_date.year, start_date.month) != (end_date.year, end_date.month):
+            yield "\n📆 *Monthly Breakdown*\n"
+            active_months = 0
+            for month, month_sales, month_expenses in ReportSnapshots.monthly_totals(
+                    db, user_id, start_date, end_date):
+                active_months += 1
+                month_profit = month_sales - month_expenses
+                emoji = "🟢" if month_profit > 0 else "🔴" if month_profit < 0 else "⚪"
+                yield (
+                    f"{emoji} {month.strftime('%b %Y')}: {settings.CURRENCY} {month_sales:,.0f} sales, "
+                    f"{settings.CURRENCY} {month_profit:,.0f} profit\n"
+                )
+            if not active_months:
+                yield "• No sales or expenses in this range\n"
+
+    def generate_margin_report(self, db: Session, user_id: int, start_date: date,
+                               end_date: date, label: str | None = None) -> str:
+        """Gross margin per product and category; closed periods stay cached until history changes."""
+        return self._cached(
+            db, user_id, f"margins:{label or 'Custom'}", start_date, end_date,
+            lambda: self._margin_report(db, user_id, start_date, end_date, label),
+        )
+
+    def _margin_report(self, db: Session, user_id: int, start_date: date,
+                       end_date: date, label: str | None) -> str:
+        analysis = MarginEngine.load(db, user_id, start_date, end_date)
+        total = analysis.total
+
+        report = f"💹 *Margin Report - {label or 'Custom'}*\n"
+        report += f"📅 {start_date.strftime('%d %b')} - {end_date.strftime('%d %b %Y')}\n\n"
+
+        if not total.revenue:
+            report += "No sales recorded in this period yet.\n"
+            return report
+
+        report += "💰 *Summary*\n"
+        report += f"• Revenue: {settings.CURRENCY} {total.revenue:,.0f}\n"
+        report += f"• Cost of Goods: {settings.CURRENCY} {total.cogs:,.0f}\n"
+        if total.has_cost:
+            report += f"• Gross Margin: {settings.CURRENCY} {total.margin:,.0f} ({total.margin_pct:.1f}%)\n"
+        if analysis.cost_coverage < 100:
+            report += f"• Cost known for {analysis.cost_coverage:.0f}% of revenue\n"
+        report += "\n"
+
+        if analysis.ranking:
+            report += "🏆 *Contribution Ranking*\n"
+            for position, line in enumerate(analysis.ranking[:MARGIN_RANKING_LIMIT], start=1):
+                report += (
+                    f"{position}. {line.name}: {settings.CURRENCY} {line.margin:,.0f} "
+                    f"({line.margin_pct:.1f}% margin, {analysis.contribution(line):.0f}% of total)\n"
+                )
+            if len(analysis.ranking) > MARGIN_RANKING_LIMIT:
+                report += f"... and {len(analysis.ranking) - MARGIN_RANKING_LIMIT} more products\n"
+            report += "\n"
+
+        if len(analysis.categories) > 1 or analysis.categories[0].name != UNCATEGORIZED:
+            report += "🗂 *By Category*\n"
+            for line in analysis.categories:
+                if line.has_cost:
+                    report += (
+                        f"• {line.name}: {settings.CURRENCY} {line.margin:,.0f} "
+                        f"({line.margin_pct:.1f}% margin)\n"
+                    )
+                else:
+                    report += f"• {line.name}: {settings.CURRENCY} {line.revenue:,.0f} revenue, cost unknown\n"
+            report += "\n"
+
+        if analysis.uncosted:
+            names = ", ".join(line.name for line in analysis.uncosted[:3])
+            report += f"💡 *Tip:* Set a purchase price for {names} to include them in margins.\n"
+
         return report
 
-    def generate_insights_report(self, db: Session, user_id: int, days: int = 7) -> str:
+    def generate_insights_report(self, db: Session, user_id: int, days: int = 7,
+                                 label: str | None = None) -> str:
         """Generate trend-focused business insights with recommendations."""
         period_end = date.today()
+        return self._cached(
+            db, user_id, f"insights:{label or days}", period_end - timedelta(days=days - 1), period_end,
+            lambda: self._insights_report(db, user_id, days, label),
+        )
+
+    def _insights_report(self, db: Session, user_id: int, days: int, label: str | None) -> str:
+        """
+        The current and previous `days` are loaded once and bucketed by day,
+        so period-over-period figures come from the same arrays.
+        """
+        period_end = date.today()
         period_start = period_end - timedelta(days=days - 1)
         previous_end = period_start - timedelta(days=1)
         previous_start = previous_end - timedelta(days=days - 1)
+        label = label or f"{days} Days"
 
-        sales = get_sales_by_date(db, user_id, period_start, period_end)
-        expenses = get_expenses_by_date(db, user_id, period_start, period_end)
+        both_sales = Analytics.load_sales(db, user_id, previous_start, period_end)
+        both_expenses = Analytics.load_expenses(db, user_id, previous_start, period_end)
+        daily_sales = both_sales.daily_totals()
+        daily_expenses = both_expenses.daily_totals()
+        sales = both_sales.between(period_start, period_end)
+        expenses = both_expenses.between(period_start, period_end)
 
-        current_sales = self.calculator.calculate_total(sales) if sales else 0.0
-        current_expenses = self.calculator.calculate_total(expenses) if expenses else 0.0
+        current_sales = float(daily_sales[days:].sum())
+        current_expenses = float(daily_expenses[days:].sum())
         current_profit = current_sales - current_expenses
 
-        previous_sales = get_total_sales(db, user_id, previous_start, previous_end)
-        previous_expenses = get_total_expenses(db, user_id, previous_start, previous_end)
+        previous_sales = float(daily_sales[:days].sum())
+        previous_expenses = float(daily_expenses[:days].sum())
         previous_profit = previous_sales - previous_expenses
 
         sales_change = self.calculator.calculate_growth(current_sales, previous_sales)
         expenses_change = self.calculator.calculate_growth(current_expenses, previous_expenses)
         profit_change = self.calculator.calculate_growth(current_profit, previous_profit)
 
-        sales_by_product = self.calculator.group_by_category(sales, "product_name")
+        sales_by_product = self._sales_by_product(db, user_id, period_start, period_end, sales)
         sales_by_product = {
             product: amount
             for product, amount in sales_by_product.items()
@@ -214,19 +424,19 @@ class ReportGenerator:
         }
         top_product, top_product_revenue = self._top_item(sales_by_product)
 
-        expense_by_category = self.calculator.group_by_category(expenses, "category")
-        top_expense_category, top_expense_amount = self._top_item(expense_by_category)
+        top_expense = expenses.top_groups(1, skip_blank=False)
+        top_expense_category, top_expense_amount = top_expense[0] if top_expense else (None, 0.0)
 
-        daily_profit = {}
-        cursor = period_start
-        while cursor <= period_end:
-            day_sales = sum(sale.amount for sale in sales if sale.sale_date.date() == cursor)
-            day_expenses = sum(expense.amount for expense in expenses if expense.expense_date.date() == cursor)
-            daily_profit[cursor] = day_sales - day_expenses
-            cursor += timedelta(days=1)
+        daily_profit = daily_sales[days:] - daily_expenses[days:]
+        best_day, worst_day = Analytics.extreme_days(period_start, daily_profit)
 
-        best_day = max(daily_profit.items(), key=lambda item: item[1]) if daily_profit else None
-        worst_day = min(daily_profit.items(), key=lambda item: item[1]) if daily_profit else None
+        trend = None
+        if days >= TREND_WINDOW * 2:
+            weekly_average = Analytics.moving_average(daily_sales[days:], TREND_WINDOW)
+            trend = (
+                float(weekly_average[-1]),
+                float(Analytics.growth(weekly_average[-1], weekly_average[TREND_WINDOW - 1])),
+            )
 
         products = get_products(db, user_id)
         low_stock = [product for product in products if product.stock <= product.min_stock]
@@ -238,7 +448,7 @@ class ReportGenerator:
         avg_daily_sales = current_sales / days
         avg_daily_profit = current_profit / days
 
-        report = f"🚀 *Business Insights ({days} Days)*\n"
+        report = f"🚀 *Business Insights ({label})*\n"
         report += f"📅 {period_start.strftime('%d %b')} - {period_end.strftime('%d %b %Y')}\n\n"
 
         report += "💼 *Performance Snapshot*\n"
@@ -256,7 +466,13 @@ class ReportGenerator:
         )
         report += f"• Profit Margin: {profit_margin:.1f}%\n"
         report += f"• Avg Daily Sales: {settings.CURRENCY} {avg_daily_sales:,.0f}\n"
-        report += f"• Avg Daily Profit: {settings.CURRENCY} {avg_daily_profit:,.0f}\n\n"
+        report += f"• Avg Daily Profit: {settings.CURRENCY} {avg_daily_profit:,.0f}\n"
+        if trend:
+            report += (
+                f"• {TREND_WINDOW}-Day Avg Sales: {settings.CURRENCY} {trend[0]:,.0f} "
+                f"({self._format_change(trend[1])} since the start of the period)\n"
+            )
+        report += "\n"
 
         report += "🔎 *Key Drivers*\n"
         if top_product:
@@ -0,0 +1,168 @@
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.database import connection
+from app.database.connection import iter_shards, use_shard
+from app.database.crud import bulk_insert, get_business
+from app.database.models import (
+    ARCHIVE_MODELS, SHARDED_TABLES, Base, Business, ReportSnapshot, Sale, TenantShard,
+)
+from app.services.tenant_backup import UNIQUE_COLUMNS, RestoreResult, TenantArchive, generate_key
+
+logger = logging.getLogger(__name__)
+
+
+def _router():
+    if connection.shard_router is None:
+        raise ValueError("Sharding is off (DB_SHARD_COUNT=1)")
+    return connection.shard_router
+
+
+class ShardRebalancer:
+    """
+    Moves a business between SQLite shards. The move travels as a
+    per-business archive: exported from the source shard, restored on the
+    target with fresh ids (ids repeat across shards), and only then deleted
+    from the source. Writes to the business during a move would be lost,
+    so run it while the bot is stopped or the business is idle.
+    """
+
+    @staticmethod
+    def status(db: Session) -> Dict[int, dict]:
+        """{shard: {"businesses": n, "sales": rows}}."""
+        _router()
+        assigned = dict(db.query(TenantShard.shard, func.count()).group_by(TenantShard.shard).all())
+        unassigned = db.query(func.count(Business.id)).filter(
+            Business.is_active == True,
+            ~Business.owner_user_id.in_(select(TenantShard.scope_user_id)),
+        ).scalar()
+        status = {}
+        for shard in iter_shards(db):
+            status[shard] = {
+                "businesses": assigned.get(shard, 0) + (unassigned if shard == 0 else 0),
+                "sales": db.query(func.count(Sale.id)).scalar(),
+            }
+        db.info.pop("shard", None)
+        return status
+
+    @staticmethod
+    def _purge(db: Session, shard: int, scope_user_id: int) -> None:
+        use_shard(db, shard)
+        for name in sorted(SHARDED_TABLES):
+            table = Base.metadata.tables[name]
+            db.execute(table.delete().where(table.c.user_id == scope_user_id))
+        db.commit()
+
+    @staticmethod
+    def _check_unique_values(router, source: int, target: int, business_id: int, scope_user_id: int) -> None:
+        """
+        A restore clears SKUs and phone numbers already used on the target;
+        in a move that would silently lose them, so refuse instead.
+        """
+        for table_name, column_name in UNIQUE_COLUMNS.items():
+            table = Base.metadata.tables[table_name]
+            column = table.c[column_name]
+            with router.engine(source).connect() as connection:
+                values = {value for (value,) in connection.execute(
+                    select(column).where(table.c.user_id == scope_user_id, column.isnot(None))
+                )}
+            if not values:
+                continue
+            with router.engine(target).connect() as connection:
+                clashes = sorted(values.intersection(
+                    value for (value,) in connection.execute(select(column).where(column.isnot(None)))
+                ))
+            if clashes:
+                shown = ", ".join(clashes[:5]) + (", ..." if len(clashes) > 5 else "")
+                raise ValueError(
+                    f"Shard {target} already uses {len(clashes)} {column_name} value(s) of business "
+                    f"{business_id} ({shown}); change them before moving"
+                )
+
+    @staticmethod
+    def _check_id_reuse(router, shard: int, scope_user_id: int) -> None:
+        """
+        Hot tables created before AUTOINCREMENT hand out max(id) + 1. Purging the
+        business from such a shard lowers max(id), so refuse when other
+        businesses' archived rows there hold ids above what would remain.
+        """
+        with router.engine(shard).connect() as connection:
+            for model, (archive, _) in ARCHIVE_MODELS.items():
+                hot, archived = model.__table__, archive.__table__
+                ddl = connection.execute(
+                    text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": hot.name}
+                ).scalar()
+                if "AUTOINCREMENT" in (ddl or "").upper():
+                    continue
+                highest_archived = connection.execute(
+                    select(func.max(archived.c.id)).where(archived.c.user_id != scope_user_id)
+                ).scalar()
+                remaining = connection.execute(
+                    select(func.max(hot.c.id)).where(hot.c.user_id != scope_user_id)
+                ).scalar()
+                if highest_archived is not None and highest_archived > (remaining or 0):
+                    raise ValueError(
+                        f"Moving off shard {shard} would let {hot.name} reuse archived ids "
+                        f"(table predates AUTOINCREMENT)"
+                    )
+
+    @staticmethod
+    def _assign(db: Session, scope_user_id: int, shard: int) -> None:
+        assignment = db.get(TenantShard, scope_user_id)
+        if assignment is None:
+            assignment = TenantShard(scope_user_id=scope_user_id)
+            db.add(assignment)
+        assignment.shard = shard
+        assignment.moved_at = datetime.now()
+        db.commit()
+        db.info.pop("scope", None)
+
+    @staticmethod
+    def move(db: Session, business_id: int, target: int) -> RestoreResult:
+        router = _router()
+        business = get_business(db, business_id)
+        if business is None:
+            raise ValueError(f"Business {business_id} not found")
+        scope_user_id = business.owner_user_id
+        source = router.shard_for(db, scope_user_id)
+        if source == target:
+            raise ValueError(f"Business {business_id} is already on shard {target}")
+        router.engine(target)  # validates the shard number
+        if router.has_data(target, scope_user_id):
+            raise ValueError(f"Shard {target} already holds data of business {business_id}")
+        ShardRebalancer._check_unique_values(router, source, target, business_id, scope_user_id)
+        ShardRebalancer._check_id_reuse(router, source, scope_user_id)
+
+        archive = TenantArchive(generate_key())
+        os.makedirs(router.directory, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=router.directory) as scratch:
+            path = os.path.join(scratch, f"business_{business_id}.tar")
+            archive.export_business(db, business_id, path)
+            snapshots = ReportSnapshot.__table__
+            kept = [dict(row._mapping) for row in db.execute(
+                select(snapshots).where(snapshots.c.user_id == scope_user_id)
+            )]
+
+            ShardRebalancer._assign(db, scope_user_id, target)
+            try:
+                result = archive.restore(db, path)
+                for row in kept:
+                    row.pop("id")
+                bulk_insert(db, ReportSnapshot, kept)
+                db.commit()
+            except Exception:
+                db.rollback()
+                ShardRebalancer._purge(db, target, scope_user_id)
+                ShardRebalancer._assign(db, scope_user_id, source)
+                raise
+
+        ShardRebalancer._purge(db, source, scope_user_id)
+        db.info.pop("shard", None)
+        logger.info("Moved business %s from shard %s to %s", business_id, source, target)
+        return result
@@ -0,0 +1,237 @@
+import json
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy.orm import Session
+
+from app.database.crud import (
+    get_daily_totals, get_report_snapshot_keys, get_report_snapshots,
+    get_total_expenses, get_total_sales, iter_monthly_totals, save_report_snapshot,
+)
+from app.services.analytics import Analytics
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PERIOD_DAY = "day"
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+
+
+def business_today(tz_name: Optional[str], now: Optional[datetime] = None) -> date:
+    """Calendar date in the business timezone; unknown zones fall back to settings.TIMEZONE."""
+    now = now or datetime.now(timezone.utc)
+    try:
+        zone = ZoneInfo(tz_name or settings.TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = ZoneInfo(settings.TIMEZONE)
+    return now.astimezone(zone).date()
+
+
+def next_month(month_start: date) -> date:
+    return (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def closed_periods(last_closed_day: date, lookback_days: int = 1) -> List[Tuple[str, date, date]]:
+    """
+    (period_type, start, end) of every day, Monday-Sunday week and calendar
+    month that ended within the `lookback_days` days up to `last_closed_day`.
+    """
+    periods = []
+    for offset in range(lookback_days - 1, -1, -1):
+        day = last_closed_day - timedelta(days=offset)
+        periods.append((PERIOD_DAY, day, day))
+        if day.weekday() == 6:
+            periods.append((PERIOD_WEEK, day - timedelta(days=6), day))
+        if (day + timedelta(days=1)).day == 1:
+            periods.append((PERIOD_MONTH, day.replace(day=1), day))
+    return periods
+
+
+class ReportSnapshots:
+    """
+    Totals, breakdowns and the rendered report of closed periods, stored once
+    in report_snapshots so past reports become single-row reads.
+    """
+
+    @staticmethod
+    def build(db: Session, scope_user_id: int, period_type: str,
+              start: date, end: date):
+        """Compute and store one period's snapshot; the caller commits."""
+        from app.services.reports import ReportGenerator
+
+        generator = ReportGenerator()
+        sales = Analytics.load_sales(db, scope_user_id, start, end)
+        expenses = Analytics.load_expenses(db, scope_user_id, start, end)
+        total_sales, total_expenses = sales.total(), expenses.total()
+        sales_by_product = generator._sales_by_product(db, scope_user_id, start, end, sales)
+
+        if period_type == PERIOD_DAY:
+            rendered = generator._daily_report(db, scope_user_id, start)
+        elif period_type == PERIOD_WEEK:
+            rendered = generator._weekly_report(db, scope_user_id, start, end)
+        else:
+            rendered = generator._monthly_report(db, scope_user_id, start, end)
+
+        payload = {
+            "profit": total_sales - total_expenses,
+            "sales_by_product": {
+                str(name): amount for name, amount in sales_by_product.items() if name
+            },
+            "expenses_by_category": {
+                str(name): amount for name, amount in expenses.grouped().items() if name
+            },
+        }
+        return save_report_snapshot(
+            db, scope_user_id, period_type, start, end,
+            total_sales=total_sales,
+            total_expenses=total_expenses,
+            sales_count=len(sales),
+            expense_count=len(expenses),
+            payload=json.dumps(payload),
+            rendered=rendered,
+        )
+
+    @staticmethod
+    def snapshot_due(db: Session, now: Optional[datetime] = None,
+                     lookback_days: Optional[int] = None) -> int:
+        """
+        Snapshot every closed period of every active business that has none yet.
+        A day counts as closed once it is over both in the business timezone and
+        on the server clock the rows are stamped with. Returns snapshots written.
+        """
+        from app.database.models import Business
+
+        lookback_days = lookback_days or settings.SNAPSHOT_LOOKBACK_DAYS
+        server_today = date.today()
+        businesses = db.query(Business.owner_user_id, Business.timezone).filter(
+            Business.is_active == True
+        ).all()
+
+        due = []
+        for scope_user_id, tz_name in businesses:
+            last_closed = min(business_today(tz_name, now), server_today) - timedelta(days=1)
+            for period in closed_periods(last_closed, lookback_days):
+                due.append((scope_user_id, *period))
+        if not due:
+            return 0
+
+        existing = get_report_snapshot_keys(db, min(start for _, _, start, _ in due))
+        written = 0
+        for scope_user_id, period_type, start, end in due:
+            if (scope_user_id, period_type, start) in existing:
+                continue
+            try:
+                ReportSnapshots.build(db, scope_user_id, period_type, start, end)
+                db.commit()
+                written += 1
+            except Exception as exc:
+                db.rollback()
+                logger.warning("Snapshot %s %s failed for scope %s: %s",
+                               period_type, start, scope_user_id, exc)
+        return written
+
+    @staticmethod
+    def rebuild_months(db: Session, scope_user_id: int, start: date, end: date) -> int:
+        """Snapshot every closed month overlapping [start, end], e.g. after an import."""
+        written = 0
+        month = start.replace(day=1)
+        today = date.today()
+        while month <= end:
+            month_end = next_month(month) - timedelta(days=1)
+            if month_end >= today:
+                break
+            ReportSnapshots.build(db, scope_user_id, PERIOD_MONTH, month, month_end)
+            db.commit()
+            written += 1
+            month = next_month(month)
+        return written
+
+    @staticmethod
+    def fill_months(db: Session, scope_user_id: int, start: date, end: date) -> int:
+        """Snapshot the closed months overlapping [start, end] that have no snapshot yet."""
+        existing = {
+            snapshot.period_start
+            for snapshot in get_report_snapshots(db, scope_user_id, start.replace(day=1), end, (PERIOD_MONTH,))
+        }
+        written = 0
+        month = start.replace(day=1)
+        today = date.today()
+        while month <= end:
+            month_end = next_month(month) - timedelta(days=1)
+            if month_end >= today:
+                break
+            if month not in existing:
+                ReportSnapshots.build(db, scope_user_id, PERIOD_MONTH, month, month_end)
+                db.commit()
+                written += 1
+            month = next_month(month)
+        return written
+
+    @staticmethod
+    def period_totals(db: Session, user_id: int, start: date, end: date) -> Tuple[float, float]:
+        """
+        (sales, expenses) over [start, end], stitched from the largest stored
+        snapshots; only days no snapshot covers, including the open edge, are
+        queried live.
+        """
+        covered = set()
+        total_sales = total_expenses = 0.0
+        closed_end = min(end, date.today() - timedelta(days=1))
+        if start <= closed_end:
+            snapshots = sorted(
+                get_report_snapshots(db, user_id, start, closed_end),
+                key=lambda snapshot: snapshot.period_start - snapshot.period_end,
+            )
+            for snapshot in snapshots:
+                days = range(snapshot.period_start.toordinal(), snapshot.period_end.toordinal() + 1)
+                if not covered.isdisjoint(days):
+                    continue
+                covered.update(days)
+                total_sales += snapshot.total_sales or 0.0
+                total_expenses += snapshot.total_expenses or 0.0
+
+        gaps = [day for day in range(start.toordinal(), end.toordinal() + 1) if day not in covered]
+        if not gaps:
+            return total_sales, total_expenses
+
+        first, last = date.fromordinal(gaps[0]), date.fromordinal(gaps[-1])
+        if len(gaps) == gaps[-1] - gaps[0] + 1:
+            total_sales += get_total_sales(db, user_id, first, last)
+            total_expenses += get_total_expenses(db, user_id, first, last)
+        else:
+            gap_days = set(gaps)
+            for day, (sales, expenses) in get_daily_totals(db, user_id, first, last).items():
+                if day.toordinal() in gap_days:
+                    total_sales += sales
+                    total_expenses += expenses
+        return total_sales, total_expenses
+
+    @staticmethod
+    def monthly_totals(db: Session, user_id: int, start: date, end: date) -> Iterator[Tuple[date, float, float]]:
+        """
+        (month_start, sales, expenses) per month with activity, oldest first.
+        Months with a stored snapshot are taken from it; each run of months
+        without one is streamed from a single grouped query.
+        """
+        snapshots = {
+            snapshot.period_start: snapshot
+            for snapshot in get_report_snapshots(db, user_id, start, end, (PERIOD_MONTH,))
+        }
+        run_start = None
+        month = start.replace(day=1)
+        while month <= end:
+            snapshot = snapshots.get(month)
+            if snapshot is None:
+                run_start = run_start or max(month, start)
+            else:
+                if run_start:
+                    yield from iter_monthly_totals(db, user_id, run_start, month - timedelta(days=1))
+                    run_start = None
+                if snapshot.sales_count or snapshot.expense_count:
+                    yield month, snapshot.total_sales or 0.0, snapshot.total_expenses or 0.0
+            month = next_month(month)
+        if run_start:
+            yield from iter_monthly_totals(db, user_id, run_start, end)
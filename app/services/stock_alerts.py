@@ -0,0 +1,185 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class LowStockEvent:
+    """Emitted when a product's stock is at or below min_stock and no alert for it is open."""
+    __slots__ = ("user_id", "product_id", "product_name", "stock", "min_stock", "previous_stock")
+
+    def __init__(self, user_id: int, product_id: int, product_name: str,
+                 stock: int, min_stock: int, previous_stock: int):
+        self.user_id = user_id
+        self.product_id = product_id
+        self.product_name = product_name
+        self.stock = stock
+        self.min_stock = min_stock
+        self.previous_stock = previous_stock
+
+    def __repr__(self):
+        return (
+            f"<LowStockEvent(product_id={self.product_id}, stock={self.stock}, "
+            f"min_stock={self.min_stock})>"
+        )
+
+
+_listeners: List[Callable[[Session, LowStockEvent], None]] = []
+
+
+def subscribe(listener: Callable[[Session, LowStockEvent], None]) -> None:
+    """
+    Register a low-stock listener.
+    Listeners run before the mutation commits and receive its session,
+    so anything they stage lands in the same transaction.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[Session, LowStockEvent], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def crossed_below_minimum(previous_stock: int, stock: int, min_stock: int) -> bool:
+    return previous_stock > min_stock >= stock
+
+
+def crossed_above_minimum(previous_stock: int, stock: int, min_stock: int) -> bool:
+    return previous_stock <= min_stock < stock
+
+
+def has_open_alert(db: Session, user_id: int, product_id: int) -> bool:
+    """Whether the product is in the pending set or was announced and not restocked since."""
+    from app.database.models import LowStockAlert
+
+    return db.query(LowStockAlert.id).filter(
+        LowStockAlert.user_id == user_id,
+        LowStockAlert.product_id == product_id,
+        LowStockAlert.status.in_(("pending", "notified")),
+    ).first() is not None
+
+
+def on_stock_change(db: Session, product, previous_stock: int) -> None:
+    """
+    Low-stock detector for every stock mutation and for new products (called
+    with previous_stock == stock). Falling to or below min_stock emits a
+    LowStockEvent; so does any mutation that leaves the product at or below it
+    without an open alert (created low, or low since before alerts existed).
+    Rising back above it drops the product from the pending-alert set.
+    """
+    min_stock = product.min_stock or 0
+    if product.stock <= min_stock and (
+        crossed_below_minimum(previous_stock, product.stock, min_stock)
+        or not has_open_alert(db, product.user_id, product.id)
+    ):
+        event = LowStockEvent(
+            user_id=product.user_id,
+            product_id=product.id,
+            product_name=product.name,
+            stock=product.stock,
+            min_stock=min_stock,
+            previous_stock=previous_stock,
+        )
+        logger.info("Low stock: %s", event)
+        for listener in list(_listeners):
+            listener(db, event)
+    elif crossed_above_minimum(previous_stock, product.stock, min_stock):
+        clear_pending_alert(db, product.user_id, product.id)
+
+
+def record_pending_alert(db: Session, event: LowStockEvent) -> None:
+    """Add the product to its business's pending-alert set (one row per product)."""
+    from app.database.models import LowStockAlert
+
+    alert = db.query(LowStockAlert).filter(
+        LowStockAlert.user_id == event.user_id,
+        LowStockAlert.product_id == event.product_id,
+    ).first()
+    if alert is None:
+        alert = LowStockAlert(user_id=event.user_id, product_id=event.product_id)
+        db.add(alert)
+    # notified_at is kept so a product bouncing around its threshold is not re-announced
+    alert.status = "pending"
+    alert.stock = event.stock
+    alert.min_stock = event.min_stock
+
+
+def clear_pending_alert(db: Session, user_id: int, product_id: int) -> None:
+    """Restocked: leave the pending set but keep notified_at for debouncing."""
+    from app.database.models import LowStockAlert
+
+    db.query(LowStockAlert).filter(
+        LowStockAlert.user_id == user_id,
+        LowStockAlert.product_id == product_id,
+    ).update({"status": "resolved"}, synchronize_session=False)
+
+
+def get_due_alerts(db: Session, cooldown_hours: int, now: datetime = None) -> Dict[int, list]:
+    """
+    Pending alerts that are past their debounce window, grouped by business scope.
+    Reads only the pending set, never the product catalog.
+    """
+    from app.database.models import LowStockAlert, Product
+
+    now = now or datetime.now()
+    cutoff = now - timedelta(hours=cooldown_hours)
+    rows = db.query(LowStockAlert, Product.name, Product.stock).join(
+        Product, Product.id == LowStockAlert.product_id
+    ).filter(
+        LowStockAlert.status == "pending",
+        (LowStockAlert.notified_at.is_(None)) | (LowStockAlert.notified_at <= cutoff),
+    ).order_by(LowStockAlert.user_id, Product.stock).all()
+
+    due = {}
+    for alert, name, stock in rows:
+        due.setdefault(alert.user_id, []).append((alert, name, stock))
+    return due
+
+
+def mark_notified(db: Session, alerts: list, now: datetime = None) -> None:
+    now = now or datetime.now()
+    for alert in alerts:
+        alert.status = "notified"
+        alert.notified_at = now
+    db.commit()
+
+
+def rebuild_pending_alerts(db: Session) -> int:
+    """
+    One-off full scan that seeds the pending set with products already below
+    min_stock (e.g. after upgrading). Regular operation never needs it.
+    """
+    from app.database.connection import iter_shards
+    from app.database.models import LowStockAlert, Product
+
+    added = 0
+    for _ in iter_shards(db):
+        existing = {
+            (alert.user_id, alert.product_id): alert
+            for alert in db.query(LowStockAlert).all()
+        }
+        low = db.query(Product).filter(
+            Product.is_active == True,
+            Product.stock <= Product.min_stock,
+        ).all()
+
+        for product in low:
+            alert = existing.get((product.user_id, product.id))
+            if alert is None:
+                alert = LowStockAlert(user_id=product.user_id, product_id=product.id)
+                db.add(alert)
+            elif alert.status != "resolved":
+                continue
+            alert.status = "pending"
+            alert.stock = product.stock
+            alert.min_stock = product.min_stock
+            added += 1
+        db.commit()
+    return added
+
+
+subscribe(record_pending_alert)
@@ -0,0 +1,354 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import Date, DateTime
+from sqlalchemy.orm import Session
+
+from app.database.connection import route_session
+from app.database.crud import (
+    archive_reached, bulk_insert, bulk_insert_with_ids, create_business, finish_import,
+    get_business, rows_source,
+)
+from app.database.models import (
+    ARCHIVE_MODELS, ActivityLog, Business, BusinessMember, Customer, Expense, LowStockAlert,
+    Product, Sale, SaleItem, Transaction, User,
+)
+from app.services.catalog import product_name_index
+from config import settings
+
+ARCHIVE_FORMAT = 1
+TENANT_CHUNK_ROWS = 20_000
+MANIFEST_NAME = "manifest.json.enc"
+
+# Restore order: (table, model, scope column, {column: table whose ids it holds})
+TENANT_TABLES = [
+    ("products", Product, "user_id", {}),
+    ("customers", Customer, "user_id", {}),
+    ("sales", Sale, "user_id", {"customer_id": "customers"}),
+    ("sale_items", SaleItem, "user_id", {"sale_id": "sales", "product_id": "products"}),
+    ("expenses", Expense, "user_id", {}),
+    ("transactions", Transaction, "user_id", {"customer_id": "customers"}),
+    ("low_stock_alerts", LowStockAlert, "user_id", {"product_id": "products"}),
+    ("business_members", BusinessMember, "business_id", {"user_id": "users", "invited_by": "users"}),
+    ("activity_logs", ActivityLog, "business_id", {"actor_user_id": "users"}),
+]
+# Tables whose new ids other tables need
+REFERENCED_TABLES = {"products", "customers", "sales", "expenses"}
+# Transaction.reference_id points at a sale or an expense depending on its type
+REFERENCE_TABLES = {"sale": "sales", "expense": "expenses"}
+# Globally unique columns; values already taken on the target are cleared on restore
+UNIQUE_COLUMNS = {"products": "sku", "customers": "phone"}
+
+_USER_COLUMNS = ("id", "telegram_id", "username", "full_name", "phone", "business_name",
+                 "currency", "language", "is_active", "created_at")
+_BUSINESS_COLUMNS = ("name", "currency", "timezone", "logo_file_id")
+
+
+def generate_key() -> str:
+    """A new random TENANT_BACKUP_KEY (AES-256, urlsafe base64)."""
+    return base64.urlsafe_b64encode(os.urandom(32)).decode()
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+def _decoders(model, columns: List[str]) -> list:
+    decoders = []
+    for name in columns:
+        column_type = model.__table__.c[name].type
+        if isinstance(column_type, DateTime):
+            decoders.append(datetime.fromisoformat)
+        elif isinstance(column_type, Date):
+            decoders.append(date.fromisoformat)
+        else:
+            decoders.append(None)
+    return decoders
+
+
+class RestoreResult:
+    __slots__ = ("business_id", "owner_user_id", "rows", "cleared")
+
+    def __init__(self):
+        self.business_id: Optional[int] = None
+        self.owner_user_id: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self.cleared = 0  # SKUs and phone numbers already taken on the target
+
+    def __repr__(self):
+        return f"<RestoreResult(business_id={self.business_id}, rows={sum(self.rows.values())})>"
+
+
+class TenantArchive:
+    """
+    Logical backup of one business: every row scoped to it, streamed in
+    chunks of `chunk_rows` into a tar archive. Each chunk is gzip-compressed
+    JSON, encrypted with AES-256-GCM under TENANT_BACKUP_KEY and bound to its
+    member name, so chunks cannot be swapped or altered unnoticed. The
+    encrypted manifest lists the tables, columns, row counts and a sha256 of
+    every chunk.
+
+    `restore` loads an archive into any database (another node, or the same
+    one): users are matched by Telegram id and every other id is remapped.
+    """
+
+    def __init__(self, key: Optional[str] = None, chunk_rows: int = TENANT_CHUNK_ROWS):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        key = key or settings.TENANT_BACKUP_KEY
+        if not key:
+            raise ValueError("Set TENANT_BACKUP_KEY (python scripts/tenant_backup.py keygen)")
+        self._cipher = AESGCM(base64.urlsafe_b64decode(key))
+        self.chunk_rows = chunk_rows
+
+    def _seal(self, name: str, data: bytes) -> bytes:
+        nonce = os.urandom(12)
+        return nonce + self._cipher.encrypt(nonce, data, name.encode())
+
+    def _open(self, name: str, sealed: bytes) -> bytes:
+        from cryptography.exceptions import InvalidTag
+
+        try:
+            return self._cipher.decrypt(sealed[:12], sealed[12:], name.encode())
+        except InvalidTag:
+            raise ValueError(f"{name}: wrong key or damaged archive") from None
+
+    @staticmethod
+    def _add(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(datetime.now().timestamp())
+        archive.addfile(info, io.BytesIO(data))
+
+    # Export
+
+    def _iter_chunks(self, db: Session, model, columns: List[str], scope_column: str,
+                     scope_id: int) -> Iterator[list]:
+        # Archived sales and expenses travel with the hot rows and are restored as hot rows
+        source = (rows_source(db, model, scope_id) if model in ARCHIVE_MODELS else model.__table__).c
+        query = db.query(*(source[name] for name in columns)).filter(
+            source[scope_column] == scope_id
+        ).order_by(source.id).execution_options(stream_results=True).yield_per(self.chunk_rows)
+        chunk = []
+        for row in query:
+            chunk.append(list(row))
+            if len(chunk) == self.chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def export_business(self, db: Session, business_id: int, path: str) -> dict:
+        """Write the business's archive to `path`; returns the manifest."""
+        business = get_business(db, business_id)
+        if business is None:
+            raise ValueError(f"Business {business_id} not found")
+        scopes = {"user_id": business.owner_user_id, "business_id": business.id}
+        route_session(db, business.owner_user_id)
+
+        manifest = {
+            "format": ARCHIVE_FORMAT,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "business": {name: getattr(business, name) for name in _BUSINESS_COLUMNS},
+            "owner_user_id": business.owner_user_id,
+            "tables": {},
+        }
+        with tarfile.open(f"{path}.tmp", "w") as archive:
+            for table, model, scope_column, _ in TENANT_TABLES:
+                columns = [column.name for column in model.__table__.columns if column.name != scope_column]
+                chunks = []
+                for chunk in self._iter_chunks(db, model, columns, scope_column, scopes[scope_column]):
+                    name = f"{table}/{len(chunks):06d}.json.gz.enc"
+                    plain = json.dumps(chunk, default=_encode, separators=(",", ":")).encode()
+                    self._add(archive, name, self._seal(name, gzip.compress(plain, compresslevel=6)))
+                    chunks.append({"name": name, "rows": len(chunk), "sha256": hashlib.sha256(plain).hexdigest()})
+                manifest["tables"][table] = {
+                    "columns": columns,
+                    "rows": sum(chunk["rows"] for chunk in chunks),
+                    "chunks": chunks,
+                }
+
+            user_ids = {business.owner_user_id}
+            user_ids.update(
+                user_id for member in db.query(BusinessMember.user_id, BusinessMember.invited_by)
+                .filter(BusinessMember.business_id == business.id) for user_id in member if user_id
+            )
+            user_ids.update(
+                actor for (actor,) in db.query(ActivityLog.actor_user_id)
+                .filter(ActivityLog.business_id == business.id).distinct()
+            )
+            users = db.query(*(User.__table__.c[name] for name in _USER_COLUMNS)).filter(
+                User.id.in_(user_ids)
+            ).all()
+            manifest["users"] = {"columns": list(_USER_COLUMNS), "rows": [
+                [_encode(value) if isinstance(value, datetime) else value for value in user] for user in users
+            ]}
+
+            self._add(archive, MANIFEST_NAME, self._seal(MANIFEST_NAME, json.dumps(manifest).encode()))
+        os.replace(f"{path}.tmp", path)
+        return manifest
+
+    # Restore
+
+    def read_manifest(self, archive: tarfile.TarFile) -> dict:
+        try:
+            sealed = archive.extractfile(MANIFEST_NAME).read()
+        except KeyError:
+            raise ValueError("Not a business archive, or a damaged one: no manifest") from None
+        manifest = json.loads(self._open(MANIFEST_NAME, sealed))
+        if manifest.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"Unsupported archive format {manifest.get('format')}")
+        return manifest
+
+    def _read_chunk(self, archive: tarfile.TarFile, chunk: dict) -> list:
+        plain = gzip.decompress(self._open(chunk["name"], archive.extractfile(chunk["name"]).read()))
+        if hashlib.sha256(plain).hexdigest() != chunk["sha256"]:
+            raise ValueError(f"{chunk['name']}: checksum mismatch")
+        return json.loads(plain)
+
+    def verify(self, path: str) -> dict:
+        """Decrypt and checksum every chunk without loading anything; returns the manifest."""
+        with tarfile.open(path, "r") as archive:
+            manifest = self.read_manifest(archive)
+            for table in manifest["tables"].values():
+                for chunk in table["chunks"]:
+                    if len(self._read_chunk(archive, chunk)) != chunk["rows"]:
+                        raise ValueError(f"{chunk['name']}: row count mismatch")
+        return manifest
+
+    @staticmethod
+    def _map_users(db: Session, users: dict) -> Dict[int, int]:
+        """Archived user id -> id on this database, creating users not seen here yet."""
+        columns = users["columns"]
+        rows = [dict(zip(columns, row)) for row in users["rows"]]
+        existing = dict(db.query(User.telegram_id, User.id).filter(
+            User.telegram_id.in_([row["telegram_id"] for row in rows])
+        ).all())
+        mapping, new_users = {}, []
+        for row in rows:
+            old_id = row.pop("id")
+            if row["telegram_id"] in existing:
+                mapping[old_id] = existing[row["telegram_id"]]
+            else:
+                row["created_at"] = datetime.fromisoformat(row["created_at"]) if row["created_at"] else None
+                row["is_admin"] = False
+                row["updated_at"] = datetime.now()
+                new_users.append((old_id, row))
+        new_ids = bulk_insert_with_ids(db, User, [row for _, row in new_users])
+        mapping.update((old_id, new_id) for (old_id, _), new_id in zip(new_users, new_ids))
+        db.commit()
+        return mapping
+
+    @staticmethod
+    def _target_business(db: Session, owner_user_id: int, details: dict) -> Business:
+        """The owner's business on this database; it must not hold any data yet."""
+        business = db.query(Business).filter(
+            Business.owner_user_id == owner_user_id, Business.is_active == True
+        ).first()
+        if business is None:
+            business = create_business(db, owner_user_id, details["name"], details["currency"], details["timezone"])
+            route_session(db, owner_user_id)
+            return business
+        route_session(db, owner_user_id)
+        for table, model, scope_column, _ in TENANT_TABLES:
+            if scope_column != "user_id":
+                continue
+            if db.query(model.id).filter(model.user_id == owner_user_id).first() or (
+                model in ARCHIVE_MODELS and archive_reached(db, model, owner_user_id)
+            ):
+                raise ValueError(f"The owner's business on this database already has {table}")
+        for name, value in details.items():
+            setattr(business, name, value)
+        db.commit()
+        return business
+
+    def _load_tables(self, db: Session, archive: tarfile.TarFile, manifest: dict, id_maps: dict,
+                     scopes: dict, members: set, result: RestoreResult) -> None:
+        """Insert every archived table with remapped ids and scopes; the caller commits."""
+        for table, model, scope_column, references in TENANT_TABLES:
+            archived = manifest["tables"].get(table, {"columns": [], "chunks": []})
+            columns = archived["columns"]
+            decoders = _decoders(model, columns)
+            unique = UNIQUE_COLUMNS.get(table)
+            taken = set()
+            if unique:
+                taken = {value for (value,) in db.query(model.__table__.c[unique]).filter(
+                    model.__table__.c[unique].isnot(None)
+                )}
+            id_map = id_maps.setdefault(table, {})
+            result.rows[table] = 0
+
+            for chunk in archived["chunks"]:
+                entries, old_ids = [], []
+                for values in self._read_chunk(archive, chunk):
+                    row = {
+                        name: decode(value) if decode and value is not None else value
+                        for name, value, decode in zip(columns, values, decoders)
+                    }
+                    old_ids.append(row.pop("id"))
+                    row[scope_column] = scopes[scope_column]
+                    for column, target in references.items():
+                        if row[column] is not None:
+                            row[column] = id_maps[target].get(row[column])
+                    if table == "transactions" and row["reference_id"] is not None:
+                        target = REFERENCE_TABLES.get(row["type"])
+                        row["reference_id"] = id_maps[target].get(row["reference_id"]) if target else None
+                    if unique and row[unique] is not None:
+                        if row[unique] in taken:
+                            row[unique] = None
+                            result.cleared += 1
+                        else:
+                            taken.add(row[unique])
+                    if table == "business_members":
+                        if row["user_id"] in members:
+                            continue
+                        members.add(row["user_id"])
+                    entries.append(row)
+
+                if table in REFERENCED_TABLES:
+                    id_map.update(zip(old_ids, bulk_insert_with_ids(db, model, entries)))
+                else:
+                    bulk_insert(db, model, entries)
+                result.rows[table] += len(entries)
+
+    def restore(self, db: Session, path: str) -> RestoreResult:
+        """
+        Load an archive as a new business. Every chunk is verified first, so
+        a damaged or tampered archive is rejected before anything is written,
+        and the rows are loaded in one transaction, so a failure midway leaves
+        none behind.
+        """
+        self.verify(path)
+        result = RestoreResult()
+        with tarfile.open(path, "r") as archive:
+            manifest = self.read_manifest(archive)
+            id_maps = {"users": self._map_users(db, manifest["users"])}
+            owner_user_id = id_maps["users"][manifest["owner_user_id"]]
+            business = self._target_business(db, owner_user_id, manifest["business"])
+            scopes = {"user_id": owner_user_id, "business_id": business.id}
+            members = {user_id for (user_id,) in db.query(BusinessMember.user_id).filter(
+                BusinessMember.business_id == business.id
+            )}
+
+            try:
+                self._load_tables(db, archive, manifest, id_maps, scopes, members, result)
+                db.commit()
+            except Exception:
+                # One transaction: a failed restore leaves no rows behind, so it can be retried
+                db.rollback()
+                raise
+
+        product_name_index.invalidate(db, owner_user_id)
+        finish_import(db, owner_user_id)
+        result.business_id = business.id
+        result.owner_user_id = owner_user_id
+        return result
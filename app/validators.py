@@ -1,24 +1,19 @@
 import re
 from typing import Optional, Tuple
 
+from app.amounts import parse_amount
+
 def validate_amount(text: str) -> Tuple[bool, Optional[float], Optional[str]]:
     """Validate amount input"""
-    # Remove whitespace and common currency symbols
-    text = text.strip().replace('$', '').replace('€', '').replace('£', '').replace('Rp', '')
-    
-    # Check if it's a valid number
-    try:
-        # Remove thousand separators
-        text = text.replace(',', '')
-        amount = float(text)
-        
-        if amount <= 0:
-            return False, None, "Amount must be greater than 0"
-        
-        return True, amount, None
-    except ValueError:
+    amount = parse_amount(text)
+    if amount is None:
         return False, None, "Invalid amount format"
 
+    if amount <= 0:
+        return False, None, "Amount must be greater than 0"
+
+    return True, amount, None
+
 def validate_phone(phone: str) -> Tuple[bool, Optional[str]]:
     """Validate phone number"""
     # Remove all non-digit characters except +
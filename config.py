@@ -19,6 +19,13 @@ class BotConfig:
 class DatabaseConfig:
     URL: str = os.getenv("DB_URL", "sqlite:///microbiz.db")
     ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
+    SQLITE_WAL: bool = os.getenv("DB_SQLITE_WAL", "True").lower() == "true"  # readers don't block the writer
+    SHARD_COUNT: int = int(os.getenv("DB_SHARD_COUNT", "1"))  # >1 spreads business data over SQLite files
+    SHARD_DIR: str = os.getenv("DB_SHARD_DIR", "shards")
+    SHARD_ENGINE_CACHE: int = int(os.getenv("DB_SHARD_ENGINE_CACHE", "16"))  # shard engines kept open
+    READ_URL: str = os.getenv("DB_READ_URL", "")  # read-only replica for reports and exports
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "10"))
+    PG_PREPARE_THRESHOLD: int = int(os.getenv("DB_PG_PREPARE_THRESHOLD", "5"))  # psycopg 3 only; 0 = off
     
 @dataclass
 class Settings:
@@ -26,6 +33,32 @@ class Settings:
     CURRENCY: str = "Rp"
     DAILY_REPORT_HOUR: int = 20  # 8 PM
     WEEKLY_REPORT_DAY: int = 0   # Monday (0=Monday, 6=Sunday)
+    LOW_STOCK_ALERT_COOLDOWN_HOURS: int = int(os.getenv("LOW_STOCK_ALERT_COOLDOWN_HOURS", "24"))
+    AMOUNT_DECIMAL_SEPARATOR: str = os.getenv("AMOUNT_DECIMAL_SEPARATOR", ".")  # "," for 1.234,56
+    CATALOG_CACHE_MAX_BUSINESSES: int = int(os.getenv("CATALOG_CACHE_MAX_BUSINESSES", "500"))
+    CATALOG_CACHE_IDLE_MINUTES: int = int(os.getenv("CATALOG_CACHE_IDLE_MINUTES", "60"))
+    REPORT_CACHE_BACKEND: str = os.getenv("REPORT_CACHE_BACKEND", "memory")  # memory | redis
+    REPORT_CACHE_URL: str = os.getenv("REPORT_CACHE_URL", "redis://localhost:6379/0")
+    REPORT_CACHE_MAX_ENTRIES: int = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "1000"))
+    REPORT_CACHE_OPEN_TTL_SECONDS: int = int(os.getenv("REPORT_CACHE_OPEN_TTL_SECONDS", "3600"))
+    EXPORT_DIR: str = os.getenv("EXPORT_DIR", "exports")
+    PARQUET_EXPORT_DIR: str = os.getenv("PARQUET_EXPORT_DIR", "exports/parquet")
+    EXPORT_BACKGROUND: bool = os.getenv("EXPORT_BACKGROUND", "False").lower() == "true"  # queue for the export worker
+    EXPORT_WORKER_PROCESSES: int = int(os.getenv("EXPORT_WORKER_PROCESSES", "2"))
+    EXPORT_WORKER_POLL_SECONDS: float = float(os.getenv("EXPORT_WORKER_POLL_SECONDS", "2"))
+    EXPORT_JOB_TIMEOUT_MINUTES: int = int(os.getenv("EXPORT_JOB_TIMEOUT_MINUTES", "30"))
+    EXPORT_FILE_TTL_HOURS: int = int(os.getenv("EXPORT_FILE_TTL_HOURS", "24"))
+    BACKUP_ENABLED: bool = os.getenv("BACKUP_ENABLED", "True").lower() == "true"  # SQLite only
+    BACKUP_DIR: str = os.getenv("BACKUP_DIR", "backups")
+    BACKUP_HOUR: int = int(os.getenv("BACKUP_HOUR", "3"))
+    BACKUP_STEP_PAGES: int = int(os.getenv("BACKUP_STEP_PAGES", "256"))  # pages copied per step
+    BACKUP_STEP_PAUSE_MS: float = float(os.getenv("BACKUP_STEP_PAUSE_MS", "5"))  # lets writers in between steps
+    BACKUP_KEEP: int = int(os.getenv("BACKUP_KEEP", "7"))
+    BACKUP_KEEP_WEEKLY: int = int(os.getenv("BACKUP_KEEP_WEEKLY", "4"))
+    ARCHIVE_AFTER_MONTHS: int = int(os.getenv("ARCHIVE_AFTER_MONTHS", "0"))  # 0 keeps everything hot
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+    TENANT_BACKUP_KEY: str = os.getenv("TENANT_BACKUP_KEY", "")  # per-business archives; keep it out of the repo
+    SNAPSHOT_LOOKBACK_DAYS: int = int(os.getenv("SNAPSHOT_LOOKBACK_DAYS", "3"))  # catch-up after downtime
     
 @dataclass
 class Messages:
@@ -60,7 +93,10 @@ Use /help to see all commands."""
 /report - Daily report
 /weekly - Weekly report
 /monthly - Monthly report
-/insights - 7-day smart business insights
+/insights [30|90|ytd] - Smart business insights (7 days by default)
+/margins [last|30] - Gross margin per product (this month by default)
+/export [sales|expenses|inventory|customers] - Download data as CSV
+/import [sales|expenses] - Import history from a CSV (as the file's caption)
 
 *Team:*
 /team - List team members
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Move sales (with their line items) and expenses older than ARCHIVE_AFTER_MONTHS
+whole months into the archive tables. The bot does this on the 1st of each
+month; reports and exports keep reading archived rows transparently.
+
+Usage:
+    python scripts/archive_old_rows.py [months]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date
+
+from app.database.connection import get_db_session, engine
+from app.database.models import Base
+from app.services.archival import Archiver, archive_cutoff
+from config import settings
+
+
+def main():
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else settings.ARCHIVE_AFTER_MONTHS
+    if months <= 0:
+        print("Archival is disabled (ARCHIVE_AFTER_MONTHS=0).")
+        return
+
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as db:
+        moved = Archiver.run(db, months)
+
+    print(f"✓ Archived rows dated before {archive_cutoff(date.today(), months)}: "
+          f"{moved.get('sales', 0)} sale(s), {moved.get('sale_items', 0)} line item(s), "
+          f"{moved.get('expenses', 0)} expense(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Backfill sale_items for sales recorded before line items existed.
+Historical product_name values are mapped onto each business catalog.
+
+Usage:
+    python scripts/backfill_sale_items.py [scope_user_id]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_db_session, engine
+from app.database.crud import backfill_sale_items
+from app.database.models import Base
+
+
+def main():
+    user_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as db:
+        written = backfill_sale_items(db, user_id=user_id)
+
+    print(f"✓ Backfilled {written} sale item(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Online backups of the SQLite database. The bot runs `run` nightly; use
+`verify` to prove a backup restores (checksum, full restore into a scratch
+file, integrity check and row counts) and `restore` to bring one back.
+With DB_SHARD_COUNT > 1 every shard file is backed up too, into
+BACKUP_DIR/shard_<n>; `list` and `verify` cover them as well.
+
+Usage:
+    python scripts/backup_db.py run
+    python scripts/backup_db.py list
+    python scripts/backup_db.py verify [backup_file]   (newest of each file by default)
+    python scripts/backup_db.py restore <backup_file> <target.db>
+"""
+import sys
+import os
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.backup import SqliteBackup, configured_backups, sqlite_path
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    backups = configured_backups()
+
+    if command == "run":
+        now = datetime.now()
+        for backup in backups:
+            result = backup.run(now)
+            removed = backup.prune()
+            print(f"✓ Backup written: {result.path}")
+            print(f"  {result.pages:,} pages in {result.steps:,} steps, {result.seconds:.1f}s, "
+                  f"longest step {result.max_step_ms:.1f} ms, {result.restarts} restart(s)")
+            print(f"  {result.size:,} bytes compressed, sha256 {result.checksum}")
+            print(f"✓ Pruned {len(removed)} old backup(s).")
+    elif command == "list":
+        for backup in backups:
+            for path in backup.backups():
+                print(f"{os.path.relpath(path, backups[0].directory)}  {os.path.getsize(path):>12,} bytes")
+    elif command == "verify":
+        if len(sys.argv) > 2:
+            files = [sys.argv[2]]
+        else:
+            files = [backup.backups()[0] for backup in backups if backup.backups()]
+        if not files:
+            print(f"No backups in {backups[0].directory}")
+            sys.exit(1)
+        for path in files:
+            try:
+                counts = SqliteBackup.verify(path)
+            except ValueError as e:
+                print(f"✗ {path}: {e}")
+                sys.exit(1)
+            print(f"✓ {path} restores cleanly (integrity check ok).")
+            for table, rows in counts.items():
+                print(f"  {table}: {rows:,} row(s)")
+    elif command == "restore" and len(sys.argv) == 4:
+        target = sys.argv[3]
+        if os.path.abspath(target) == os.path.abspath(sqlite_path()):
+            print("Refusing to overwrite the live database; stop the bot and move the restored file in place.")
+            sys.exit(1)
+        SqliteBackup.restore(sys.argv[2], target)
+        print(f"✓ Restored {os.path.basename(sys.argv[2])} to {target}")
+    else:
+        print(__doc__.strip())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
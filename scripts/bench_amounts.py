@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Amount parsing microbenchmark.
+Times app.amounts against the number cleaning it replaced (the old
+parse_currency and validate_amount bodies), one value at a time and as a
+batch column, on a corpus of typical merchant input.
+
+Usage:
+    python scripts/bench_amounts.py [rows]
+"""
+import sys
+import os
+import re
+import random
+import timeit
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.amounts import parse_amount, parse_amounts
+
+CORPUS = ["500", "1,500", "12.5", "25000", "Rp 12,000", "1,234,567.50", "7500", "abc"]
+SHORTHAND = ["1.5k", "50rb", "2jt", "3.2m"]
+
+
+def legacy_parse_currency(text):
+    text = re.sub(r'[^\d.,-]', '', text)
+    is_negative = '-' in text
+    text = text.replace('-', '')
+    if ',' in text and '.' in text:
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        if text.count(',') == 1 and len(text.split(',')[1]) <= 2:
+            text = text.replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    try:
+        amount = float(text)
+        return -amount if is_negative else amount
+    except ValueError:
+        return None
+
+
+def legacy_validate_amount(text):
+    text = text.strip().replace('$', '').replace('€', '').replace('£', '').replace('Rp', '')
+    try:
+        amount = float(text.replace(',', ''))
+        if amount <= 0:
+            return False, None, "Amount must be greater than 0"
+        return True, amount, None
+    except ValueError:
+        return False, None, "Invalid amount format"
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(1)
+    column = [rng.choice(CORPUS) for _ in range(rows)]
+
+    print("=" * 60)
+    print("AMOUNT PARSING BENCHMARK")
+    print("=" * 60)
+
+    for text in SHORTHAND:
+        print(f"{text:>8} -> {parse_amount(text):>14,.2f} (legacy: {legacy_parse_currency(text)})")
+    print()
+
+    timings = {
+        "legacy parse_currency": lambda: [legacy_parse_currency(text) for text in column],
+        "legacy validate_amount": lambda: [legacy_validate_amount(text) for text in column],
+        "parse_amount": lambda: [parse_amount(text) for text in column],
+        "parse_amounts (batch)": lambda: parse_amounts(column),
+    }
+    for label, run in timings.items():
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        print(f"{label:<24} {rows / seconds:>12,.0f} values/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+CRUD lookup microbenchmark.
+Times the per-update lookups (get_user, scope resolution, get_total_sales)
+as cached lambda statements against the previous db.query forms, on an
+in-memory SQLite database with a few businesses and members, and checks
+both return the same rows.
+
+Usage:
+    python scripts/bench_crud_queries.py [iterations]
+"""
+import sys
+import os
+import timeit
+from datetime import date, datetime, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import (
+    add_or_update_business_member, create_user, ensure_user_business_context,
+    get_active_membership_for_user, get_business, get_total_sales, get_user,
+)
+from app.database.models import ARCHIVE_MODELS, Base, BusinessMember, Business, Sale, User
+
+BUSINESSES = 20
+
+
+def legacy_get_user(db, telegram_id):
+    return db.query(User).filter(User.telegram_id == telegram_id).first()
+
+
+def legacy_get_business(db, business_id):
+    return db.query(Business).filter(Business.id == business_id, Business.is_active == True).first()
+
+
+def legacy_get_active_membership_for_user(db, user_id):
+    return db.query(BusinessMember).filter(
+        BusinessMember.user_id == user_id,
+        BusinessMember.status == "active",
+    ).order_by(BusinessMember.id).first()
+
+
+def legacy_get_total_sales(db, user_id, start_date, end_date):
+    start_dt, end_dt = datetime.combine(start_date, time.min), datetime.combine(end_date, time.max)
+    member = legacy_get_active_membership_for_user(db, user_id)
+    business = legacy_get_business(db, member.business_id) if member else None
+    scope_user_id = business.owner_user_id if business else user_id
+    archive = ARCHIVE_MODELS[Sale][0].__table__
+    db.query(archive.c.id).filter(
+        archive.c.user_id == scope_user_id, archive.c.sale_date >= start_dt, archive.c.sale_date <= end_dt
+    ).first()  # archive_reached
+    return db.query(func.sum(Sale.amount)).filter(
+        Sale.user_id == scope_user_id,
+        Sale.sale_date >= start_dt,
+        Sale.sale_date <= end_dt
+    ).scalar() or 0.0
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for index in range(BUSINESSES):
+        owner = create_user(db, 1000 + index, f"Owner {index}")
+        business, _ = ensure_user_business_context(db, owner)
+        clerk = create_user(db, 2000 + index, f"Clerk {index}")
+        add_or_update_business_member(db, business.id, clerk.id, "staff")
+        for amount in range(1, 11):
+            db.add(Sale(user_id=owner.id, amount=amount * 100, product_name="Bread", sale_date=datetime.now()))
+    db.commit()
+    return db
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print("=" * 60)
+    print("CRUD QUERY BENCHMARK")
+    print("=" * 60)
+
+    db = _build_session()
+    today = date.today()
+    clerks = [get_user(db, 2000 + index) for index in range(BUSINESSES)]
+    cases = [
+        ("get_user", lambda i: (db, 1000 + i % BUSINESSES), get_user, legacy_get_user),
+        ("get_active_membership", lambda i: (db, clerks[i % BUSINESSES].id),
+         get_active_membership_for_user, legacy_get_active_membership_for_user),
+        ("get_business", lambda i: (db, 1 + i % BUSINESSES), get_business, legacy_get_business),
+        ("get_total_sales", lambda i: (db, clerks[i % BUSINESSES].id, today, today),
+         get_total_sales, legacy_get_total_sales),
+    ]
+
+    for name, args, current, legacy in cases:
+        for i in range(BUSINESSES):
+            if current(*args(i)) != legacy(*args(i)):
+                print(f"✗ Output differs for {name}")
+                sys.exit(1)
+    print(f"✓ Outputs match on {len(cases)} lookups x {BUSINESSES} businesses")
+
+    print(f"{'lookup':<24}{'db.query':>12}{'cached':>12}{'speedup':>10}")
+    for name, args, current, legacy in cases:
+        def run(fn):
+            return lambda: [fn(*args(i)) for i in range(iterations)]
+
+        before = min(timeit.repeat(run(legacy), number=1, repeat=3)) / iterations * 1e6
+        after = min(timeit.repeat(run(current), number=1, repeat=3)) / iterations * 1e6
+        print(f"{name:<24}{before:>9.1f} µs{after:>9.1f} µs{before / after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
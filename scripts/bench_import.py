@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark CSV import of historical sales into a scratch SQLite database (WAL).
+
+Usage:
+    python scripts/bench_import.py [rows]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base
+from app.services.importer import CsvImporter
+
+
+def build_csv(rows: int) -> str:
+    rng = random.Random(7)
+    products = [f"product {index}" for index in range(200)]
+    start = date.today() - timedelta(days=3 * 365)
+    lines = ["date,amount,product,quantity"]
+    for _ in range(rows):
+        day = start + timedelta(days=rng.randrange(3 * 365 - 40))
+        lines.append(f"{day.isoformat()},{rng.randrange(1, 500) * 100},{rng.choice(products)},{rng.randrange(1, 4)}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    payload = build_csv(rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+
+        @event.listens_for(engine, "connect")
+        def _pragmas(connection, _):
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        started = time.perf_counter()
+        result = CsvImporter("sales").run(db, 1, io.StringIO(payload))
+        elapsed = time.perf_counter() - started
+        db.close()
+
+    print("=" * 60)
+    print(f"CSV import benchmark ({rows:,} sales, SQLite WAL)")
+    print("=" * 60)
+    print(f"Imported:   {result.imported:,} (rejected {result.rejected})")
+    print(f"Elapsed:    {elapsed:.2f}s")
+    print(f"Throughput: {result.imported / elapsed:,.0f} rows/s (sale + line item + ledger row each)")
+
+
+if __name__ == "__main__":
+    main()
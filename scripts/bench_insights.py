@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Insights aggregation benchmark.
+Times the per-day profit loop the insights report used to run against the
+NumPy columns in app.services.analytics, on synthetic in-memory rows
+(database loading is excluded from both).
+
+Usage:
+    python scripts/bench_insights.py [rows] [days]
+"""
+import sys
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics import Analytics, PeriodColumns
+
+
+def legacy_daily_profit(sales, expenses, start, end):
+    daily_profit = {}
+    cursor = start
+    while cursor <= end:
+        day_sales = sum(row[0] for row in sales if row[2].date() == cursor)
+        day_expenses = sum(row[0] for row in expenses if row[2].date() == cursor)
+        daily_profit[cursor] = day_sales - day_expenses
+        cursor += timedelta(days=1)
+    return daily_profit
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+    base = datetime.combine(start, datetime.min.time())
+    rng = random.Random(1)
+
+    sales = [
+        (rng.randint(1, 500) * 100.0, f"product {rng.randint(1, 300)}",
+         base + timedelta(minutes=rng.randint(0, days * 1440 - 1)))
+        for _ in range(rows)
+    ]
+    expenses = [
+        (rng.randint(1, 200) * 100.0, rng.choice(["rent", "stock", "transport"]),
+         base + timedelta(minutes=rng.randint(0, days * 1440 - 1)))
+        for _ in range(rows // 10)
+    ]
+
+    print("=" * 60)
+    print(f"INSIGHTS BENCHMARK ({rows:,} sales, {days} days)")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    sale_columns = PeriodColumns.from_rows(sales, start, end)
+    expense_columns = PeriodColumns.from_rows(expenses, start, end)
+    loaded = time.perf_counter()
+    daily = sale_columns.daily_totals() - expense_columns.daily_totals()
+    Analytics.extreme_days(start, daily)
+    sale_columns.top_groups(5)
+    Analytics.moving_average(daily, 7)
+    finished = time.perf_counter()
+    print(f"Columns built:     {(loaded - started) * 1000:>10.1f} ms")
+    print(f"Vectorised pass:   {(finished - loaded) * 1000:>10.1f} ms")
+
+    if rows * days <= 20_000_000:
+        started = time.perf_counter()
+        legacy = legacy_daily_profit(sales, expenses, start, end)
+        print(f"Per-day loop:      {(time.perf_counter() - started) * 1000:>10.1f} ms")
+        assert max(abs(legacy[start + timedelta(days=i)] - daily[i]) for i in range(days)) < 1e-6
+    else:
+        print("Per-day loop:      skipped (too slow at this size)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Parser microbenchmark.
+Compares the compiled single-pass grammar in app.services.parser against the
+previous regex chain (uncompiled re.match calls + pydantic ParsedSale)
+on a mixed corpus of realistic messages, and checks both agree.
+
+Usage:
+    python scripts/bench_parser.py [iterations]
+"""
+import sys
+import os
+import re
+import timeit
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import BaseModel
+
+from app.services.parser import Parser
+
+CORPUS = [
+    "500 bread",
+    "3x 500 bread",
+    "1,500 sugar 2",
+    "bread 500",
+    "rice 5kg 12,000",
+    "12.5 milk",
+    "hello there",
+    "2x 1,200 coca cola",
+    "transport 3000",
+    "supplies",
+]
+
+
+class LegacyParsedSale(BaseModel):
+    amount: float
+    item: str
+    quantity: int = 1
+
+
+def legacy_parse_sale(text):
+    text = text.strip()
+    text = text.replace(',', '')
+
+    match = re.match(r'(\d+)x\s+(\d+\.?\d*)\s+(.+)', text)
+    if match:
+        quantity = int(match.group(1))
+        amount = float(match.group(2))
+        return LegacyParsedSale(amount=amount * quantity, item=match.group(3).strip(), quantity=quantity)
+
+    match = re.match(r'(\d+\.?\d*)\s+(.+?)\s+(\d+)$', text)
+    if match:
+        return LegacyParsedSale(
+            amount=float(match.group(1)), item=match.group(2).strip(), quantity=int(match.group(3))
+        )
+
+    match = re.match(r'(.+?)\s+(\d+\.?\d*)$', text)
+    if match:
+        return LegacyParsedSale(amount=float(match.group(2)), item=match.group(1).strip(), quantity=1)
+
+    match = re.match(r'(\d+\.?\d*)\s+(.+)', text)
+    if match:
+        return LegacyParsedSale(amount=float(match.group(1)), item=match.group(2).strip(), quantity=1)
+
+    return None
+
+
+def _as_tuple(parsed):
+    return (parsed.amount, parsed.item, parsed.quantity) if parsed else None
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print("=" * 60)
+    print("PARSER BENCHMARK")
+    print("=" * 60)
+
+    for text in CORPUS:
+        if _as_tuple(Parser.parse_sale(text)) != _as_tuple(legacy_parse_sale(text)):
+            print(f"✗ Output differs for {text!r}")
+            sys.exit(1)
+    print(f"✓ Outputs match on {len(CORPUS)} messages")
+
+    def run_legacy():
+        for text in CORPUS:
+            legacy_parse_sale(text)
+
+    def run_grammar():
+        for text in CORPUS:
+            Parser.parse_sale(text)
+
+    messages = iterations * len(CORPUS)
+    legacy = min(timeit.repeat(run_legacy, number=iterations, repeat=3))
+    current = min(timeit.repeat(run_grammar, number=iterations, repeat=3))
+
+    print(f"Legacy regex chain: {messages / legacy:>12,.0f} msg/s")
+    print(f"Compiled grammar:   {messages / current:>12,.0f} msg/s")
+    print(f"Speedup:            {legacy / current:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent sale writes from several businesses, all in one SQLite
+file versus spread over shards. Each writer process records sales for its own
+business through create_sale.
+
+Usage:
+    python scripts/bench_shards.py [writers] [sales_per_writer] [shards]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing
+import tempfile
+import time
+
+
+def _configure(directory: str, shards: int) -> None:
+    # Read by config.py when each process imports the app
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(directory, 'main.db')}"
+    os.environ["DB_SHARD_COUNT"] = str(shards)
+    os.environ["DB_SHARD_DIR"] = os.path.join(directory, "shards")
+    os.environ["DB_SQLITE_WAL"] = "true"
+
+
+def _writer(directory: str, shards: int, telegram_id: int, sales: int) -> int:
+    _configure(directory, shards)
+    from app.database.connection import get_db_session
+    from app.database.crud import create_sale, get_user
+
+    errors = 0
+    with get_db_session() as db:
+        user = get_user(db, telegram_id)
+        for _ in range(sales):
+            try:
+                create_sale(db, user.id, 1000, "Bread")
+            except Exception:
+                db.rollback()
+                errors += 1
+    return errors
+
+
+def _setup(directory: str, shards: int, writers: int) -> None:
+    _configure(directory, shards)
+    from app.database.connection import engine, get_db_session
+    from app.database.crud import create_user, ensure_user_business_context
+    from app.database.models import Base
+
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as db:
+        for telegram_id in range(1, writers + 1):
+            ensure_user_business_context(db, create_user(db, telegram_id, f"Owner {telegram_id}"))
+
+
+def run(shards: int, writers: int, sales: int) -> tuple:
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        with context.Pool(1) as pool:
+            pool.apply(_setup, (directory, shards, writers))
+        with context.Pool(writers) as pool:
+            # Warm the pool up so process start-up is not timed
+            pool.starmap(_configure, [(directory, shards)] * writers)
+            started = time.perf_counter()
+            errors = pool.starmap(_writer, [(directory, shards, index + 1, sales) for index in range(writers)])
+            elapsed = time.perf_counter() - started
+    return elapsed, sum(errors)
+
+
+def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sales = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    shards = int(sys.argv[3]) if len(sys.argv) > 3 else writers
+
+    print("=" * 60)
+    print(f"Sharding benchmark ({writers} writers x {sales:,} sales, {os.cpu_count()} CPU(s))")
+    print("=" * 60)
+    baseline = None
+    for count in (1, shards):
+        elapsed, errors = run(count, writers, sales)
+        rate = (writers * sales - errors) / elapsed
+        baseline = baseline or rate
+        label = "single file" if count == 1 else f"{count} shards"
+        print(f"{label:<12} {rate:>9,.0f} sales/s   ({elapsed:.2f}s, {errors} failed, x{rate / baseline:.2f})")
+
+
+if __name__ == "__main__":
+    main()
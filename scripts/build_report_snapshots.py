@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Store report snapshots for closed days, weeks and months of every active
+business. The bot does this hourly; run it by hand to backfill history.
+
+Usage:
+    python scripts/build_report_snapshots.py [days_back]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_db_session, engine
+from app.database.models import Base
+from app.services.snapshots import ReportSnapshots
+
+
+def main():
+    days_back = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as db:
+        written = ReportSnapshots.snapshot_due(db, lookback_days=days_back)
+
+    print(f"✓ Stored {written} report snapshot(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Script to generate and send daily reports.
-Can be run manually or via cron job.
+Can be run manually or via cron job. Yesterday is snapshotted first,
+so every report sent is a single-row read.
 """
 
 import sys
@@ -9,9 +10,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from datetime import date, timedelta
-from app.database.connection import get_db_session, engine
+from app.database.connection import get_db_session, get_read_session, engine
 from app.database.crud import get_user
 from app.services.reports import ReportGenerator
+from app.services.snapshots import ReportSnapshots
 from config import bot_config
 import asyncio
 from aiogram import Bot
@@ -21,6 +23,9 @@ async def send_daily_reports():
     bot = Bot(token=bot_config.TOKEN)
     
     with get_db_session() as db:
+        ReportSnapshots.snapshot_due(db, lookback_days=1)
+    
+    with get_read_session() as db:
         generator = ReportGenerator()
         
         # Get all active users
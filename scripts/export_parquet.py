@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Export sales, expenses and transactions as month-partitioned Parquet for
+pandas/DuckDB. Runs are incremental: only the open month and newer months
+are written again, unless --full is given or closed months were rewritten
+since the last run (CSV import, tenant restore, backfill), which rebuilds
+that business.
+
+Usage:
+    python scripts/export_parquet.py [scope_user_id] [--full]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_read_session, engine
+from app.database.models import Base, Business
+from app.services.parquet_export import ParquetExporter
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--full"]
+    full = "--full" in sys.argv[1:]
+
+    Base.metadata.create_all(bind=engine)
+    exporter = ParquetExporter()
+    with get_read_session() as db:
+        if args:
+            scopes = [int(args[0])]
+        else:
+            scopes = [row.owner_user_id for row in db.query(Business.owner_user_id).filter(Business.is_active == True)]
+
+        for scope_user_id in scopes:
+            summary = exporter.export_business(db, scope_user_id, full=full)
+            months = sum(len(written) for written in summary.values())
+            rows = sum(sum(written.values()) for written in summary.values())
+            print(f"✓ Business {scope_user_id}: {rows} row(s) in {months} month partition(s).")
+
+    print(f"Parquet files are in {exporter.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Export worker: claims queued export jobs and renders them in a process pool,
+then sends each file to the user who asked for it. Start one or more next
+to the bot and set EXPORT_BACKGROUND=true so /export queues jobs.
+
+Usage:
+    python scripts/export_worker.py [processes]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from aiogram import Bot
+
+from app.database.connection import engine
+from app.database.models import Base
+from app.services.export_jobs import ExportWorker
+from config import bot_config
+
+
+async def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    Base.metadata.create_all(bind=engine)
+    bot = Bot(token=bot_config.TOKEN)
+    worker = ExportWorker(bot, processes=processes)
+    print(f"✓ Export worker started with {worker.processes} process(es).")
+    try:
+        await worker.run()
+    finally:
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
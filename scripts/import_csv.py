@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Bulk-import historical sales or expenses from a CSV file, e.g. when moving
+a business over from a spreadsheet. Same format and rules as /import.
+The import bumps the business's report history epoch in the database, so a
+running bot stops serving cached reports of the imported periods at once.
+
+Usage:
+    python scripts/import_csv.py <scope_user_id> <sales|expenses> <file.csv>
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from app.database.connection import engine
+from app.database.models import Base
+from app.services.importer import IMPORT_COLUMNS, import_file
+from app.services.report_cache import report_cache
+
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[2] not in IMPORT_COLUMNS:
+        print(__doc__.strip())
+        sys.exit(1)
+    scope_user_id, kind, path = int(sys.argv[1]), sys.argv[2], sys.argv[3]
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    cache_errors = report_cache.errors
+    result = import_file(scope_user_id, kind, path)
+    elapsed = time.perf_counter() - started
+
+    print(f"✓ Imported {result.imported:,} {kind} row(s) in {elapsed:.1f}s", end="")
+    if result.first_date:
+        print(f" ({result.first_date} to {result.last_date})", end="")
+    print(".")
+    if result.imported:
+        if report_cache.errors > cache_errors:
+            print("✗ Could not retire the bot's cached reports (see the warning above); restart the bot.")
+        else:
+            print("✓ Cached reports of the business were retired in every bot process.")
+    if result.rejected:
+        print(f"Skipped {result.rejected:,} row(s):")
+        for line, reason in result.errors:
+            print(f"  line {line}: {reason}")
+
+
+if __name__ == "__main__":
+    main()
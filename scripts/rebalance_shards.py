@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Inspect SQLite shard usage and move a business to another shard
+(DB_SHARD_COUNT > 1). Stop the bot, or pick an idle business, before moving:
+writes made during the move are lost.
+
+Usage:
+    python scripts/rebalance_shards.py status
+    python scripts/rebalance_shards.py move <business_id> <shard>
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from app.database.connection import get_db_session, engine
+from app.database.models import Base
+from app.services.sharding import ShardRebalancer
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    Base.metadata.create_all(bind=engine)
+
+    with get_db_session() as db:
+        try:
+            if command == "status" and len(sys.argv) == 2:
+                for shard, usage in ShardRebalancer.status(db).items():
+                    print(f"  shard {shard}: {usage['businesses']:,} business(es), {usage['sales']:,} sale(s)")
+            elif command == "move" and len(sys.argv) == 4:
+                started = time.perf_counter()
+                result = ShardRebalancer.move(db, int(sys.argv[2]), int(sys.argv[3]))
+                print(f"✓ Moved business {sys.argv[2]} to shard {sys.argv[3]} "
+                      f"in {time.perf_counter() - started:.1f}s")
+                for table, rows in result.rows.items():
+                    print(f"  {table}: {rows:,} row(s)")
+            else:
+                print(__doc__.strip())
+                sys.exit(1)
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Seed the pending low-stock alert set from current stock levels.
+Only needed once after upgrading; afterwards stock mutations keep it current.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_db_session, engine
+from app.database.models import Base
+from app.services.stock_alerts import rebuild_pending_alerts
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    with get_db_session() as db:
+        added = rebuild_pending_alerts(db)
+    print(f"✓ Queued {added} low-stock alert(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Per-business encrypted archives: hand a business its own data, or move it
+to another node. Archives are encrypted with TENANT_BACKUP_KEY; restore on
+the target with the same key. Users are matched by Telegram id.
+
+Usage:
+    python scripts/tenant_backup.py keygen
+    python scripts/tenant_backup.py export <business_id> <archive.tar>
+    python scripts/tenant_backup.py verify <archive.tar>
+    python scripts/tenant_backup.py restore <archive.tar>
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from app.database.connection import get_db_session, engine
+from app.database.models import Base
+from app.services.tenant_backup import TenantArchive, generate_key
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "keygen":
+        print(f"TENANT_BACKUP_KEY={generate_key()}")
+        return
+
+    started = time.perf_counter()
+    if command == "export" and len(sys.argv) == 4:
+        with get_db_session() as db:
+            manifest = TenantArchive().export_business(db, int(sys.argv[2]), sys.argv[3])
+        rows = sum(table["rows"] for table in manifest["tables"].values())
+        print(f"✓ Exported business {sys.argv[2]}: {rows:,} row(s) to {sys.argv[3]} "
+              f"in {time.perf_counter() - started:.1f}s")
+    elif command == "verify" and len(sys.argv) == 3:
+        try:
+            manifest = TenantArchive().verify(sys.argv[2])
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print(f"✓ {sys.argv[2]}: '{manifest['business']['name']}', created {manifest['created_at']}")
+        for table, archived in manifest["tables"].items():
+            print(f"  {table}: {archived['rows']:,} row(s)")
+    elif command == "restore" and len(sys.argv) == 3:
+        Base.metadata.create_all(bind=engine)
+        with get_db_session() as db:
+            try:
+                result = TenantArchive().restore(db, sys.argv[2])
+            except ValueError as e:
+                print(f"✗ {e}")
+                sys.exit(1)
+        print(f"✓ Restored as business {result.business_id} (owner user {result.owner_user_id}) "
+              f"in {time.perf_counter() - started:.1f}s")
+        for table, rows in result.rows.items():
+            print(f"  {table}: {rows:,} row(s)")
+        if result.cleared:
+            print(f"  {result.cleared} SKU(s)/phone number(s) already in use here were cleared")
+    else:
+        print(__doc__.strip())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Verify the customer credit ledger.
+Recomputes every customer balance from the transactions table in bulk
+and reports chain breaks or drift against customers.credit_balance.
+
+Usage:
+    python scripts/verify_ledger.py [scope_user_id]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import get_db_session
+from app.services.ledger import LedgerVerifier
+
+
+def main():
+    user_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    with get_db_session() as db:
+        result = LedgerVerifier.verify(db, user_id)
+
+    print("=" * 60)
+    print("LEDGER VERIFICATION")
+    print("=" * 60)
+
+    for row in result["chain_breaks"]:
+        print(
+            f"✗ Chain break at transaction {row['transaction_id']} "
+            f"(customer {row['customer_id']}): opened at {row['balance_before']:,.2f}, "
+            f"previous closed at {row['previous_balance']:,.2f}"
+        )
+
+    for row in result["balance_drift"]:
+        print(
+            f"✗ Customer {row['customer_id']} (scope {row['user_id']}): "
+            f"stored {row['stored_balance']:,.2f}, ledger {row['ledger_balance']:,.2f}, "
+            f"recomputed {row['recomputed_balance']:,.2f}"
+        )
+
+    if result["chain_breaks"] or result["balance_drift"]:
+        print("\n⚠ Ledger inconsistencies found.")
+        sys.exit(1)
+
+    print("✓ Ledger is consistent.")
+
+
+if __name__ == "__main__":
+    main()
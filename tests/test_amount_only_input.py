@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import create_user
+from app.database.models import Base, Expense, Sale
+from app.handlers.expenses import ExpenseStates, process_expense
+from app.handlers.sales import SaleStates, process_sale
+
+
+class _State:
+    def __init__(self):
+        self.data = {}
+        self.state = None
+
+    async def update_data(self, **values):
+        self.data.update(values)
+
+    async def set_state(self, state):
+        self.state = state
+
+    async def clear(self):
+        self.data, self.state = {}, None
+
+
+def _send(handler, db, text):
+    replies = []
+
+    async def answer(reply, **_):
+        replies.append(reply)
+
+    message = SimpleNamespace(text=text, from_user=SimpleNamespace(id=42), answer=answer)
+    state = _State()
+    asyncio.run(handler(message, state, db=db))
+    return state, replies
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    create_user(session, 42, "Owner")
+    return session
+
+
+@pytest.mark.parametrize("handler, next_state, model", [
+    (process_sale, SaleStates.waiting_for_quantity, Sale),
+    (process_expense, ExpenseStates.waiting_for_category, Expense),
+])
+def test_amount_on_its_own_must_be_positive(db, handler, next_state, model):
+    state, replies = _send(handler, db, "1500")
+    assert state.data == {"amount": 1500} and state.state == next_state
+
+    for text in ("-500", "0"):
+        state, replies = _send(handler, db, text)
+        assert state.data == {} and state.state is None
+        assert replies[0].startswith("❌")
+    assert db.query(model).count() == 0
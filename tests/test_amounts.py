@@ -0,0 +1,36 @@
+import pytest
+
+from app.amounts import parse_amount, parse_amounts, to_amount
+from app.validators import validate_amount
+
+
+def test_shorthand_suffixes():
+    assert parse_amount("1.5k") == 1500
+    assert parse_amount("50rb") == 50000
+    assert parse_amount("2JT") == 2_000_000
+    assert parse_amount("0.1k") == 100
+    assert parse_amount("-20k") == -20000
+
+
+def test_locale_separators():
+    assert parse_amount("Rp 1,500") == 1500
+    assert parse_amount("1,234,567.50") == 1234567.5
+    assert parse_amount("1.234,56") == 1234.56
+    assert parse_amount("1,5") == 1.5
+    assert parse_amount("12.500") == 12.5
+    assert parse_amount("12.500", decimal_separator=",") == 12500
+    assert parse_amount("1.234.5") is None
+    assert parse_amount("bread") is None
+
+
+def test_batch_reports_invalid_rows():
+    amounts, invalid = parse_amounts(["500", "2k", "abc", "500", ""])
+    assert amounts == [500, 2000, None, 500, None]
+    assert invalid == [2, 4]
+
+
+def test_callers_share_the_engine():
+    assert validate_amount("2k") == (True, 2000, None)
+    assert validate_amount("0")[0] is False
+    with pytest.raises(ValueError):
+        to_amount("12x")
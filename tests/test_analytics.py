@@ -0,0 +1,37 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.services.analytics import Analytics, PeriodColumns
+
+
+def _at(day: date, hour: int = 9) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+
+
+def test_daily_buckets_and_top_groups():
+    start = date(2024, 3, 1)
+    end = start + timedelta(days=3)
+    rows = [
+        (100.0, "Bread", _at(start)),
+        (50.0, "Milk", _at(start, 18)),
+        (300.0, "Milk", _at(start + timedelta(days=2))),
+        (70.0, "", _at(end)),
+    ]
+    columns = PeriodColumns.from_rows(rows, start, end)
+
+    assert columns.daily_totals().tolist() == [150.0, 0.0, 300.0, 70.0]
+    assert columns.top_groups(2) == [("Milk", 350.0), ("Bread", 100.0)]
+    assert columns.total() == 520.0
+    assert Analytics.extreme_days(start, columns.daily_totals()) == (
+        (start + timedelta(days=2), 300.0),
+        (start + timedelta(days=1), 0.0),
+    )
+
+
+def test_moving_average_and_growth():
+    averaged = Analytics.moving_average(np.array([2.0, 4.0, 6.0, 8.0]), 2)
+    assert averaged.tolist() == [2.0, 3.0, 5.0, 7.0]
+
+    growth = Analytics.growth(np.array([150.0, 0.0, 5.0]), np.array([100.0, 0.0, 0.0]))
+    assert growth.tolist() == [50.0, 0.0, 100.0]
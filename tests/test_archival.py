@@ -0,0 +1,136 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import (
+    backfill_sale_items, create_sale, get_expenses_by_date, get_margin_summary, get_sales_by_date, get_total_expenses, get_total_sales,
+    iter_monthly_totals,
+)
+from app.database.models import (
+    Base, Expense, ExpenseArchive, ReportSnapshot, Sale, SaleArchive, SaleItem, SaleItemArchive,
+)
+from app.services.archival import Archiver, archive_cutoff
+from app.services.exporter import Exporter
+
+
+def _build_session(legacy_ids=False):
+    engine = create_engine("sqlite:///:memory:")
+    hot = [model.__table__ for model in (Sale, SaleItem, Expense)]
+    # legacy_ids: hot tables as created before they were declared AUTOINCREMENT
+    for table in hot:
+        table.dialect_options["sqlite"]["autoincrement"] = not legacy_ids
+    try:
+        Base.metadata.create_all(bind=engine)
+    finally:
+        for table in hot:
+            table.dialect_options["sqlite"]["autoincrement"] = True
+    return sessionmaker(bind=engine)()
+
+
+def _sale(db, day, amount):
+    sale = Sale(user_id=1, amount=amount, product_name="Bread", sale_date=day)
+    db.add(sale)
+    db.flush()
+    db.add(SaleItem(sale_id=sale.id, user_id=1, item_name="Bread", quantity=1, unit_price=amount,
+                    unit_cost=amount / 2, line_revenue=amount, sale_date=day))
+
+
+def test_archive_moves_old_rows_and_reads_union_them():
+    db = _build_session()
+    for month in range(1, 13):
+        _sale(db, datetime(2022, month, 10, 9), 1000)
+        db.add(Expense(user_id=1, amount=100, category="rent", expense_date=datetime(2022, month, 1)))
+    _sale(db, datetime(2024, 1, 5, 9), 7000)
+    db.add(Expense(user_id=1, amount=300, category="rent", expense_date=datetime(2024, 1, 1)))
+    db.add(Sale(user_id=2, amount=5, product_name="other", sale_date=datetime(2022, 1, 1)))
+    db.commit()
+
+    cutoff = archive_cutoff(date(2024, 2, 15), 12)
+    assert cutoff == date(2023, 2, 1)
+    moved = Archiver.archive_scope(db, 1, cutoff, batch_size=5)
+
+    assert moved == {"sales": 12, "sale_items": 12, "expenses": 12}
+    assert db.query(Sale).filter(Sale.user_id == 1).count() == 1
+    assert db.query(SaleArchive).count() == 12
+    assert db.query(SaleItemArchive).count() == 12
+    assert db.query(ExpenseArchive).count() == 12
+    assert db.query(SaleItem).count() == 1
+    # Every closed month before the cutoff got its snapshot before the rows moved
+    months = db.query(ReportSnapshot).filter(ReportSnapshot.period_type == "month").count()
+    assert months == 13  # 2022 plus the empty January 2023
+
+    assert get_total_sales(db, 1, date(2022, 1, 1), date(2024, 12, 31)) == 19000
+    assert get_total_sales(db, 1, date(2024, 1, 1), date(2024, 1, 31)) == 7000
+    sales = get_sales_by_date(db, 1, date(2022, 6, 1), date(2024, 1, 31))
+    assert [sale.amount for sale in sales] == [7000] + [1000] * 7
+    assert sales[1].sale_date == datetime(2022, 12, 10, 9)
+    assert len(get_expenses_by_date(db, 1, date(2022, 1, 1), date(2022, 3, 31))) == 3
+    margins = get_margin_summary(db, 1, date(2022, 1, 1), date(2024, 1, 31))
+    assert margins[0].revenue == 19000 and margins[0].cogs == 9500
+    monthly = list(iter_monthly_totals(db, 1, date(2022, 11, 1), date(2024, 1, 31)))
+    assert monthly == [(date(2022, 11, 1), 1000, 100), (date(2022, 12, 1), 1000, 100), (date(2024, 1, 1), 7000, 300)]
+
+    rows = list(Exporter.iter_rows(db, 1, "sales"))
+    assert len(rows) == 13
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+
+    # Nothing left to move
+    assert Archiver.archive_scope(db, 1, cutoff) == {}
+
+
+def test_newest_row_stays_hot_so_ids_are_not_reused():
+    db = _build_session()
+    _sale(db, datetime(2020, 1, 1), 10)
+    _sale(db, datetime(2020, 2, 1), 20)
+    db.commit()
+
+    moved = Archiver.archive_scope(db, 1, date(2023, 1, 1))
+    assert moved["sales"] == 1
+
+    newer = Sale(user_id=1, amount=30, product_name="new", sale_date=datetime(2024, 1, 1))
+    db.add(newer)
+    db.commit()
+    assert newer.id not in {row.id for row in db.query(SaleArchive)}
+
+
+def test_cached_totals_follow_scope_and_range_across_archive():
+    db = _build_session()
+    for user_id in (1, 2):
+        for year in (2020, 2021, 2024):
+            db.add(Sale(user_id=user_id, amount=year * user_id, product_name="x", sale_date=datetime(year, 3, 1)))
+            db.add(Expense(user_id=user_id, amount=year, category="rent", expense_date=datetime(year, 3, 1)))
+    db.commit()
+    Archiver.archive_scope(db, 1, date(2023, 1, 1))
+
+    # The same cached statements serve hot-only and archive-union reads
+    for user_id in (1, 2):
+        for start, end in ((2020, 2020), (2020, 2024), (2024, 2024), (2021, 2021), (2019, 2019)):
+            years = [year for year in (2020, 2021, 2024) if start <= year <= end]
+            assert get_total_sales(db, user_id, date(start, 1, 1), date(end, 12, 31)) == sum(years) * user_id
+            assert get_total_expenses(db, user_id, date(start, 1, 1), date(end, 12, 31)) == sum(years)
+
+
+@pytest.mark.parametrize("legacy_ids", [False, True])
+def test_backfilled_items_are_not_reused_after_archival(legacy_ids):
+    db = _build_session(legacy_ids)
+    for month in (1, 2, 3):
+        db.add(Sale(user_id=1, amount=100, product_name="Bread", sale_date=datetime(2020, month, 1)))
+    db.commit()
+    create_sale(db, 1, 500, "Tea")
+    assert backfill_sale_items(db) == 3  # old sales' items now hold the highest ids
+    Archiver.archive_scope(db, 1, date(2023, 1, 1))
+
+    sale = create_sale(db, 1, 600, "Tea")
+    archived = {row.id for row in db.query(SaleItemArchive)}
+    assert archived and not archived & {item.id for item in db.query(SaleItem)}
+
+    # The new sale ages and is archived in turn
+    db.query(Sale).filter(Sale.id == sale.id).update({Sale.sale_date: datetime(2021, 1, 1)})
+    db.query(SaleItem).filter(SaleItem.sale_id == sale.id).update({SaleItem.sale_date: datetime(2021, 1, 1)})
+    db.commit()
+    create_sale(db, 1, 700, "Tea")
+    moved = Archiver.archive_scope(db, 1, date(2023, 1, 1))
+    assert moved["sale_items"] >= 1
+    assert db.query(SaleItemArchive).count() == len(archived) + moved["sale_items"]
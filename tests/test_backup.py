@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from app.database import connection
+from app.database.connection import ShardRouter
+from app.services.backup import SqliteBackup, configured_backups, sqlite_path
+
+
+def _build_database(path, rows=2000):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, amount REAL, notes TEXT)")
+    connection.executemany(
+        "INSERT INTO sales (amount, notes) VALUES (?, ?)",
+        [(index, "x" * 200) for index in range(rows)],
+    )
+    connection.commit()
+    connection.close()
+
+
+def test_backup_in_steps_lets_writers_in_and_verifies(tmp_path):
+    source = str(tmp_path / "live.db")
+    _build_database(source)
+    backup = SqliteBackup(source, str(tmp_path / "backups"), step_pages=4, pause_ms=2)
+
+    # Writes keep landing while the copy runs; none may wait on it or restart it
+    done = threading.Event()
+    written = []
+
+    def write():
+        writer = sqlite3.connect(source, timeout=0.05)
+        while not done.is_set():
+            writer.execute("INSERT INTO sales (amount, notes) VALUES (-1, 'during backup')")
+            writer.commit()
+            written.append(1)
+        writer.close()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        result = backup.run()
+    finally:
+        done.set()
+        thread.join()
+
+    assert written
+    assert result.steps > 5
+    assert result.restarts == 0
+    assert os.path.exists(result.path + ".sha256")
+    assert SqliteBackup.verify(result.path)["sales"] >= 2000
+
+    with open(result.path, "r+b") as handle:
+        handle.seek(20)
+        handle.write(b"\x00\x01")
+    try:
+        SqliteBackup.verify(result.path)
+    except ValueError as e:
+        assert "Checksum" in str(e)
+    else:
+        raise AssertionError("tampered backup verified")
+
+
+def test_prune_keeps_newest_and_one_per_week(tmp_path):
+    source = str(tmp_path / "live.db")
+    _build_database(source, rows=10)
+    backup = SqliteBackup(source, str(tmp_path / "backups"), pause_ms=0)
+
+    start = datetime(2024, 1, 1, 3, 30)
+    for day in range(30):
+        backup.run(now=start + timedelta(days=day))
+
+    removed = backup.prune(keep=2, keep_weekly=3)
+    kept = [SqliteBackup.backup_time(path) for path in backup.backups()]
+
+    assert len(removed) == 30 - len(kept)
+    # Newest two, then the newest of each of the last three ISO weeks (they end on Sundays)
+    assert kept == [datetime(2024, 1, day, 3, 30) for day in (30, 29, 28, 21)]
+    assert not any(name.endswith(".sha256") and not os.path.exists(os.path.join(backup.directory, name[:-7]))
+                   for name in os.listdir(backup.directory))
+
+    assert sqlite_path("sqlite:///data/microbiz.db") == "data/microbiz.db"
+
+
+def test_shard_files_are_backed_up_with_the_main_database(tmp_path, monkeypatch):
+    main = str(tmp_path / "main.db")
+    _build_database(main, rows=10)
+    router = ShardRouter(create_engine(f"sqlite:///{main}"), 4, str(tmp_path / "shards"))
+    os.makedirs(router.directory)
+    _build_database(router.path(1), rows=30)
+    _build_database(router.path(3), rows=40)  # shard 2 never opened: no file, no backup
+    monkeypatch.setattr(connection, "shard_router", router)
+
+    backups = configured_backups(main, str(tmp_path / "backups"))
+    assert [backup.source for backup in backups] == [main, router.path(1), router.path(3)]
+    now = datetime(2024, 5, 1, 2, 30)
+    results = [backup.run(now) for backup in backups]
+
+    assert [os.path.relpath(result.path, tmp_path / "backups") for result in results] == [
+        "microbiz-20240501-023000.db.gz",
+        os.path.join("shard_1", "microbiz-20240501-023000.db.gz"),
+        os.path.join("shard_3", "microbiz-20240501-023000.db.gz"),
+    ]
+    assert [SqliteBackup.verify(result.path)["sales"] for result in results] == [10, 30, 40]
+    assert backups[0].backups() == [results[0].path]  # shard backups stay out of the main listing
@@ -0,0 +1,63 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import create_product, get_product_catalog
+from app.database.models import Base, Product
+from app.services.catalog import ProductNameIndex
+from app.services.parser import Parser
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_trie_resolves_names_aliases_and_completions():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", selling_price=500)
+    milk = create_product(db, user_id=1, name="Milk", selling_price=1200)
+    db.query(Product).filter(Product.id == milk.id).update({"sku": "MLK-1"})
+    db.commit()
+    create_product(db, user_id=2, name="Brie", selling_price=9000)
+
+    catalog = get_product_catalog(db, 1)
+    # Products created after the first load are inserted in place
+    powder = create_product(db, user_id=1, name="Milk Powder", selling_price=8000)
+
+    assert catalog.get("bread") == bread.id
+    assert catalog.get("mlk-1") == milk.id
+    assert catalog.get("brie") is None
+    assert [entry.product_id for entry in catalog.complete("mil")] == [milk.id, powder.id]
+    assert Parser.suggest_items("BR", catalog) == ["Bread"]
+
+
+def test_parser_resolves_items_and_prices_name_only_input():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", selling_price=500)
+    catalog = get_product_catalog(db, 1)
+
+    parsed = Parser.parse_sale("700 bread", catalog)
+    assert (parsed.amount, parsed.product_id) == (700, bread.id)
+
+    parsed = Parser.parse_sale("3x bread", catalog)
+    assert (parsed.amount, parsed.item, parsed.quantity, parsed.product_id) == (1500, "Bread", 3, bread.id)
+
+    assert Parser.parse_sale("500 cake", catalog).product_id is None
+    assert Parser.parse_sale("cake", catalog) is None
+    assert Parser.parse_sale("bread") is None
+
+
+def test_index_evicts_least_recently_used_businesses():
+    db = _build_session()
+    for user_id in (1, 2, 3):
+        create_product(db, user_id=user_id, name="Bread")
+
+    index = ProductNameIndex(max_scopes=2)
+    first = index.get_index(db, 1)
+    index.get_index(db, 2)
+    index.get_index(db, 1)
+    index.get_index(db, 3)
+
+    assert index.get_index(db, 1) is first
+    assert set(index._scopes(db)) == {1, 3}
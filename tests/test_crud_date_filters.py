@@ -3,8 +3,15 @@ from datetime import date
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.database.crud import get_sales_by_date, get_total_expenses, get_total_sales
+from app.database.crud import (
+    get_expense_rows_by_date,
+    get_sale_rows_by_date,
+    get_sales_by_date,
+    get_total_expenses,
+    get_total_sales,
+)
 from app.database.models import Base, Expense, Sale
+from app.services.calculator import Calculator
 
 
 def _build_session():
@@ -30,3 +37,22 @@ def test_same_day_expenses_are_included_in_totals():
 
     today = date.today()
     assert get_total_expenses(db, 1, today, today) == 300
+
+
+def test_row_variants_feed_calculator():
+    db = _build_session()
+    db.add_all([
+        Sale(user_id=1, amount=1200, product_name="bread"),
+        Sale(user_id=1, amount=300, product_name="milk"),
+        Expense(user_id=1, amount=300, category="supplies"),
+    ])
+    db.commit()
+
+    today = date.today()
+    sales = get_sale_rows_by_date(db, 1, today, today)
+    expenses = get_expense_rows_by_date(db, 1, today, today)
+
+    assert not isinstance(sales[0], Sale)
+    assert Calculator.calculate_profit(sales, expenses) == 1200
+    assert Calculator.group_by_category(sales, "product_name") == {"bread": 1200, "milk": 300}
+    assert sales[0].sale_date.date() == today
@@ -0,0 +1,66 @@
+from datetime import date, datetime, time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import iter_monthly_totals
+from app.database.models import Base, Expense, Sale
+from app.services.reports import ReportGenerator, chunk_lines
+from app.services.snapshots import PERIOD_MONTH, ReportSnapshots
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _record(db, day, sale, expense=0):
+    stamp = datetime.combine(day, time(9))
+    db.add(Sale(user_id=1, amount=sale, product_name="bread", sale_date=stamp))
+    if expense:
+        db.add(Expense(user_id=1, amount=expense, category="rent", expense_date=stamp))
+    db.commit()
+
+
+def test_monthly_totals_group_by_month_and_prefer_month_snapshots():
+    db = _build_session()
+    _record(db, date(2023, 1, 5), 100, 40)
+    _record(db, date(2023, 1, 20), 50)
+    _record(db, date(2023, 3, 2), 300, 100)
+    _record(db, date(2023, 4, 30), 70)
+
+    assert list(iter_monthly_totals(db, 1, date(2023, 1, 1), date(2023, 4, 30))) == [
+        (date(2023, 1, 1), 150, 40),
+        (date(2023, 3, 1), 300, 100),
+        (date(2023, 4, 1), 70, 0),
+    ]
+
+    snapshot = ReportSnapshots.build(db, 1, PERIOD_MONTH, date(2023, 3, 1), date(2023, 3, 31))
+    snapshot.total_sales = 999
+    db.commit()
+    months = list(ReportSnapshots.monthly_totals(db, 1, date(2023, 1, 10), date(2023, 4, 30)))
+    assert months == [
+        (date(2023, 1, 1), 50, 0),
+        (date(2023, 3, 1), 999, 100),
+        (date(2023, 4, 1), 70, 0),
+    ]
+
+
+def test_multi_year_custom_report_streams_in_telegram_sized_chunks():
+    db = _build_session()
+    for year in range(2015, 2024):
+        for month in range(1, 13):
+            _record(db, date(year, month, 10), 1000 * month, 100)
+
+    chunks = list(chunk_lines(
+        ReportGenerator()._custom_report_lines(db, 1, date(2015, 1, 1), date(2023, 12, 31)),
+        limit=1000,
+    ))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    report = "".join(chunks)
+    assert "Monthly Breakdown" in report
+    assert report.count("sales,") == 9 * 12
+    assert "Dec 2023: Rp 12,000 sales" in report
+    assert report == ReportGenerator()._custom_report(db, 1, date(2015, 1, 1), date(2023, 12, 31))
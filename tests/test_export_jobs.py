@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import (
+    claim_export_job,
+    complete_export_job,
+    create_export_job,
+    create_user,
+    fail_export_job,
+    fail_stale_export_jobs,
+    pop_expired_export_files,
+)
+from app.database.models import Base, ExportJob
+from app.services import export_jobs
+from app.services.export_jobs import ExportWorker, file_checksum
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def test_jobs_are_claimed_once_in_order_and_duplicates_collapse():
+    Session = _build_session()
+    db = Session()
+    first = create_export_job(db, business_id=1, user_id=1, export_type="csv_sales",
+                              params={"start": "2026-03-01", "end": "2026-03-31"})
+    again = create_export_job(db, business_id=1, user_id=1, export_type="csv_sales",
+                              params={"end": "2026-03-31", "start": "2026-03-01"})
+    second = create_export_job(db, business_id=1, user_id=1, export_type="csv_inventory")
+    assert again.id == first.id
+    # Another member asking for the same file gets their own job, as only the requester is notified
+    member = create_export_job(db, business_id=1, user_id=2, export_type="csv_sales",
+                               params={"start": "2026-03-01", "end": "2026-03-31"})
+    assert member.id not in (first.id, second.id) and member.requested_by_user_id == 2
+
+    # Two workers with their own sessions never get the same job
+    worker_a, worker_b = Session(), Session()
+    claimed = [claim_export_job(worker_a), claim_export_job(worker_b),
+               claim_export_job(worker_a), claim_export_job(worker_b)]
+    assert [job.id for job in claimed[:3]] == [first.id, second.id, member.id]
+    assert claimed[3] is None
+    assert all(job.status == "running" and job.started_at for job in claimed[:3])
+
+
+def test_stale_jobs_fail_and_expired_files_are_released(tmp_path):
+    db = _build_session()()
+    job = create_export_job(db, business_id=1, user_id=1, export_type="csv_sales")
+    claim_export_job(db)
+    job.started_at = datetime.now() - timedelta(hours=2)
+    db.commit()
+    assert fail_stale_export_jobs(db, timeout_minutes=30) == [job.id]
+    db.refresh(job)
+    assert job.status == "failed"
+    # The slow worker finishing afterwards must not flip it back to completed
+    assert not complete_export_job(db, job.id, str(tmp_path / "late.csv.gz"), "0" * 64, 5, ttl_hours=1)
+    db.refresh(job)
+    assert job.status == "failed" and job.file_path is None
+    # Nor a late render error overwrite why it failed
+    assert not fail_export_job(db, job.id, "render crashed")
+    db.refresh(job)
+    assert job.error_message == "Worker timed out"
+
+    path = tmp_path / "sales.csv.gz"
+    path.write_bytes(b"id,amount\n")
+    done = create_export_job(db, business_id=1, user_id=1, export_type="csv_expenses")
+    assert not complete_export_job(db, done.id, str(path), file_checksum(str(path)), 0, ttl_hours=1)  # not claimed
+    assert claim_export_job(db).id == done.id
+    assert complete_export_job(db, done.id, str(path), file_checksum(str(path)), 0, ttl_hours=1)
+    assert done.checksum == hashlib.sha256(b"id,amount\n").hexdigest()
+    assert pop_expired_export_files(db) == []
+
+    done.expires_at = datetime.now() - timedelta(minutes=1)
+    db.commit()
+    assert pop_expired_export_files(db) == [str(path)]
+    assert db.query(ExportJob).filter(ExportJob.file_path.isnot(None)).count() == 0
+
+
+def test_requester_is_told_when_their_job_times_out(monkeypatch):
+    db = _build_session()()
+    user = create_user(db, 42, "Owner")
+    job = create_export_job(db, business_id=1, user_id=user.id, export_type="csv_sales")
+    claim_export_job(db)
+    job.started_at = datetime.now() - timedelta(hours=2)
+    db.commit()
+
+    @contextmanager
+    def session():
+        yield db
+
+    sent = []
+
+    async def send_message(chat_id, text):
+        sent.append((chat_id, text))
+
+    monkeypatch.setattr(export_jobs, "get_db_session", session)
+    monkeypatch.setattr(export_jobs.settings, "EXPORT_JOB_TIMEOUT_MINUTES", 30)
+    worker = ExportWorker(SimpleNamespace(send_message=send_message), processes=1, poll_seconds=1)
+    asyncio.run(worker.housekeeping())
+    asyncio.run(worker.housekeeping())  # already failed: not announced twice
+    assert sent == [(42, f"❌ Export job #{job.id} timed out. Please try again.")]
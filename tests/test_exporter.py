@@ -0,0 +1,65 @@
+import csv
+import gzip
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Expense, Product, Sale
+from app.handlers.exports import parse_export_command
+from app.services.exporter import Exporter
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _read(path):
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as handle:
+        return list(csv.reader(handle))
+
+
+def test_sales_export_streams_scoped_rows_in_date_range(tmp_path):
+    db = _build_session()
+    db.add_all([
+        Sale(user_id=1, amount=100 + index, product_name=f"item {index}",
+             sale_date=datetime(2024, 3, 1 + index % 28, 10))
+        for index in range(250)
+    ])
+    db.add(Sale(user_id=1, amount=5, product_name="april", sale_date=datetime(2024, 4, 2)))
+    db.add(Sale(user_id=2, amount=7, product_name="other business", sale_date=datetime(2024, 3, 5)))
+    db.commit()
+
+    path = str(tmp_path / "sales.csv.gz")
+    written = Exporter.write_csv(db, 1, "sales", path, date(2024, 3, 1), date(2024, 3, 31), batch_size=32)
+
+    rows = _read(path)
+    assert written == 250
+    assert rows[0] == Exporter.header("sales")
+    assert len(rows) == 251
+    assert rows[1][rows[0].index("product_name")] == "item 0"
+    assert rows[1][rows[0].index("sale_date")] == "2024-03-01 10:00:00"
+    assert not any("other business" in row or "april" in row for row in rows)
+
+
+def test_empty_dataset_exports_header_only(tmp_path):
+    db = _build_session()
+    db.add(Product(user_id=2, name="Bread"))
+    db.add(Expense(user_id=2, amount=10, category="rent"))
+    db.commit()
+
+    path = str(tmp_path / "inventory.csv.gz")
+    assert Exporter.write_csv(db, 1, "inventory", path) == 0
+    assert _read(path) == [Exporter.header("inventory")]
+
+
+def test_parse_export_command():
+    assert parse_export_command("/export sales csv 2026-03-01 2026-03-31") == (
+        "sales", date(2026, 3, 1), date(2026, 3, 31)
+    )
+    assert parse_export_command("/export inventory") == ("inventory", None, None)
+    assert parse_export_command("/export") is None
+    assert parse_export_command("/export sales 2026-03-01") is None
+    assert parse_export_command("/export invoices") is None
@@ -0,0 +1,99 @@
+import io
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import get_total_expenses, get_total_sales
+from app.database.models import Base, Expense, Product, ReportSnapshot, Sale, SaleItem, Transaction
+from app.handlers.imports import parse_import_command
+from app.services.importer import CsvImporter
+from app.services.report_cache import MemoryCacheBackend, ReportCache
+from app.services.reports import ReportGenerator
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_sales_import_writes_sales_items_and_ledger_across_chunks():
+    db = _build_session()
+    db.add(Product(user_id=1, name="Bread", purchase_price=4000, selling_price=5000, stock=10))
+    db.add(Sale(user_id=1, amount=1, product_name="existing", sale_date=datetime(2024, 1, 1)))
+    db.commit()
+
+    payload = (
+        "Date,Amount,Product,Qty\n"
+        "2024-02-03,10000,bread,2\n"
+        "2024-02-04 09:30,5000,Coffee,\n"
+        "\n"
+        "31/03/2024,7000,Tea,1\n"
+        "not a date,100,Tea,1\n"
+        "2024-03-05,-5,Tea,1\n"
+        "2024-03-06,100,,1\n"
+        "2099-01-01,100,Tea,1\n"
+    )
+    result = CsvImporter("sales", chunk_size=2).run(db, 1, io.StringIO(payload))
+
+    assert result.imported == 3
+    assert result.rejected == 4
+    assert [line for line, _ in result.errors] == [6, 7, 8, 9]
+    assert (result.first_date, result.last_date) == (date(2024, 2, 3), date(2024, 3, 31))
+
+    assert get_total_sales(db, 1, date(2024, 2, 1), date(2024, 2, 29)) == 15000
+    assert get_total_sales(db, 1, date(2024, 3, 31), date(2024, 3, 31)) == 7000
+
+    sales = db.query(Sale).filter(Sale.product_name != "existing").order_by(Sale.id).all()
+    items = {item.sale_id: item for item in db.query(SaleItem).all()}
+    ledger = {row.reference_id: row for row in db.query(Transaction).all()}
+    assert [sale.sale_date for sale in sales] == [
+        datetime(2024, 2, 3), datetime(2024, 2, 4, 9, 30), datetime(2024, 3, 31),
+    ]
+    assert items[sales[0].id].product_id is not None
+    assert items[sales[0].id].unit_cost == 4000
+    assert items[sales[1].id].product_id is None
+    assert sales[0].unit_price == 5000
+    assert all(ledger[sale.id].amount == sale.amount for sale in sales)
+
+    # Stock is untouched and the closed months got fresh snapshots
+    assert db.query(Product).one().stock == 10
+    months = {row.period_start for row in db.query(ReportSnapshot).filter(ReportSnapshot.period_type == "month")}
+    assert {date(2024, 2, 1), date(2024, 3, 1)} <= months
+
+
+def test_expense_import_and_missing_columns():
+    db = _build_session()
+    payload = "date,amount,category,description\n2024-05-01,250000,Rent,May\n2024-05-02,20000,,\n"
+    result = CsvImporter("expenses").run(db, 1, io.StringIO(payload))
+
+    assert result.imported == 1
+    assert result.errors == [(3, "missing category")]
+    assert db.query(Expense).one().category == "rent"
+    assert get_total_expenses(db, 1, date(2024, 5, 1), date(2024, 5, 31)) == 250000
+
+    try:
+        CsvImporter("expenses").run(db, 1, io.StringIO("date,amount\n2024-05-01,1\n"))
+    except ValueError as e:
+        assert "category" in str(e)
+    else:
+        raise AssertionError("missing column accepted")
+
+    assert parse_import_command("/import Sales") == "sales"
+    assert parse_import_command("/import") is None
+    assert parse_import_command("/import stock") is None
+
+
+def test_import_from_another_process_retires_the_bots_cached_reports():
+    db = _build_session()
+    db.add(Sale(user_id=1, amount=1000, product_name="Tea", sale_date=datetime(2024, 2, 10)))
+    db.commit()
+    # The bot's own in-process cache; the import below runs through the module cache, as in the CLI
+    bot = ReportGenerator(cache=ReportCache(MemoryCacheBackend(max_entries=10)))
+    before = bot.generate_monthly_report(db, 1, date(2024, 2, 1), date(2024, 2, 29))
+    assert "1,000" in before
+
+    CsvImporter("sales").run(db, 1, io.StringIO("Date,Amount,Product\n2024-02-11,5000,Bread\n"))
+    after = bot.generate_monthly_report(db, 1, date(2024, 2, 1), date(2024, 2, 29))
+    assert after != before and "6,000" in after
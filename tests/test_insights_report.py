@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.database.models import Base, Customer, Expense, Product, Sale
+from app.handlers.reports import parse_insights_horizon
 from app.services.reports import ReportGenerator
 
 
@@ -74,3 +75,34 @@ def test_generate_insights_report_without_data():
     assert "Top Product: No sales data yet" in report
     assert "Biggest Expense: No expense data yet" in report
     assert "Record at least one sale daily" in report
+
+
+def test_insights_compare_against_previous_period_from_one_load():
+    db = _build_session()
+    today = date.today()
+    db.add_all(
+        [
+            Sale(user_id=1, amount=3000, product_name="Bread",
+                 sale_date=datetime.combine(today - timedelta(days=5), datetime.min.time())),
+            Sale(user_id=1, amount=1000, product_name="Bread",
+                 sale_date=datetime.combine(today - timedelta(days=40), datetime.min.time())),
+            Sale(user_id=1, amount=9000, product_name="Old",
+                 sale_date=datetime.combine(today - timedelta(days=70), datetime.min.time())),
+        ]
+    )
+    db.commit()
+
+    report = ReportGenerator().generate_insights_report(db, user_id=1, days=30)
+
+    assert "Business Insights (30 Days)" in report
+    assert "Sales: Rp 3,000 (+200.0% vs previous 30 days)" in report
+    assert "Top Product: Bread (Rp 3,000)" in report
+    assert "7-Day Avg Sales" in report
+
+
+def test_insights_horizon_argument():
+    assert parse_insights_horizon("/insights") == (7, None)
+    assert parse_insights_horizon("/insights 90") == (90, None)
+    assert parse_insights_horizon("/insights ytd", today=date(2024, 3, 1)) == (61, "Year to Date")
+    assert parse_insights_horizon("/insights soon") is None
+    assert parse_insights_horizon("🚀 Insights") == (7, None)
@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import (
+    create_customer,
+    create_sale,
+    get_customer_balance,
+    get_customer_balance_as_of,
+    update_customer_credit,
+)
+from app.database.models import Base, Customer, Transaction
+from app.services.ledger import LedgerVerifier
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_credit_payment_and_sale_are_recorded_in_ledger():
+    db = _build_session()
+    customer = create_customer(db, user_id=1, name="John")
+
+    update_customer_credit(db, customer.id, 500, "add")
+    update_customer_credit(db, customer.id, 800, "subtract")
+    create_sale(db, user_id=1, amount=200, product_name="Bread", customer_id=customer.id)
+
+    entries = db.query(Transaction).order_by(Transaction.id).all()
+    assert [entry.type for entry in entries] == ["credit", "payment", "sale"]
+    assert [entry.amount for entry in entries] == [500, 500, 200]
+    assert entries[1].balance_before == 500
+    assert entries[1].balance_after == 0
+    assert entries[2].reference_id is not None
+    assert get_customer_balance(db, 1, customer.id) == 0
+
+
+def test_balance_as_of_reads_history():
+    db = _build_session()
+    customer = create_customer(db, user_id=1, name="John")
+    update_customer_credit(db, customer.id, 300, "add")
+    update_customer_credit(db, customer.id, 100, "add")
+
+    first, second = db.query(Transaction).order_by(Transaction.id).all()
+    first.created_at = datetime.now() - timedelta(days=3)
+    db.commit()
+
+    assert get_customer_balance_as_of(db, 1, customer.id, date.today() - timedelta(days=2)) == 300
+    assert get_customer_balance_as_of(db, 1, customer.id, date.today() - timedelta(days=5)) == 0
+    assert get_customer_balance_as_of(db, 1, customer.id, date.today()) == 400
+
+
+def test_verifier_reports_drift_and_chain_breaks():
+    db = _build_session()
+    customer = create_customer(db, user_id=1, name="John")
+    update_customer_credit(db, customer.id, 300, "add")
+    update_customer_credit(db, customer.id, 100, "subtract")
+
+    assert LedgerVerifier.verify(db) == {"chain_breaks": [], "balance_drift": []}
+
+    db.query(Customer).filter(Customer.id == customer.id).update({"credit_balance": 999})
+    db.add(Transaction(
+        user_id=1, customer_id=customer.id, type="credit",
+        amount=50, balance_before=10, balance_after=60,
+    ))
+    db.commit()
+
+    result = LedgerVerifier.verify(db, user_id=1)
+    assert len(result["chain_breaks"]) == 1
+    assert result["balance_drift"][0]["stored_balance"] == 999
+    assert result["balance_drift"][0]["ledger_balance"] == 60
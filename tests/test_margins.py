@@ -0,0 +1,75 @@
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import create_product, create_sale, get_margin_summary
+from app.database.models import Base, SaleItem
+from app.handlers.reports import parse_margins_period
+from app.services.margins import UNCATEGORIZED, MarginEngine
+from app.services.report_cache import MemoryCacheBackend, ReportCache
+from app.services.reports import ReportGenerator
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db):
+    bread = create_product(db, user_id=1, name="Bread", selling_price=5000,
+                           purchase_price=3000, stock=50, category="bakery")
+    milk = create_product(db, user_id=1, name="Milk", selling_price=8000,
+                          purchase_price=6500, stock=50, category="dairy")
+    create_sale(db, user_id=1, amount=20000, product_name="Bread", quantity=4, product_id=bread.id)
+    create_sale(db, user_id=1, amount=16000, product_name="Milk", quantity=2, product_id=milk.id)
+    create_sale(db, user_id=1, amount=7000, product_name="Flowers")
+    return bread, milk
+
+
+def test_margin_summary_ranks_products_by_contribution():
+    db = _build_session()
+    bread, _ = _seed(db)
+    # A line recorded before cost snapshots falls back to the product's purchase price
+    db.query(SaleItem).filter(SaleItem.product_id == bread.id).update({"unit_cost": None})
+    db.commit()
+
+    today = date.today()
+    analysis = MarginEngine.analyse(get_margin_summary(db, 1, today, today))
+
+    assert [line.name for line in analysis.ranking] == ["Bread", "Milk"]
+    assert analysis.ranking[0].margin == 20000 - 4 * 3000
+    assert analysis.ranking[1].margin == 16000 - 2 * 6500
+    assert [line.name for line in analysis.uncosted] == ["Flowers"]
+    assert analysis.total.revenue == 43000
+    assert analysis.total.margin == 11000
+    assert round(analysis.contribution(analysis.ranking[0])) == 73
+    categories = {line.name: line for line in analysis.categories}
+    assert set(categories) == {"bakery", "dairy", UNCATEGORIZED}
+    assert categories[UNCATEGORIZED].has_cost is False
+
+
+def test_margin_report_and_period_argument():
+    db = _build_session()
+    _seed(db)
+    today = date.today()
+
+    report = ReportGenerator().generate_margin_report(db, 1, today, today, label="Today")
+    assert "Gross Margin: Rp 11,000" in report
+    assert "1. Bread: Rp 8,000" in report
+    assert "purchase price for Flowers" in report
+
+    # The same period asked for under another label renders its own title, not the cached one
+    cached = ReportGenerator(cache=ReportCache(MemoryCacheBackend(max_entries=10)))
+    assert "Margin Report - March 2024" in cached.generate_margin_report(
+        db, 1, date(2024, 3, 1), date(2024, 3, 31), label="March 2024"
+    )
+    assert "Margin Report - Custom" in cached.generate_margin_report(db, 1, date(2024, 3, 1), date(2024, 3, 31))
+
+    assert parse_margins_period("/margins", date(2024, 3, 15)) == (date(2024, 3, 1), date(2024, 3, 15), "March 2024")
+    assert parse_margins_period("/margins last", date(2024, 3, 15)) == (
+        date(2024, 2, 1), date(2024, 2, 29), "February 2024"
+    )
+    assert parse_margins_period("/margins 30", date(2024, 3, 30))[0] == date(2024, 3, 1)
+    assert parse_margins_period("/margins soon") is None
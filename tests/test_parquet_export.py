@@ -0,0 +1,66 @@
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import finish_import
+from app.database.models import Base, Expense, Sale
+from app.services.parquet_export import ParquetExporter
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_months_are_partitioned_dictionary_encoded_and_appended(tmp_path):
+    db = _build_session()
+    for month in (1, 2):
+        db.add_all([
+            Sale(user_id=1, amount=10 * day, product_name=f"item {day % 3}", payment_method="cash",
+                 sale_date=datetime(2024, month, day, 9))
+            for day in range(1, 21)
+        ])
+    db.add(Expense(user_id=1, amount=50, category="rent", expense_date=datetime(2024, 2, 3)))
+    db.add(Sale(user_id=2, amount=1, product_name="other", sale_date=datetime(2024, 1, 5)))
+    db.commit()
+
+    exporter = ParquetExporter(root=str(tmp_path), batch_size=7)
+    summary = exporter.export_business(db, 1)
+    assert summary["sales"] == {"2024-01": 20, "2024-02": 20}
+    assert summary["expenses"] == {"2024-02": 1}
+
+    january = pq.read_table(tmp_path / "business=1" / "sales" / "month=2024-01")
+    assert january.num_rows == 20
+    assert pa.types.is_dictionary(january.schema.field("product_name").type)
+    assert sorted(set(january.column("product_name").to_pylist())) == ["item 0", "item 1", "item 2"]
+
+    # Closed months are kept; only new months are written on the next run
+    db.add(Sale(user_id=1, amount=5, product_name="item 0", sale_date=datetime(2024, 3, 1)))
+    db.commit()
+    assert exporter.export_business(db, 1)["sales"] == {"2024-03": 1}
+    assert ParquetExporter.resume_from(exporter.load_manifest(1)["tables"]["sales"]["months"]) == date(2024, 4, 1)
+
+    dataset = pq.ParquetDataset(tmp_path / "business=1" / "sales")
+    assert dataset.read().num_rows == 41
+
+
+def test_history_rewrite_reexports_closed_months(tmp_path):
+    db = _build_session()
+    db.add(Sale(user_id=1, amount=10, product_name="Tea", sale_date=datetime(2024, 1, 5)))
+    db.add(Sale(user_id=1, amount=20, product_name="Tea", sale_date=datetime(2024, 2, 5)))
+    db.commit()
+    exporter = ParquetExporter(root=str(tmp_path))
+    exporter.export_business(db, 1)
+    assert exporter.export_business(db, 1)["sales"] == {}
+
+    # An import lands in a month the manifest already holds as closed
+    db.add(Sale(user_id=1, amount=30, product_name="Cake", sale_date=datetime(2024, 1, 20)))
+    db.commit()
+    finish_import(db, 1)
+    assert exporter.export_business(db, 1)["sales"] == {"2024-01": 2, "2024-02": 1}
+    assert pq.read_table(tmp_path / "business=1" / "sales" / "month=2024-01").num_rows == 2
+    assert exporter.export_business(db, 1)["sales"] == {}
@@ -0,0 +1,64 @@
+import time
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import connection
+from app.database.connection import RoutingSession, get_read_session
+from app.database.crud import (
+    create_sale, create_user, ensure_user_business_context, get_total_sales, get_user,
+)
+from app.database.models import Base, Sale
+
+
+def _build_engines(monkeypatch):
+    primary = create_engine("sqlite:///:memory:")
+    replica = create_engine("sqlite:///:memory:")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(connection, "read_engine", replica)
+    monkeypatch.setattr(connection, "SessionLocal", sessionmaker(class_=RoutingSession, bind=primary))
+    monkeypatch.setattr(connection, "_recent_writes", {})
+    return primary, replica
+
+
+def test_reads_use_replica_once_the_business_has_not_written_recently(monkeypatch):
+    primary, replica = _build_engines(monkeypatch)
+    with connection.get_db_session() as db:
+        owner = create_user(db, 1, "Owner")  # exists on the primary only
+        ensure_user_business_context(db, owner)
+        create_sale(db, owner.id, 700, "Tea")
+        owner_id = owner.id
+    with sessionmaker(bind=replica)() as lagging:
+        lagging.add(Sale(user_id=owner_id, amount=500, product_name="Tea", sale_date=datetime.now()))
+        lagging.commit()
+
+    today = date.today()
+    # Just wrote: the replica may lag, so the business reads its own write on the primary
+    with get_read_session() as db:
+        assert get_user(db, 1).id == owner_id
+        assert get_total_sales(db, owner_id, today, today) == 700
+
+    connection._recent_writes[owner_id] = time.monotonic() - 3600
+    with get_read_session() as db:
+        assert get_total_sales(db, owner_id, today, today) == 500
+
+    # Other businesses' writes don't pull this one back to the primary
+    connection.note_write(owner_id + 1)
+    with get_read_session() as db:
+        assert get_total_sales(db, owner_id, today, today) == 500
+
+
+def test_without_replica_read_sessions_use_the_primary(monkeypatch):
+    primary, _ = _build_engines(monkeypatch)
+    monkeypatch.setattr(connection, "read_engine", None)
+    with connection.get_db_session() as db:
+        owner = create_user(db, 2, "Owner")
+        create_sale(db, owner.id, 300, "Bread")
+        owner_id = owner.id
+
+    assert connection._recent_writes == {}
+    with get_read_session() as db:
+        assert "replica" not in db.info
+        assert get_total_sales(db, owner_id, date.today(), date.today()) == 300
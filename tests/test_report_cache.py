@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import create_expense, create_sale
+from app.database.models import Base
+from app.services.report_cache import MemoryCacheBackend, ReportCache, report_cache
+from app.services.reports import ReportGenerator
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_open_period_is_invalidated_by_writes():
+    db = _build_session()
+    generator = ReportGenerator(cache=report_cache)
+    today = date.today()
+    create_sale(db, user_id=1, amount=500, product_name="Bread")
+
+    first = generator.generate_daily_report(db, 1, today)
+    hits = report_cache.hits
+    assert generator.generate_daily_report(db, 1, today) == first
+    assert report_cache.hits == hits + 1
+
+    create_expense(db, user_id=1, amount=200, category="rent")
+    refreshed = generator.generate_daily_report(db, 1, today)
+    assert refreshed != first
+    assert "Rp 200" in refreshed
+
+
+def test_closed_period_survives_writes_until_history_changes():
+    db = _build_session()
+    cache = ReportCache(MemoryCacheBackend(max_entries=10))
+    calls = []
+
+    def render():
+        calls.append(1)
+        return f"report {len(calls)}"
+
+    last_week = date.today() - timedelta(days=7)
+    assert cache.get_or_render(db, 1, "custom", last_week, last_week, render) == "report 1"
+    cache.bump(db, 1)
+    assert cache.get_or_render(db, 1, "custom", last_week, last_week, render) == "report 1"
+    cache.bump(db, 1, history=True)
+    assert cache.get_or_render(db, 1, "custom", last_week, last_week, render) == "report 2"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_history_rewritten_by_another_process_reaches_a_memory_cache():
+    db = _build_session()
+    bot = ReportCache(MemoryCacheBackend(max_entries=10))
+    cli = ReportCache(MemoryCacheBackend(max_entries=10))  # e.g. scripts/import_csv.py
+    calls = []
+
+    def render():
+        calls.append(1)
+        return f"report {len(calls)}"
+
+    today, last_week = date.today(), date.today() - timedelta(days=7)
+    assert bot.get_or_render(db, 1, "custom", last_week, last_week, render) == "report 1"
+    assert bot.get_or_render(db, 1, "custom", today, today, render) == "report 2"
+
+    cli.bump(db, 1, history=True)
+    assert bot.get_or_render(db, 1, "custom", last_week, last_week, render) == "report 3"
+    assert bot.get_or_render(db, 1, "custom", today, today, render) == "report 4"
+    assert bot.get_or_render(db, 2, "custom", last_week, last_week, render) == "report 5"
+    assert bot.get_or_render(db, 2, "custom", last_week, last_week, render) == "report 5"
@@ -0,0 +1,73 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import (
+    create_business,
+    get_report_snapshot,
+    get_total_expenses,
+    get_total_sales,
+)
+from app.database.models import Base, Expense, ReportSnapshot, Sale
+from app.services.reports import ReportGenerator
+from app.services.snapshots import PERIOD_DAY, ReportSnapshots, closed_periods
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _record(db, day, sale, expense):
+    stamp = datetime.combine(day, time(12))
+    db.add(Sale(user_id=1, amount=sale, product_name="bread", sale_date=stamp))
+    db.add(Expense(user_id=1, amount=expense, category="rent", expense_date=stamp))
+    db.commit()
+
+
+def test_custom_report_totals_stitch_snapshots_with_live_days():
+    db = _build_session()
+    today = date.today()
+    start = today - timedelta(days=6)
+    for offset in range(7):
+        _record(db, start + timedelta(days=offset), 100 * (offset + 1), 10)
+
+    # Snapshot every other closed day so the live part has holes plus the open edge
+    for offset in range(0, 6, 2):
+        day = start + timedelta(days=offset)
+        ReportSnapshots.build(db, 1, PERIOD_DAY, day, day)
+    db.commit()
+
+    assert ReportSnapshots.period_totals(db, 1, start, today) == (
+        get_total_sales(db, 1, start, today),
+        get_total_expenses(db, 1, start, today),
+    )
+
+
+def test_closed_daily_report_is_read_from_its_snapshot():
+    db = _build_session()
+    yesterday = date.today() - timedelta(days=1)
+    _record(db, yesterday, 500, 200)
+    create_business(db, owner_user_id=1, timezone="Asia/Jakarta")
+
+    assert ReportSnapshots.snapshot_due(db, lookback_days=1) >= 1
+    snapshot = get_report_snapshot(db, 1, PERIOD_DAY, yesterday)
+    assert snapshot.total_sales == 500 and snapshot.total_expenses == 200
+    assert snapshot.rendered == ReportGenerator()._daily_report(db, 1, yesterday)
+
+    snapshot.rendered = "stored report"
+    db.commit()
+    assert ReportGenerator().generate_daily_report(db, 1, yesterday) == "stored report"
+
+    # Already snapshotted periods are skipped on the next run
+    assert ReportSnapshots.snapshot_due(db, lookback_days=1) == 0
+    assert db.query(ReportSnapshot).filter(ReportSnapshot.period_type == PERIOD_DAY).count() == 1
+
+
+def test_closed_periods_include_weeks_and_months_ending_in_the_window():
+    periods = closed_periods(date(2024, 3, 31), lookback_days=1)
+    assert ("day", date(2024, 3, 31), date(2024, 3, 31)) in periods
+    assert ("week", date(2024, 3, 25), date(2024, 3, 31)) in periods
+    assert ("month", date(2024, 3, 1), date(2024, 3, 31)) in periods
@@ -0,0 +1,123 @@
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import (
+    backfill_sale_items,
+    create_product,
+    create_sale,
+    create_sales_bulk,
+    get_product_sales_summary,
+)
+from app.database.models import Base, Product, Sale, SaleItem, Transaction
+from app.services import stock_alerts
+from app.services.analytics import Analytics
+from app.services.reports import ReportGenerator
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_create_sale_links_line_item_to_catalog():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", selling_price=500, purchase_price=300)
+
+    create_sale(db, user_id=1, amount=1500, product_name="bread ", quantity=3)
+    create_sale(db, user_id=1, amount=700, product_name="Cake")
+
+    items = db.query(SaleItem).order_by(SaleItem.id).all()
+    assert items[0].product_id == bread.id
+    assert items[0].unit_cost == 300
+    assert items[1].product_id is None
+
+
+def test_product_summary_groups_by_product_id_with_margin():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", purchase_price=300)
+    create_sale(db, user_id=1, amount=1500, product_name="Bread", quantity=3)
+    create_sale(db, user_id=1, amount=500, product_name="  BREAD")
+    create_sale(db, user_id=1, amount=200, product_name="Tea")
+
+    today = date.today()
+    summary = {row.product_id: row for row in get_product_sales_summary(db, 1, today, today)}
+
+    assert summary[bread.id].revenue == 2000
+    assert summary[bread.id].units == 4
+    assert summary[bread.id].cogs == 1200
+    assert summary[bread.id].margin == 800
+    assert summary[None].product_name == "Tea"
+    assert summary[None].margin == 0
+
+
+def test_backfill_maps_historical_names_onto_products():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", purchase_price=300)
+    db.add_all([
+        Sale(user_id=1, amount=1000, product_name="bread", quantity=2, unit_price=500),
+        Sale(user_id=1, amount=400, product_name="Milk"),
+    ])
+    db.commit()
+
+    assert backfill_sale_items(db, batch_size=1) == 2
+    assert backfill_sale_items(db) == 0
+
+    items = db.query(SaleItem).order_by(SaleItem.sale_id).all()
+    assert [item.product_id for item in items] == [bread.id, None]
+    assert items[0].unit_cost == 300
+
+
+def test_sale_decrements_stock_and_emits_low_stock_event():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", stock=8)
+    events = []
+    listener = lambda session, event: events.append(event)
+    stock_alerts.subscribe(listener)
+    try:
+        create_sale(db, user_id=1, amount=1500, product_name="bread", quantity=3)
+        create_sale(db, user_id=1, amount=500, product_name="Bread")
+        create_sale(db, user_id=1, amount=9000, product_name="Bread", quantity=9)
+    finally:
+        stock_alerts.unsubscribe(listener)
+
+    assert db.query(Product).filter(Product.id == bread.id).one().stock == 0
+    assert len(events) == 1
+    assert events[0].product_id == bread.id
+    assert (events[0].previous_stock, events[0].stock) == (8, 5)
+
+
+def test_bulk_sales_share_one_commit_with_items_ledger_and_stock():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", stock=10, purchase_price=300)
+
+    sales = create_sales_bulk(db, user_id=1, entries=[
+        {"amount": 1500, "product_name": "bread", "quantity": 3},
+        {"amount": 500, "product_name": "Bread"},
+        {"amount": 700, "product_name": "Cake"},
+    ])
+
+    assert len(sales) == 3
+    assert all(sale.id for sale in sales)
+    assert db.query(SaleItem).filter(SaleItem.product_id == bread.id).count() == 2
+    assert db.query(Transaction).filter(Transaction.type == "sale").count() == 3
+    assert db.query(Product).filter(Product.id == bread.id).one().stock == 6
+
+
+def test_breakdown_includes_sales_without_line_items():
+    db = _build_session()
+    create_product(db, user_id=1, name="Bread", purchase_price=300)
+    create_sale(db, user_id=1, amount=1500, product_name="Bread", quantity=3)
+    db.add(Sale(user_id=1, amount=500, product_name="Milk", sale_date=datetime.now()))  # no line item
+    db.commit()
+
+    today = date.today()
+    generator = ReportGenerator()
+    breakdown = generator._sales_by_product(db, 1, today, today, Analytics.load_sales(db, 1, today, today))
+    assert breakdown == {"Bread": 1500, "Milk": 500}
+
+    report = generator._daily_report(db, 1, today)
+    assert "Bread: Rp 1,500 (75.0%)" in report
+    assert "Milk: Rp 500 (25.0%)" in report
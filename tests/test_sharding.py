@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import connection
+from app.database.connection import RoutingSession, ShardRouter, use_shard
+from app.database.crud import (
+    create_product, create_sale, create_user, ensure_user_business_context, get_data_scope,
+    get_report_snapshot_keys, get_total_sales, save_report_snapshot,
+)
+from app.database.models import Base, Customer, Sale, SaleArchive, TenantShard
+from app.services.sharding import ShardRebalancer
+
+
+def _build_session(tmp_path, monkeypatch, shards=3, legacy_ids=False):
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    hot = [Base.metadata.tables[name] for name in ("sales", "sale_items", "expenses")]
+    for table in hot:  # legacy_ids: main file from before the hot tables were AUTOINCREMENT
+        table.dialect_options["sqlite"]["autoincrement"] = not legacy_ids
+    try:
+        Base.metadata.create_all(bind=engine)
+    finally:
+        for table in hot:
+            table.dialect_options["sqlite"]["autoincrement"] = True
+    monkeypatch.setattr(connection, "shard_router", ShardRouter(engine, shards, str(tmp_path / "shards"), 1))
+    return sessionmaker(class_=RoutingSession, bind=engine)()
+
+
+def _shard_sales(tmp_path, shard, user_id):
+    path = tmp_path / ("main.db" if shard == 0 else f"shards/shard_{shard}.db")
+    with create_engine(f"sqlite:///{path}").connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM sales WHERE user_id = :u"), {"u": user_id}).scalar()
+
+
+def test_business_data_is_routed_to_its_shard(tmp_path, monkeypatch):
+    db = _build_session(tmp_path, monkeypatch)
+    owners = []
+    for telegram_id in range(1, 5):
+        user = create_user(db, telegram_id, f"Owner {telegram_id}")
+        ensure_user_business_context(db, user)
+        owners.append(user)
+
+    placement = {row.scope_user_id: row.shard for row in db.query(TenantShard)}
+    assert placement == {owner.id: owner.id % 3 for owner in owners}
+
+    today = date.today()
+    for owner in owners:
+        create_product(db, owner.id, "Bread", selling_price=1000)  # same product id on every shard
+        for _ in range(owner.id):
+            create_sale(db, owner.id, 1000 * owner.id, "Bread")
+        save_report_snapshot(db, owner.id, "day", today - timedelta(days=1), today - timedelta(days=1))
+        db.commit()
+
+    for owner in owners:
+        assert _shard_sales(tmp_path, owner.id % 3, owner.id) == owner.id
+        assert get_total_sales(db, owner.id, today, today) == 1000 * owner.id ** 2
+    assert {scope for scope, _, _ in get_report_snapshot_keys(db, today - timedelta(days=7))} == {
+        owner.id for owner in owners
+    }
+
+    fresh = RoutingSession(bind=db.get_bind())
+    try:
+        fresh.query(Sale).count()
+    except RuntimeError as e:
+        assert "routed" in str(e)
+    else:
+        raise AssertionError("unrouted session read business data")
+
+
+def test_rebalance_moves_business_between_shards(tmp_path, monkeypatch):
+    db = _build_session(tmp_path, monkeypatch)
+    owner = create_user(db, 10, "Owner")
+    clerk = create_user(db, 11, "Clerk")
+    business, _ = ensure_user_business_context(db, owner)
+    for _ in range(5):
+        create_sale(db, owner.id, 2000, "Tea")
+    create_sale(db, clerk.id, 999, "Not this business")
+    source = owner.id % 3
+    target = (source + 1) % 3
+
+    status = ShardRebalancer.status(db)
+    assert status[source]["businesses"] == 1 and status[source]["sales"] == 5
+
+    result = ShardRebalancer.move(db, business.id, target)
+    assert result.rows["sales"] == 5
+    assert db.get(TenantShard, owner.id).shard == target
+    assert _shard_sales(tmp_path, target, owner.id) == 5
+    assert _shard_sales(tmp_path, source, owner.id) == 0
+    assert get_total_sales(db, owner.id, date.today(), date.today()) == 10000
+    create_sale(db, owner.id, 1000, "Tea")
+    assert _shard_sales(tmp_path, target, owner.id) == 6
+    assert get_total_sales(db, clerk.id, date.today(), date.today()) == 999
+
+    try:
+        ShardRebalancer.move(db, business.id, target)
+    except ValueError as e:
+        assert "already on shard" in str(e)
+    else:
+        raise AssertionError("moved onto its own shard")
+
+
+def test_move_refuses_when_purge_would_reuse_archived_ids(tmp_path, monkeypatch):
+    db = _build_session(tmp_path, monkeypatch, legacy_ids=True)
+    owners = [create_user(db, telegram_id, f"Owner {telegram_id}") for telegram_id in range(1, 4)]
+    business, _ = ensure_user_business_context(db, owners[2])  # owner 3 -> shard 0
+    create_sale(db, owners[2].id, 1000, "Tea")
+    # Another business on shard 0 archived rows above what stays once owner 3 leaves
+    db.add(SaleArchive(id=50, user_id=999, amount=1, product_name="old"))
+    db.commit()
+
+    try:
+        ShardRebalancer.move(db, business.id, 1)
+    except ValueError as e:
+        assert "reuse archived ids" in str(e)
+    else:
+        raise AssertionError("moved although ids would be reused")
+    assert _shard_sales(tmp_path, 0, owners[2].id) == 1
+
+
+def test_evicted_shard_engine_is_reused_while_a_session_holds_it(tmp_path, monkeypatch):
+    db = _build_session(tmp_path, monkeypatch)  # engine cache of 1
+    router = connection.shard_router
+    use_shard(db, 1)
+    db.add(Sale(user_id=1, amount=100, product_name="Tea"))
+    db.flush()  # the session's transaction now holds a shard 1 connection
+    in_use = router.engine(1)
+
+    router.engine(2)  # evicts shard 1 from the cache, without disposing it
+    assert router.engine(1) is in_use
+    db.commit()
+    assert _shard_sales(tmp_path, 1, 1) == 1
+
+
+def test_move_refuses_when_skus_or_phones_clash_on_target(tmp_path, monkeypatch):
+    db = _build_session(tmp_path, monkeypatch)
+    owners = [create_user(db, telegram_id, f"Owner {telegram_id}") for telegram_id in (1, 2)]
+    businesses = [ensure_user_business_context(db, owner)[0] for owner in owners]  # shards 1 and 2
+    for owner in owners:
+        get_data_scope(db, owner.id)
+        db.add(Customer(user_id=owner.id, name=f"Budi {owner.id}", phone="0811"))
+        db.commit()
+    create_sale(db, owners[0].id, 1000, "Tea")
+
+    try:
+        ShardRebalancer.move(db, businesses[0].id, 2)
+    except ValueError as e:
+        assert "phone" in str(e) and "0811" in str(e)
+    else:
+        raise AssertionError("moved although the phone number is taken on the target")
+    assert db.get(TenantShard, owners[0].id).shard == 1
+    assert _shard_sales(tmp_path, 1, owners[0].id) == 1
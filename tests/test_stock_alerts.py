@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import create_product, create_user, create_sale, update_product_stock
+from app.database.models import Base, LowStockAlert
+from app.services import notifier as notifier_module
+from app.services.notifier import Notifier
+from app.services.stock_alerts import get_due_alerts, mark_notified, rebuild_pending_alerts
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_crossing_below_minimum_queues_one_pending_alert():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", stock=7)
+    create_product(db, user_id=1, name="Milk", stock=50)
+
+    create_sale(db, user_id=1, amount=1500, product_name="Bread", quantity=3)
+    update_product_stock(db, bread.id, 1, operation="subtract")
+
+    due = get_due_alerts(db, cooldown_hours=24)
+    assert list(due) == [1]
+    alert, name, stock = due[1][0]
+    assert (name, stock) == ("Bread", 3)
+    assert db.query(LowStockAlert).count() == 1
+
+
+def test_restock_resolves_and_notification_is_debounced():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", stock=6)
+
+    update_product_stock(db, bread.id, 2, operation="subtract")
+    mark_notified(db, [alert for alert, _, _ in get_due_alerts(db, 24)[1]])
+    assert get_due_alerts(db, 24) == {}
+
+    update_product_stock(db, bread.id, 20, operation="add")
+    assert db.query(LowStockAlert).one().status == "resolved"
+
+    update_product_stock(db, bread.id, 0, operation="set")
+    assert get_due_alerts(db, 24) == {}
+    later = datetime.now() + timedelta(hours=25)
+    assert len(get_due_alerts(db, 24, now=later)[1]) == 1
+
+
+def test_rebuild_seeds_products_already_below_minimum():
+    db = _build_session()
+    create_product(db, user_id=1, name="Bread", stock=1)
+    create_product(db, user_id=2, name="Milk", stock=40)
+    db.query(LowStockAlert).delete()  # as in a database from before alerts existed
+    db.commit()
+
+    assert rebuild_pending_alerts(db) == 1
+    assert rebuild_pending_alerts(db) == 0
+
+
+def test_product_created_below_minimum_is_alerted_once():
+    db = _build_session()
+    create_product(db, user_id=1, name="Bread", stock=2)  # default min_stock is 5
+
+    due = get_due_alerts(db, cooldown_hours=24)
+    assert [(name, stock) for _, name, stock in due[1]] == [("Bread", 2)]
+    mark_notified(db, [alert for alert, _, _ in due[1]])
+
+    # Selling from an already-low, already-announced stock doesn't re-queue it
+    create_sale(db, user_id=1, amount=500, product_name="Bread")
+    assert get_due_alerts(db, 24) == {}
+    assert db.query(LowStockAlert).one().stock == 2
+
+
+def test_sale_from_low_stock_without_alert_queues_one():
+    db = _build_session()
+    bread = create_product(db, user_id=1, name="Bread", stock=3)
+    db.query(LowStockAlert).delete()  # low since before alerts existed
+    db.commit()
+
+    create_sale(db, user_id=1, amount=500, product_name="Bread")
+    create_sale(db, user_id=1, amount=500, product_name="Bread")
+    due = get_due_alerts(db, 24)
+    assert [(name, stock) for _, name, stock in due[1]] == [("Bread", 1)]
+    assert db.query(LowStockAlert).count() == 1
+    db.refresh(bread)
+    assert bread.stock == 1
+
+
+def test_daily_alert_job_reannounces_after_exactly_one_cooldown(monkeypatch):
+    db = _build_session()
+    owner = create_user(db, 42, "Owner")
+    bread = create_product(db, user_id=owner.id, name="Bread", stock=6)
+    update_product_stock(db, bread.id, 2, operation="subtract")
+
+    @contextmanager
+    def session():
+        yield db
+
+    sent = []
+
+    async def send_message(chat_id, text, **_):
+        sent.append(chat_id)
+
+    monkeypatch.setattr(notifier_module, "get_db_session", session)
+    monkeypatch.setattr(notifier_module.settings, "LOW_STOCK_ALERT_COOLDOWN_HOURS", 24)
+    notifier = Notifier(SimpleNamespace(send_message=send_message))
+
+    first_run = datetime(2024, 3, 1, 9, 0)
+    asyncio.run(notifier.send_low_stock_alerts(now=first_run))
+    assert sent == [42]
+    assert db.query(LowStockAlert).one().notified_at == first_run
+
+    # Restocked and sold out again before the next day's run, which must announce it
+    update_product_stock(db, bread.id, 20, operation="add")
+    update_product_stock(db, bread.id, 0, operation="set")
+    asyncio.run(notifier.send_low_stock_alerts(now=first_run + timedelta(hours=24)))
+    assert sent == [42, 42]
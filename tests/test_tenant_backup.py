@@ -0,0 +1,151 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.crud import add_or_update_business_member, create_business, create_user
+from app.database.models import (
+    Base, BusinessMember, Customer, Product, Sale, SaleItem, Transaction, User,
+)
+from app.services import tenant_backup
+from app.services.tenant_backup import TenantArchive, generate_key
+
+
+def _build_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db):
+    create_user(db, 900, "Someone Else")  # shifts ids on the source
+    owner = create_user(db, 1001, "Owner")
+    clerk = create_user(db, 1002, "Clerk")
+    business = create_business(db, owner.id, "Warung", timezone="Asia/Jakarta")
+    add_or_update_business_member(db, business.id, owner.id, "owner", invited_by=owner.id)
+    add_or_update_business_member(db, business.id, clerk.id, "staff", invited_by=owner.id)
+
+    bread = Product(user_id=owner.id, name="Bread", sku="BR-1", purchase_price=4000, stock=3)
+    buyer = Customer(user_id=owner.id, name="Budi", phone="0811", credit_balance=5000)
+    db.add_all([Product(user_id=99, name="Other business"), bread, buyer])
+    db.flush()
+    for index in range(25):
+        sale = Sale(user_id=owner.id, amount=5000, product_name="Bread", customer_id=buyer.id,
+                    sale_date=datetime(2024, 1, 1 + index, 9))
+        db.add(sale)
+        db.flush()
+        db.add(SaleItem(sale_id=sale.id, user_id=owner.id, product_id=bread.id, item_name="Bread",
+                        quantity=1, unit_price=5000, line_revenue=5000, sale_date=sale.sale_date))
+        db.add(Transaction(user_id=owner.id, customer_id=buyer.id, type="sale", amount=5000,
+                           balance_before=0, balance_after=0, reference_id=sale.id))
+    db.commit()
+    return business
+
+
+def test_archive_restores_on_another_database_with_remapped_ids(tmp_path):
+    key = generate_key()
+    source = _build_session()
+    business = _seed(source)
+    path = str(tmp_path / "warung.tar")
+
+    manifest = TenantArchive(key, chunk_rows=10).export_business(source, business.id, path)
+    assert manifest["tables"]["sales"]["rows"] == 25
+    assert len(manifest["tables"]["sales"]["chunks"]) == 3
+    assert manifest["tables"]["products"]["rows"] == 1
+
+    target = _build_session()
+    create_user(target, 1002, "Clerk (already here)")
+    target.add(Product(user_id=50, name="Taken", sku="BR-1"))
+    target.commit()
+
+    result = TenantArchive(key).restore(target, path)
+
+    owner = target.query(User).filter(User.telegram_id == 1001).one()
+    clerk = target.query(User).filter(User.telegram_id == 1002).one()
+    assert result.owner_user_id == owner.id
+    assert result.rows["sales"] == 25
+    assert result.cleared == 1  # BR-1 belongs to another business here
+
+    product = target.query(Product).filter(Product.user_id == owner.id).one()
+    customer = target.query(Customer).filter(Customer.user_id == owner.id).one()
+    assert product.sku is None and product.stock == 3
+    sales = {sale.id for sale in target.query(Sale).filter(Sale.user_id == owner.id)}
+    assert len(sales) == 25
+    assert all(item.sale_id in sales and item.product_id == product.id
+               for item in target.query(SaleItem).filter(SaleItem.user_id == owner.id))
+    assert {row.reference_id for row in target.query(Transaction)} == sales
+    assert {row.customer_id for row in target.query(Transaction)} == {customer.id}
+    members = {(m.user_id, m.role) for m in target.query(BusinessMember).filter(
+        BusinessMember.business_id == result.business_id)}
+    assert members == {(owner.id, "owner"), (clerk.id, "staff")}
+
+    # Restoring again would duplicate the business's data
+    try:
+        TenantArchive(key).restore(target, path)
+    except ValueError as e:
+        assert "already has" in str(e)
+    else:
+        raise AssertionError("restored over existing data")
+
+
+def test_tampered_or_foreign_key_archive_is_rejected(tmp_path):
+    source = _build_session()
+    business = _seed(source)
+    path = str(tmp_path / "warung.tar")
+    key = generate_key()
+    TenantArchive(key).export_business(source, business.id, path)
+
+    try:
+        TenantArchive(generate_key()).verify(path)
+    except ValueError as e:
+        assert "wrong key" in str(e)
+    else:
+        raise AssertionError("archive opened with another key")
+
+    with open(path, "r+b") as handle:
+        data = handle.read()
+        offset = data.index(b"sales/000000") + 512 + 40  # past the tar header, inside the chunk
+        handle.seek(offset)
+        handle.write(bytes([data[offset] ^ 0xFF]))
+
+    target = _build_session()
+    try:
+        TenantArchive(key).restore(target, path)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("tampered archive restored")
+    assert target.query(Sale).count() == 0
+    assert target.query(User).count() == 0
+
+
+def test_failed_restore_leaves_nothing_behind_and_can_be_retried(tmp_path, monkeypatch):
+    key = generate_key()
+    source = _build_session()
+    business = _seed(source)
+    path = str(tmp_path / "warung.tar")
+    TenantArchive(key, chunk_rows=10).export_business(source, business.id, path)
+
+    target = _build_session()
+    insert_rows = tenant_backup.bulk_insert
+
+    def failing_insert(db, model, rows):
+        if model is Transaction:  # after products, customers, sales and their items
+            raise RuntimeError("disk full")
+        insert_rows(db, model, rows)
+
+    monkeypatch.setattr(tenant_backup, "bulk_insert", failing_insert)
+    try:
+        TenantArchive(key).restore(target, path)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("restore did not fail")
+    assert target.query(Sale).count() == 0
+    assert target.query(SaleItem).count() == 0
+    assert target.query(Product).count() == 0
+
+    monkeypatch.setattr(tenant_backup, "bulk_insert", insert_rows)
+    result = TenantArchive(key).restore(target, path)
+    assert result.rows["sales"] == 25 and result.rows["transactions"] == 25
+    assert target.query(Sale).count() == 25